@@ -1,105 +1,271 @@
 import cv2
-import pytesseract
 import numpy as np
-from PIL import Image
 import os
+import time
 import logging
-from pathlib import Path
-from typing import List, Tuple, Optional
-from skimage.metrics import structural_similarity as ssim
-import imagehash
+from typing import TYPE_CHECKING, Callable, Iterator, List, Tuple, Optional, Union
 
-# 设置OCR路径
-try:
-    from config import OCRConfig
-    if OCRConfig.TESSERACT_CMD and os.path.exists(OCRConfig.TESSERACT_CMD):
-        pytesseract.pytesseract.tesseract_cmd = OCRConfig.TESSERACT_CMD
-except ImportError:
-    pass  # 如果config模块不可用，则跳过
+# 只导入每次处理都会用到的模块；OCR（PIL、OCR引擎）、SSIM（skimage）、哈希（imagehash）、
+# 场景预筛、分析索引、分段并行和解码后端在用到它们的代码路径中导入，
+# 只做文字检测时不加载skimage和imagehash，只做图像检测时不加载OCR
+from frame_sampler import FrameSampler, create_sampler
+from choices import DEFAULT_OCR_LANG
+from ocr_cache import DEFAULT_CACHE_MAX_MB
+from text_compare import DEFAULT_TEXT_SIMILARITY
+from screenshot_writer import ScreenshotWriter
+from roi import ROI
+from frame_analysis import DEFAULT_ANALYSIS_WIDTH, AnalysisBuffers, to_analysis_gray
+from processor_base import BaseVideoProcessor
+
+if TYPE_CHECKING:
+    import imagehash
+    from analysis_index import AnalysisIndex
+
+# 默认段间重叠（秒）：分段并行时每段从开始帧之前这么长的位置开始预热检测状态
+DEFAULT_SEGMENT_OVERLAP = 2.0
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-class AdvancedVideoProcessor:
-    def __init__(self, video_path: str, output_dir: Optional[str] = None):
-        self.video_path = video_path
-        self.video_name = Path(video_path).stem
-        self.output_dir = output_dir or os.path.join(os.path.dirname(video_path), f"{self.video_name}_截图")
+class ChangeEvent:
+    """一次检测到的变化"""
+
+    __slots__ = ('frame_index', 'timestamp', 'frame', 'text', 'similarity')
+
+    def __init__(self, frame_index: int, timestamp: float, frame: np.ndarray, text: Optional[str] = None,
+                 similarity: Optional[float] = None):
+        """
+        :param frame_index: 帧编号（开启切换帧定位时为确切的切换帧）
+        :param timestamp: 时间戳（秒）
+        :param frame: 原始分辨率的BGR帧
+        :param text: 识别区域的OCR文字，未做文字检测时为None
+        :param similarity: 与上一张截图的SSIM，第一帧、未做图像检测或无法计算时为None
+        """
+        self.frame_index = frame_index
+        self.timestamp = timestamp
+        self.frame = frame
+        self.text = text
+        self.similarity = similarity
+
+    def __repr__(self) -> str:
+        return (f"ChangeEvent(frame_index={self.frame_index}, timestamp={self.timestamp:.2f}, "
+                f"similarity={self.similarity}, text={self.text!r})")
+
+
+class AdvancedVideoProcessor(BaseVideoProcessor):
+    """
+    检测文字和图像变化的视频处理器，共用参数见 BaseVideoProcessor，
+    另外支持分析分辨率、场景预筛、分析索引、分析流、分段并行和内存预算
+    """
+
+    def __init__(self, video_path: str, output_dir: Optional[str] = None,
+                 sampling_strategy: str = "auto", ocr_workers: int = 0, ocr_queue_depth: int = 0,
+                 ocr_backend: str = "auto", ocr_gate_threshold: float = 8.0,
+                 writer_threads: int = 2, writer_queue_size: int = 8,
+                 image_format: str = "png", image_quality: Optional[int] = None,
+                 png_compression: int = 3, webp_lossless: bool = False,
+                 progress_callback: Optional[Callable[[float], None]] = None,
+                 roi: Optional[List[Union[ROI, str]]] = None,
+                 analysis_width: int = DEFAULT_ANALYSIS_WIDTH,
+                 profile: bool = False, profile_trace: Optional[str] = None,
+                 scene_method: Optional[str] = None, scene_threshold: Optional[float] = None,
+                 scene_settle: int = 1, max_interval: Optional[float] = None,
+                 refine_changes: bool = False, resume: bool = False, checkpoint_interval: float = 30.0,
+                 ocr_cache: bool = True, ocr_cache_max_mb: float = DEFAULT_CACHE_MAX_MB,
+                 analysis_index: bool = False, decoder: str = "opencv", decoder_threads: int = 0,
+                 analysis_stream: bool = False, segments: int = 1,
+                 segment_overlap: float = DEFAULT_SEGMENT_OVERLAP, memory_budget_mb: float = 0,
+                 text_similarity: float = DEFAULT_TEXT_SIMILARITY, ocr_min_confidence: float = 0,
+                 ocr_lang: str = DEFAULT_OCR_LANG):
+        # 分段并行时工作进程用相同的选项创建处理器
+        self.options = {name: value for name, value in locals().items()
+                        if name not in ('self', '__class__', 'video_path', 'progress_callback')}
+        super().__init__(video_path, output_dir, sampling_strategy, ocr_workers, ocr_queue_depth, ocr_backend,
+                         ocr_gate_threshold, writer_threads, writer_queue_size, image_format, image_quality,
+                         png_compression, webp_lossless, progress_callback, roi, profile, profile_trace,
+                         max_interval, refine_changes, resume, checkpoint_interval, ocr_cache, ocr_cache_max_mb,
+                         decoder, decoder_threads, text_similarity, ocr_min_confidence, ocr_lang)
         self.previous_frame = None
         self.previous_hash = None
-        self.previous_text = ""
-        self.screenshot_count = 0
-        
-        # 创建输出目录
-        os.makedirs(self.output_dir, exist_ok=True)
+        # 最近一次图像比较的SSIM，第一帧或无法计算时为None
+        self.last_similarity = None
+        # 分析流：解码器直接输出灰度（仅图像检测时还缩小到分析分辨率）的帧，
+        # 只在保存截图时读取原始分辨率的彩色帧
+        self.analysis_stream = analysis_stream
+        self.frame_fetcher = None
+        self.analysis_width = analysis_width
+        # 场景变化预筛：只对候选变化点附近的帧做OCR和SSIM，为None时分析所有取样帧
+        self.scene_method = scene_method
+        self.scene_threshold = scene_threshold
+        self.scene_settle = scene_settle
+        self.scene_stats = {}
+        # 分析索引：首次处理时记录每个取样帧的特征，之后调整阈值只在索引上重放决策
+        self.analysis_index = analysis_index
+        # 索引文件路径，为None时使用 analysis_index.index_path_for() 的默认位置
+        self.index_path = None
+        # 分段并行：视频按时间分为segments段（0表示CPU核数），各段在独立进程中处理后拼接，
+        # 每段提前segment_overlap秒开始预热检测状态
+        self.segments = segments or os.cpu_count() or 1
+        self.segment_overlap = segment_overlap
+        # 工作进程中处理的时间段 (预热开始帧, 开始帧, 结束帧) 和该段第一张截图时的检测状态
+        self.segment = None
+        self.segment_first_state = None
+        # 内存预算（MB，0表示不限制）：限制写入队列和OCR流水线中的在途整帧数，
+        # 分析用的灰度图和OCR的RGB图写入预分配的缓冲区
+        self.memory_budget_mb = memory_budget_mb
+        self.buffers = AnalysisBuffers() if memory_budget_mb > 0 else None
         
     def extract_frames_with_changes(self, interval: float = 1.0, method: str = "combined") -> List[str]:
         """
-        提取视频中有变化的帧并保存截图
+        提取视频中有变化的帧并保存截图（默认阈值）
         :param interval: 处理帧的时间间隔（秒）
         :param method: 检测方法 ("text", "image", "combined")
         :return: 截图文件路径列表
         """
-        logger.info(f"开始处理视频: {self.video_path}")
+        return self.extract_frames_with_custom_thresholds(interval, method)
         
-        # 打开视频文件
-        cap = cv2.VideoCapture(self.video_path)
-        if not cap.isOpened():
-            logger.error(f"无法打开视频文件: {self.video_path}")
-            return []
-            
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        # 确保frame_interval至少为1，避免除零错误
-        frame_interval = max(1, int(fps * interval))  # 帧间隔
-        frame_count = 0
-        saved_screenshots = []
+    def _open_video(self, method: str) -> cv2.VideoCapture:
+        """
+        打开视频，启用分析流时解码器输出灰度分析帧，并准备读取原始彩色帧的FrameFetcher
+        :param method: 检测方法，需要OCR时分析流保持原始分辨率
+        :return: 视频对象
+        """
+        from video_decoder import FrameFetcher, open_video, video_size
+
+        source_width, source_height = video_size(self.video_path) if self.analysis_stream else (0, 0)
+        if source_width <= 0 or source_height <= 0:
+            cap = open_video(self.video_path, self.decoder, self.decoder_threads)
+        else:
+            # 识别区域换算为比例，在分析帧和原始帧上截取同一块画面
+            self.regions = self.regions.proportional(source_width, source_height)
+            width = self._analysis_stream_width(method, source_width, source_height)
+            cap = open_video(self.video_path, self.decoder, self.decoder_threads, "gray", width)
+            self.frame_fetcher = FrameFetcher(self.video_path, cap.get(cv2.CAP_PROP_FPS), self.decoder,
+                                              self.decoder_threads)
+            logger.info(f"使用分析流: {int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))}x"
+                        f"{int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))} 灰度")
+        if cap.isOpened():
+            self._apply_memory_budget(cap)
+        return cap
         
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-                
-            # 按指定间隔处理帧
-            if frame_count % frame_interval == 0:
-                should_save = False
-                
-                if method == "text":
-                    # 基于文字变化检测
-                    should_save = self._check_text_change(frame)
-                elif method == "image":
-                    # 基于图像变化检测
-                    should_save = self._check_image_change(frame)
-                elif method == "combined":
-                    # 结合文字和图像变化检测
-                    text_change = self._check_text_change(frame)
-                    image_change = self._check_image_change(frame)
-                    should_save = text_change or image_change
-                
-                if should_save:
-                    # 保存截图
-                    screenshot_path = self.save_screenshot(frame, frame_count)
-                    saved_screenshots.append(screenshot_path)
-                    logger.info(f"检测到变化，已保存截图: {screenshot_path}")
-                    
-            frame_count += 1
-            
-        cap.release()
-        logger.info(f"处理完成，共保存 {len(saved_screenshots)} 张截图")
-        return saved_screenshots
+    def _apply_memory_budget(self, cap: cv2.VideoCapture):
+        """
+        按内存预算限制在途整帧数：写入队列和OCR流水线中的帧各占一半预算
+        :param cap: 已打开的视频对象
+        """
+        if self.memory_budget_mb <= 0:
+            return
+        width = getattr(cap, 'source_width', 0) or int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = getattr(cap, 'source_height', 0) or int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        frame_bytes = max(1, width * height * 3)
+        frames = max(2, int(self.memory_budget_mb * 1024 * 1024 // frame_bytes))
+        self.writer_queue_size = max(1, min(self.writer_queue_size, frames // 2))
+        if self.ocr_workers > 0:
+            depth = self.ocr_queue_depth or self.ocr_workers * 2
+            self.ocr_queue_depth = max(1, min(depth, frames - frames // 2))
+        logger.info(f"内存预算 {self.memory_budget_mb:g} MB: 每帧 {frame_bytes / (1024 * 1024):.1f} MB，"
+                    f"写入队列 {self.writer_queue_size} 帧"
+                    + (f"，OCR在途 {self.ocr_queue_depth} 帧" if self.ocr_workers > 0 else ""))
         
-    def _check_text_change(self, frame: np.ndarray) -> bool:
+    def _analysis_stream_width(self, method: str, source_width: int, source_height: int) -> int:
+        """
+        分析流的输出宽度：OCR需要原始分辨率；仅图像检测时缩小到识别区域恰好为分析分辨率宽度
+        :param method: 检测方法
+        :param source_width: 原始画面宽度
+        :param source_height: 原始画面高度
+        :return: 输出宽度，0表示不缩放
+        """
+        if method in ("text", "combined") or self.analysis_width <= 0:
+            return 0
+        rects = self.regions.rects(source_width, source_height)
+        region_width = max((w for _, _, w, _ in rects), default=source_width)
+        return round(source_width * self.analysis_width / region_width)
+        
+    def _close_fetcher(self):
+        """释放读取原始帧的视频对象"""
+        if self.frame_fetcher is not None:
+            if self.frame_fetcher.fetched:
+                logger.info(f"分析流: 读取原始帧 {self.frame_fetcher.fetched} 次")
+            self.frame_fetcher.close()
+            self.frame_fetcher = None
+        
+    def _iter_samples(self, sampler: FrameSampler, method: str):
+        """
+        产出 (帧编号, 帧, 文字)，启用场景预筛时只产出候选变化点附近的帧
+        :param sampler: 帧取样器
+        :param method: 检测方法
+        """
+        # 解码计时只包含取样器取帧的时间
+        frames = self.profiler.iterate('decode', sampler)
+        detector = None
+        if self.scene_method:
+            from scene_detector import SceneDetector
+
+            detector = SceneDetector(self.scene_threshold, self.scene_method, self.scene_settle,
+                                     regions=self.regions, profiler=self.profiler)
+            frames = detector.filter(frames)
+        try:
+            yield from self._iter_texts(frames, method)
+        finally:
+            if detector is not None:
+                self.scene_stats = detector.stats()
+                logger.info(f"场景预筛: 候选变化点 {detector.candidates} 个，"
+                            f"分析 {detector.analyzed} 帧，跳过 {detector.skipped} 帧")
+        
+    def _iter_texts(self, frames, method: str):
+        """
+        产出 (帧编号, 帧, 文字)，仅在需要文字检测时进行OCR
+        :param frames: (帧编号, 帧) 可迭代对象
+        :param method: 检测方法
+        """
+        if method not in ("text", "combined"):
+            for frame_index, frame in frames:
+                yield frame_index, frame, None
+            return
+        from ocr_gate import OCRGate
+        from ocr_pool import iter_frame_texts
+
+        # 画面与上一次OCR的帧几乎相同时跳过OCR，复用上次的文字
+        gate = OCRGate(self.ocr_gate_threshold, regions=self.regions) if self.ocr_gate_threshold > 0 else None
+        # 配置了OCR工作进程时，解码与识别并行，结果按帧顺序返回
+        yield from iter_frame_texts(frames, self._to_ocr_image, self._extract_text_from_array,
+                                    self.ocr_workers, self.ocr_queue_depth, self.ocr_backend,
+                                    gate, self.ocr_cache, self.ocr_min_confidence, self.ocr_lang)
+        self._log_ocr_stats(gate)
+        
+    def _to_ocr_image(self, frame: np.ndarray) -> np.ndarray:
+        """截取识别区域并将BGR转换为OCR使用的RGB图像，分析流的灰度帧直接使用"""
+        with self.profiler.stage('convert'):
+            region = self.regions.apply(frame)
+            if region.ndim == 2:
+                return region
+            if self.buffers is not None and self.ocr_workers <= 0:
+                # 同步识别时图像用完即弃，可以复用缓冲区；工作进程异步序列化图像，不能复用
+                return self.buffers.rgb(region)
+            return cv2.cvtColor(region, cv2.COLOR_BGR2RGB)
+        
+    def _analysis_gray(self, frame: np.ndarray) -> np.ndarray:
+        """截取识别区域并转换为分析分辨率的灰度图，内存预算模式下写入复用的缓冲区"""
+        region = self.regions.apply(frame)
+        if self.buffers is not None:
+            return self.buffers.analysis_gray(region, self.analysis_width)
+        return to_analysis_gray(region, self.analysis_width)
+        
+    def _keep_reference(self, gray_frame: np.ndarray) -> np.ndarray:
+        """保留为参考帧，缓冲区会被下一帧覆盖，内存预算模式下复制一份分析尺寸的灰度图"""
+        return gray_frame.copy() if self.buffers is not None else gray_frame
+        
+    def _check_text_change(self, frame: np.ndarray, current_text: Optional[str] = None) -> bool:
         """
         检查帧中的文字是否发生变化
         :param frame: 视频帧
+        :param current_text: 已识别的文字，为None时在此处识别
         :return: 是否有文字变化
         """
-        # 将BGR转换为RGB
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        pil_image = Image.fromarray(rgb_frame)
-        
         # 提取文字
-        current_text = self.extract_text_from_image(pil_image)
+        if current_text is None:
+            current_text = self._extract_text_from_array(self._to_ocr_image(frame))
         
         # 检查文字是否发生变化
         has_changed = self.has_text_changed(current_text)
@@ -108,103 +274,68 @@ class AdvancedVideoProcessor:
             
         return has_changed
         
-    def _check_image_change(self, frame: np.ndarray, threshold: float = 0.95) -> bool:
-        """
-        检查帧图像是否发生变化
-        :param frame: 视频帧
-        :param threshold: 相似度阈值
-        :return: 是否有图像变化
-        """
-        # 转换为灰度图
-        gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    def _average_hash(self, gray_frame: np.ndarray) -> 'imagehash.ImageHash':
+        """计算灰度分析帧的平均哈希，不经过PIL转换；逐帧处理时每个取样帧都要立即决策，只能单帧计算"""
+        import imagehash
+        from frame_hash import average_hash_batch
+
+        with self.profiler.stage('hash'):
+            return imagehash.ImageHash(average_hash_batch(gray_frame)[0])
         
-        # 如果是第一帧
+    def _checkpoint_params(self) -> dict:
+        """影响取样帧和比较基准（分析灰度图的尺寸）的参数，继续时必须与检查点一致"""
+        return {
+            **super()._checkpoint_params(),
+            'analysis_width': self.analysis_width,
+            'analysis_stream': self.analysis_stream,
+        }
+        
+    def _reference_state(self) -> dict:
+        """检查点中保存图像比较的参考帧及其哈希"""
         if self.previous_frame is None:
-            self.previous_frame = gray_frame
-            self.previous_hash = imagehash.average_hash(Image.fromarray(gray_frame))
-            return True
-            
-        # 计算结构相似性指数
-        try:
-            similarity, _ = ssim(self.previous_frame, gray_frame, full=True)
-            # 如果相似度低于阈值，则认为有变化
-            has_changed = similarity < threshold
-            
-            if has_changed:
-                self.previous_frame = gray_frame
-                self.previous_hash = imagehash.average_hash(Image.fromarray(gray_frame))
-                
-            return has_changed
-        except Exception as e:
-            logger.warning(f"图像相似性计算失败: {e}")
-            # 使用哈希方法作为备选
-            current_hash = imagehash.average_hash(Image.fromarray(gray_frame))
-            hash_diff = self.previous_hash - current_hash
-            has_changed = hash_diff > 10  # 哈希差异阈值
-            
-            if has_changed:
-                self.previous_frame = gray_frame
-                self.previous_hash = current_hash
-                
-            return has_changed
+            return {}
+        return {'previous_frame': self.previous_frame, 'previous_hash': str(self.previous_hash)}
         
-    def extract_text_from_image(self, image: Image.Image) -> str:
-        """
-        从图像中提取文字
-        :param image: PIL图像对象
-        :return: 提取的文字
-        """
-        try:
-            # 使用pytesseract进行OCR识别
-            text = pytesseract.image_to_string(image, lang='chi_sim+eng')
-            return text.strip()
-        except Exception as e:
-            logger.error(f"OCR识别失败: {e}")
-            return ""
-            
-    def has_text_changed(self, current_text: str) -> bool:
+    def _restore_reference_state(self, state: dict):
+        """从检查点恢复图像比较的参考帧及其哈希"""
+        if 'previous_frame' in state:
+            import imagehash
+
+            self.previous_frame = state['previous_frame']
+            self.previous_hash = imagehash.hex_to_hash(state['previous_hash'])
+        
+    def _locate_change(self, previous_sample: Optional[Tuple[int, np.ndarray]],
+                       frame_index: int, frame: np.ndarray) -> Tuple[int, np.ndarray]:
         """
-        检查文字是否发生变化
-        :param current_text: 当前帧提取的文字
-        :return: 是否发生变化
+        定位切换帧，使用分析流时返回的是原始分辨率的彩色帧
+        :param previous_sample: 上一个取样 (帧编号, 帧)
+        :param frame_index: 当前取样的帧编号
+        :param frame: 当前取样的帧
+        :return: 切换帧 (帧编号, 帧)
         """
-        # 如果是第一帧，认为有变化
-        if not self.previous_text:
-            return True
-            
-        # 比较文字内容（去除空白字符后）
-        return current_text.strip() != self.previous_text.strip()
+        # 二分查找读取的中间帧本身就是原始彩色帧
+        change_index, change_frame = super()._locate_change(previous_sample, frame_index, frame)
+        if self.frame_fetcher is not None and change_frame.ndim == 2:
+            with self.profiler.stage('decode'):
+                original = self.frame_fetcher.read(change_index)
+            if original is not None:
+                change_frame = original
+            else:
+                logger.warning(f"无法读取第 {change_index} 帧的原始画面，保存分析帧")
+        return change_index, change_frame
         
-    def save_screenshot(self, frame: np.ndarray, frame_number: int) -> str:
+    def _release_resources(self, cap: cv2.VideoCapture):
         """
-        保存截图
-        :param frame: 视频帧
-        :param frame_number: 帧编号
-        :return: 截图文件路径
+        处理结束或中断时释放资源，包括读取原始帧的视频对象
+        :param cap: 视频对象
         """
-        self.screenshot_count += 1
-        filename = f"{self.video_name}_截图_{self.screenshot_count:03d}.png"
-        screenshot_path = os.path.join(self.output_dir, filename)
+        super()._release_resources(cap)
+        self._close_fetcher()
         
-        # 确保输出目录存在
-        os.makedirs(self.output_dir, exist_ok=True)
+    def _profile_counts(self) -> dict:
+        """性能报告中附带OCR和场景预筛的计数"""
+        return {**self.ocr_stats, **self.scene_stats}
         
-        # 保存图像并检查是否成功
-        # 使用PIL保存图像，因为它能正确处理中文路径
-        try:
-            # 将BGR转换为RGB
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            pil_image = Image.fromarray(rgb_frame)
-            pil_image.save(screenshot_path, 'PNG')
-            success = True
-        except Exception as e:
-            success = False
-            logger.error(f"保存截图失败: {screenshot_path}, 错误: {e}")
-        
-        if not success:
-            logger.error(f"保存截图失败: {screenshot_path}")
-        return screenshot_path
-
     def process_video(self, interval: float = 1.0, method: str = "combined") -> List[str]:
         """
         处理视频并提取变化的截图
@@ -227,7 +358,7 @@ class AdvancedVideoProcessor:
         logger.info(f"开始处理视频: {self.video_path}")
         
         # 打开视频文件
-        cap = cv2.VideoCapture(self.video_path)
+        cap = self._open_video(method)
         if not cap.isOpened():
             logger.error(f"无法打开视频文件: {self.video_path}")
             return []
@@ -235,42 +366,392 @@ class AdvancedVideoProcessor:
         fps = cap.get(cv2.CAP_PROP_FPS)
         # 确保frame_interval至少为1，避免除零错误
         frame_interval = max(1, int(fps * interval))  # 帧间隔
-        frame_count = 0
+        dispatched = self._dispatch_extraction(cap, fps, frame_interval, interval, method,
+                                               similarity_threshold, hash_threshold)
+        if dispatched is not None:
+            return dispatched
         saved_screenshots = []
+        self._create_refiner(fps)
         
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-                
-            # 按指定间隔处理帧
-            if frame_count % frame_interval == 0:
+        # 定期保存检查点，中断后可以从检查点继续
+        checkpoint = self._open_checkpoint()
+        start_frame = self._resume_from_checkpoint(checkpoint, method, frame_interval, saved_screenshots)
+        end_frame = None
+        if self.segment is not None:
+            start_frame, _, end_frame = self.segment
+        last_frame = None
+        # 最后处理完的取样帧对应的检测状态，检测时先更新状态再保存截图，中断时检查点回退到这里
+        last_state = None
+        completed = False
+        
+        # 跳过的帧只grab不解码转换，间隔较大时直接跳转；自适应取样时画面不变则逐步加大间隔
+        max_frame_interval = int(fps * self.max_interval) if self.max_interval else None
+        sampler = create_sampler(cap, frame_interval, self.sampling_strategy, max_frame_interval, self.regions,
+                                 start_frame, end_frame, self._gop_size())
+        start_time = time.perf_counter()
+        # 截图在后台线程中编码写盘，队列满时阻塞解码循环
+        self.writer = ScreenshotWriter(self.output_dir, self.writer_threads, self.writer_queue_size,
+                                       self.encoder, self.profiler)
+        try:
+            for frame_count, event in self._iter_decisions(sampler, fps, method, similarity_threshold,
+                                                           hash_threshold):
+                self._report_progress(frame_count, sampler.total_frames)
+                if event is not None:
+                    self._save_event(event, saved_screenshots)
+                last_frame = frame_count
+                last_state = self._detection_state()
+                if checkpoint is not None and checkpoint.due():
+                    self._save_checkpoint(checkpoint, method, frame_interval, frame_count + frame_interval,
+                                          saved_screenshots, last_state)
+            completed = True
+        finally:
+            self._release_resources(cap)
+            if not completed:
+                self._save_interrupt_checkpoint(checkpoint, method, frame_interval, last_frame, saved_screenshots,
+                                                last_state)
+        if checkpoint is not None:
+            checkpoint.remove()
+        self._report_progress(sampler.total_frames, sampler.total_frames)
+        sampler.log_stats()
+        self.sampling_stats = sampler.stats()
+        self._finish_profile(time.perf_counter() - start_time, len(saved_screenshots))
+        logger.info(f"处理完成，共保存 {len(saved_screenshots)} 张截图")
+        return saved_screenshots
+        
+    def _dispatch_extraction(self, cap: cv2.VideoCapture, fps: float, frame_interval: int, interval: float,
+                             method: str, similarity_threshold: float, hash_threshold: int) -> Optional[List[str]]:
+        """
+        使用分析索引或分段并行处理时交给对应的流程，返回截图路径列表；都不使用时返回None，按顺序逐帧处理
+        :param cap: 已打开的视频对象
+        :param fps: 视频帧率
+        :param frame_interval: 取样帧间隔
+        :param interval: 处理帧的时间间隔（秒）
+        :param method: 检测方法
+        :param similarity_threshold: 图像相似度阈值
+        :param hash_threshold: 哈希差异阈值
+        """
+        if self.analysis_index:
+            # 在分析索引上重放决策，只解码需要保存的帧
+            return self._extract_frames_from_index(cap, fps, frame_interval, method,
+                                                   similarity_threshold, hash_threshold)
+        plan = self._plan_segments(cap, fps, frame_interval)
+        if len(plan) > 1:
+            cap.release()
+            return self._extract_frames_in_segments(plan, interval, method, similarity_threshold, hash_threshold)
+        return None
+        
+    def _save_event(self, event: ChangeEvent, saved_screenshots: List[str]):
+        """
+        保存变化事件的截图，开启定位时保存的是两次取样之间的确切切换帧
+        :param event: 变化事件
+        :param saved_screenshots: 已保存的截图路径，保存后追加
+        """
+        screenshot_path = self.save_screenshot(event.frame, event.frame_index)
+        saved_screenshots.append(screenshot_path)
+        self.screenshot_times.append(event.timestamp)
+        logger.info(f"检测到变化，已保存截图: {screenshot_path} ({event.timestamp:.2f}秒)")
+        if self.segment is not None and self.segment_first_state is None:
+            self.segment_first_state = (self.previous_frame, self.previous_text)
+        
+    def iter_changes(self, interval: float = 1.0, method: str = "combined", similarity_threshold: float = 0.95,
+                     hash_threshold: int = 10) -> Iterator[ChangeEvent]:
+        """
+        逐个产出检测到的变化，不读写任何文件（不保存截图、不创建输出目录、不使用OCR磁盘缓存），
+        调用方可以随时停止迭代，停止时视频对象等资源随之释放。
+        分析索引、分段并行和检查点继续都需要读写文件，这里不使用，设置了这些选项时记录警告
+        :param interval: 处理帧的时间间隔（秒）
+        :param method: 检测方法 ("text", "image", "combined")
+        :param similarity_threshold: 图像相似度阈值
+        :param hash_threshold: 哈希差异阈值
+        :return: 变化事件迭代器
+        """
+        ignored = [name for name, enabled in (('analysis_index', self.analysis_index),
+                                              ('segments', self.segments > 1),
+                                              ('resume', self.resume)) if enabled]
+        if ignored:
+            logger.warning(f"iter_changes 不使用以下选项: {', '.join(ignored)}")
+        cap = self._open_video(method)
+        if not cap.isOpened():
+            logger.error(f"无法打开视频文件: {self.video_path}")
+            return
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        frame_interval = max(1, int(fps * interval))
+        # 迭代期间不使用OCR磁盘缓存，结束后恢复
+        ocr_cache, self.ocr_cache = self.ocr_cache, None
+        # 每次迭代从头开始检测，结束后恢复检测状态，不影响之后在同一对象上提取截图
+        saved_state = (self.previous_frame, self.previous_hash, self.previous_text, self.screenshot_count)
+        self.previous_frame = None
+        self.previous_hash = None
+        self.previous_text = ""
+        self._create_refiner(fps)
+        max_frame_interval = int(fps * self.max_interval) if self.max_interval else None
+        sampler = create_sampler(cap, frame_interval, self.sampling_strategy, max_frame_interval, self.regions,
+                                 gop_size=self._gop_size())
+        try:
+            for frame_count, event in self._iter_decisions(sampler, fps, method, similarity_threshold,
+                                                           hash_threshold):
+                self._report_progress(frame_count, sampler.total_frames)
+                if event is not None:
+                    yield event
+        finally:
+            self._release_resources(cap)
+            self.ocr_cache = ocr_cache
+            self.previous_frame, self.previous_hash, self.previous_text, self.screenshot_count = saved_state
+            self.sampling_stats = sampler.stats()
+        
+    def _iter_decisions(self, sampler: FrameSampler, fps: float, method: str, similarity_threshold: float,
+                        hash_threshold: int) -> Iterator[Tuple[int, Optional[ChangeEvent]]]:
+        """
+        对每个取样帧做变化检测，产出 (帧编号, 变化事件)，没有变化时事件为None
+        :param sampler: 帧取样器
+        :param fps: 视频帧率
+        :param method: 检测方法
+        :param similarity_threshold: 图像相似度阈值
+        :param hash_threshold: 哈希差异阈值
+        """
+        previous_sample = None
+        for frame_count, frame, current_text in self._iter_samples(sampler, method):
+            should_save = False
+            self.last_similarity = None
+        
+            if method == "text":
+                # 基于文字变化检测
+                should_save = self._check_text_change(frame, current_text)
+            elif method == "image":
+                # 基于图像变化检测
+                should_save = self._check_image_change_with_thresholds(frame, similarity_threshold, hash_threshold)
+            elif method == "combined":
+                # 结合文字和图像变化检测
+                text_change = self._check_text_change(frame, current_text)
+                image_change = self._check_image_change_with_thresholds(frame, similarity_threshold, hash_threshold)
+                should_save = text_change or image_change
+            
+            if should_save and self.segment is not None and frame_count < self.segment[1]:
+                # 分段处理的预热阶段只更新检测状态，不保存截图
                 should_save = False
-                
-                if method == "text":
-                    # 基于文字变化检测
-                    should_save = self._check_text_change(frame)
-                elif method == "image":
-                    # 基于图像变化检测
-                    should_save = self._check_image_change_with_thresholds(frame, similarity_threshold, hash_threshold)
-                elif method == "combined":
-                    # 结合文字和图像变化检测
-                    text_change = self._check_text_change(frame)
-                    image_change = self._check_image_change_with_thresholds(frame, similarity_threshold, hash_threshold)
-                    should_save = text_change or image_change
-                
-                if should_save:
-                    # 保存截图
-                    screenshot_path = self.save_screenshot(frame, frame_count)
-                    saved_screenshots.append(screenshot_path)
-                    logger.info(f"检测到变化，已保存截图: {screenshot_path}")
-                    
-            frame_count += 1
             
-        cap.release()
+            event = None
+            if should_save:
+                # 开启定位时取两次取样之间的确切切换帧
+                change_index, change_frame = self._locate_change(previous_sample, frame_count, frame)
+                event = ChangeEvent(change_index, change_index / fps if fps else 0.0, change_frame,
+                                    current_text, self.last_similarity)
+            if self.refiner is not None:
+                # 只有切换帧定位需要上一个取样的整帧
+                previous_sample = (frame_count, frame)
+            yield frame_count, event
+        
+    def _plan_segments(self, cap: cv2.VideoCapture, fps: float, frame_interval: int) -> list:
+        """
+        规划分段并行处理的时间段，不分段时返回空列表
+        :param cap: 已打开的视频对象
+        :param fps: 视频帧率
+        :param frame_interval: 取样帧间隔
+        :return: 时间段列表
+        """
+        if self.segments <= 1 or self.segment is not None:
+            return []
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        if total_frames <= 0 or fps <= 0:
+            logger.warning("无法获取视频总帧数，不分段处理")
+            return []
+        from video_segments import plan_segments
+
+        return plan_segments(total_frames, frame_interval, self.segments, int(fps * self.segment_overlap))
+        
+    def _extract_frames_in_segments(self, plan: list, interval: float, method: str,
+                                    similarity_threshold: float, hash_threshold: int) -> List[str]:
+        """
+        各时间段在独立进程中处理，之后按时间顺序拼接：
+        传递段边界的检测状态，删除重复截图，按时间重新编号
+        :param plan: 时间段列表
+        :param interval: 处理帧的时间间隔（秒）
+        :param method: 检测方法
+        :param similarity_threshold: 图像相似度阈值
+        :param hash_threshold: 哈希差异阈值
+        :return: 截图文件路径列表
+        """
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        from video_segments import remove_segment_dirs, renumber_screenshots, run_segment, segment_dir, stitch_segments
+
+        logger.info(f"分 {len(plan)} 段并行处理")
+        start_time = time.perf_counter()
+        results = [None] * len(plan)
+        try:
+            with ProcessPoolExecutor(max_workers=len(plan)) as executor:
+                futures = {}
+                for i, segment in enumerate(plan):
+                    future = executor.submit(run_segment, self.video_path, self.options, segment,
+                                             segment_dir(self.output_dir, i), interval, method,
+                                             similarity_threshold, hash_threshold)
+                    futures[future] = i
+                # 进度按完成的段数汇报
+                for done, future in enumerate(as_completed(futures), 1):
+                    results[futures[future]] = future.result()
+                    self._report_progress(done, len(plan))
+            screenshots, timestamps, state = stitch_segments(results, method, similarity_threshold, hash_threshold,
+                                                                self.text_similarity)
+            saved_screenshots, self.screenshot_times = renumber_screenshots(
+                screenshots, timestamps, self.output_dir, self.video_name, self.encoder.extension)
+        finally:
+            remove_segment_dirs(self.output_dir, len(plan))
+        self.screenshot_count = len(saved_screenshots)
+        if state is not None:
+            self.previous_frame, self.previous_text = state
+        self.save_errors = [error for result in results for error in result['save_errors']]
+        logger.info(f"分段处理完成，耗时 {time.perf_counter() - start_time:.1f} 秒，"
+                    f"共保存 {len(saved_screenshots)} 张截图")
+        return saved_screenshots
+        
+    def _extract_frames_from_index(self, cap: cv2.VideoCapture, fps: float, frame_interval: int, method: str,
+                                   similarity_threshold: float, hash_threshold: int) -> List[str]:
+        """
+        使用分析索引提取截图：索引不存在或与当前参数不一致时先分析一遍视频建立索引，
+        然后按阈值重放决策，只跳转解码需要保存的帧
+        :param cap: 已打开的视频对象
+        :param fps: 视频帧率
+        :param frame_interval: 取样帧间隔
+        :param method: 检测方法
+        :param similarity_threshold: 图像相似度阈值
+        :param hash_threshold: 哈希差异阈值
+        :return: 截图文件路径列表
+        """
+        saved_screenshots = []
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        self._create_refiner(fps)
+        start_time = time.perf_counter()
+        self.writer = ScreenshotWriter(self.output_dir, self.writer_threads, self.writer_queue_size,
+                                       self.encoder, self.profiler)
+        try:
+            index = self._load_or_build_index(cap, fps, frame_interval, method)
+            positions = index.replay(method, similarity_threshold, hash_threshold, self.text_similarity,
+                                     self._index_pair_similarity(cap, fps, index))
+            logger.info(f"按阈值重放分析索引: {len(index)} 个取样帧中 {len(positions)} 个需要截图")
+            for position in positions:
+                frame_index = int(index.frame_indices[position])
+                frame = self._read_frame_at(cap, fps, frame_index)
+                if frame is None:
+                    logger.warning(f"无法读取第 {frame_index} 帧，跳过")
+                    continue
+                previous_sample = None
+                if self.refiner is not None and position > 0:
+                    previous_index = int(index.frame_indices[position - 1])
+                    previous_frame = self._read_frame_at(cap, fps, previous_index)
+                    if previous_frame is not None:
+                        previous_sample = (previous_index, previous_frame)
+                change_index, change_frame = self._locate_change(previous_sample, frame_index, frame)
+                screenshot_path = self.save_screenshot(change_frame, change_index)
+                saved_screenshots.append(screenshot_path)
+                self.screenshot_times.append(change_index / fps if fps else 0.0)
+                logger.info(f"检测到变化，已保存截图: {screenshot_path} ({self.screenshot_times[-1]:.2f}秒)")
+                self._report_progress(frame_index, total_frames)
+        finally:
+            self._release_resources(cap)
+        self._report_progress(total_frames, total_frames)
+        self._finish_profile(time.perf_counter() - start_time, len(saved_screenshots))
         logger.info(f"处理完成，共保存 {len(saved_screenshots)} 张截图")
         return saved_screenshots
         
+    def _load_or_build_index(self, cap: cv2.VideoCapture, fps: float, frame_interval: int,
+                             method: str) -> 'AnalysisIndex':
+        """
+        读取分析索引，不可用时分析视频并保存索引
+        :param cap: 已打开的视频对象
+        :param fps: 视频帧率
+        :param frame_interval: 取样帧间隔
+        :param method: 检测方法，需要文字检测时索引中必须有OCR文字
+        :return: 分析索引
+        """
+        from analysis_index import AnalysisIndex, IndexBuilder, index_path_for, video_signature
+
+        max_frame_interval = int(fps * self.max_interval) if self.max_interval else None
+        # 影响取样帧和帧特征的参数都记录在索引中，任何一项变化都需要重建
+        params = {
+            **video_signature(self.video_path),
+            'frame_interval': frame_interval,
+            'sampling_strategy': self.sampling_strategy,
+            'max_frame_interval': max_frame_interval,
+            'roi': [list(roi) for roi in self.regions.rois],
+            'scene': [self.scene_method, self.scene_threshold, self.scene_settle],
+            'ocr_backend': self.ocr_backend,
+            'ocr_min_confidence': self.ocr_min_confidence,
+            'ocr_lang': self.ocr_lang,
+            'analysis_stream': self.analysis_stream,
+            'analysis_width': self.analysis_width,
+        }
+        with_text = method in ("text", "combined")
+        path = self.index_path or index_path_for(self.video_path)
+        index = AnalysisIndex.load(path)
+        if index is not None and index.params == params and (index.has_text or not with_text):
+            logger.info(f"使用分析索引: {path}（{len(index)} 个取样帧）")
+            return index
+        
+        logger.info("建立分析索引...")
+        builder = IndexBuilder(params, fps, with_text)
+        sampler = create_sampler(cap, frame_interval, self.sampling_strategy, max_frame_interval, self.regions,
+                                 gop_size=self._gop_size())
+        for frame_index, frame, text in self._iter_samples(sampler, "combined" if with_text else "image"):
+            self._report_progress(frame_index, sampler.total_frames)
+            with self.profiler.stage('index'):
+                # 哈希和相邻取样帧的SSIM使用与逐帧处理相同的分析灰度图，索引中只保存小缩略图
+                builder.add(frame_index, self._keep_reference(self._analysis_gray(frame)), text)
+        sampler.log_stats()
+        self.sampling_stats = sampler.stats()
+        index = builder.build()
+        try:
+            index.save(path)
+            logger.info(f"分析索引已保存到: {path}")
+        except OSError as e:
+            logger.warning(f"保存分析索引失败: {e}")
+        return index
+        
+    def _index_pair_similarity(self, cap: cv2.VideoCapture, fps: float,
+                               index: 'AnalysisIndex') -> Callable[[int, int], Optional[float]]:
+        """
+        重放时按分析分辨率计算两个取样位置之间的SSIM，只解码索引核对时需要的帧；
+        上一张截图的分析灰度图会与之后的多个取样帧比较，缓存最近一次解码的结果
+        :param cap: 已打开的视频对象
+        :param fps: 视频帧率
+        :param index: 分析索引
+        :return: 计算SSIM的函数，无法读取帧或无法计算时返回None
+        """
+        from skimage.metrics import structural_similarity as ssim
+
+        cache = {}
+
+        def analysis_gray_at(position: int) -> Optional[np.ndarray]:
+            if position not in cache:
+                frame = self._read_frame_at(cap, fps, int(index.frame_indices[position]))
+                if len(cache) >= 2:
+                    cache.pop(next(iter(cache)))
+                cache[position] = None if frame is None else self._keep_reference(self._analysis_gray(frame))
+            return cache[position]
+
+        def pair_similarity(reference: int, position: int) -> Optional[float]:
+            reference_gray = analysis_gray_at(reference)
+            gray_frame = analysis_gray_at(position)
+            if reference_gray is None or gray_frame is None:
+                return None
+            try:
+                with self.profiler.stage('ssim'):
+                    return float(ssim(reference_gray, gray_frame))
+            except Exception:
+                return None
+
+        return pair_similarity
+        
+    def _read_frame_at(self, cap: cv2.VideoCapture, fps: float, frame_index: int) -> Optional[np.ndarray]:
+        """按时间戳跳转并读取指定帧，使用分析流时读取原始彩色帧"""
+        with self.profiler.stage('decode'):
+            if self.frame_fetcher is not None:
+                return self.frame_fetcher.read(frame_index)
+            if fps > 0:
+                cap.set(cv2.CAP_PROP_POS_MSEC, frame_index * 1000.0 / fps)
+            else:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+            ret, frame = cap.read()
+        return frame if ret else None
+        
     def _check_image_change_with_thresholds(self, frame: np.ndarray, similarity_threshold: float = 0.95, hash_threshold: int = 10) -> bool:
         """
         检查帧图像是否发生变化（支持自定义阈值）
@@ -279,104 +760,44 @@ class AdvancedVideoProcessor:
         :param hash_threshold: 哈希差异阈值
         :return: 是否有图像变化
         """
-        # 转换为灰度图
-        gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        # 截取识别区域并转换为分析分辨率的灰度图，SSIM和哈希共用
+        with self.profiler.stage('convert'):
+            gray_frame = self._analysis_gray(frame)
         
         # 如果是第一帧
         if self.previous_frame is None:
-            self.previous_frame = gray_frame
-            self.previous_hash = imagehash.average_hash(Image.fromarray(gray_frame))
+            self.previous_frame = self._keep_reference(gray_frame)
+            self.previous_hash = self._average_hash(gray_frame)
             return True
             
         # 计算结构相似性指数
         try:
-            similarity, _ = ssim(self.previous_frame, gray_frame, full=True)
+            # 只需要平均相似度，不生成完整的相似度图
+            from skimage.metrics import structural_similarity as ssim
+
+            with self.profiler.stage('ssim'):
+                similarity = ssim(self.previous_frame, gray_frame)
+            self.last_similarity = float(similarity)
             # 如果相似度低于阈值，则认为有变化
             has_changed = similarity < similarity_threshold
             
             if has_changed:
-                self.previous_frame = gray_frame
-                self.previous_hash = imagehash.average_hash(Image.fromarray(gray_frame))
+                self.previous_frame = self._keep_reference(gray_frame)
+                self.previous_hash = self._average_hash(gray_frame)
                 
             return has_changed
         except Exception as e:
             logger.warning(f"图像相似性计算失败: {e}")
             # 使用哈希方法作为备选
-            current_hash = imagehash.average_hash(Image.fromarray(gray_frame))
+            current_hash = self._average_hash(gray_frame)
             hash_diff = self.previous_hash - current_hash
             has_changed = hash_diff > hash_threshold  # 哈希差异阈值
             
             if has_changed:
-                self.previous_frame = gray_frame
+                self.previous_frame = self._keep_reference(gray_frame)
                 self.previous_hash = current_hash
                 
             return has_changed
-        
-    def extract_text_from_image(self, image: Image.Image) -> str:
-        """
-        从图像中提取文字
-        :param image: PIL图像对象
-        :return: 提取的文字
-        """
-        try:
-            # 使用pytesseract进行OCR识别
-            text = pytesseract.image_to_string(image, lang='chi_sim+eng')
-            return text.strip()
-        except Exception as e:
-            logger.error(f"OCR识别失败: {e}")
-            return ""
-            
-    def has_text_changed(self, current_text: str) -> bool:
-        """
-        检查文字是否发生变化
-        :param current_text: 当前帧提取的文字
-        :return: 是否发生变化
-        """
-        # 如果是第一帧，认为有变化
-        if not self.previous_text:
-            return True
-            
-        # 比较文字内容（去除空白字符后）
-        return current_text.strip() != self.previous_text.strip()
-        
-    def save_screenshot(self, frame: np.ndarray, frame_number: int) -> str:
-        """
-        保存截图
-        :param frame: 视频帧
-        :param frame_number: 帧编号
-        :return: 截图文件路径
-        """
-        self.screenshot_count += 1
-        filename = f"{self.video_name}_截图_{self.screenshot_count:03d}.png"
-        screenshot_path = os.path.join(self.output_dir, filename)
-        
-        # 确保输出目录存在
-        os.makedirs(self.output_dir, exist_ok=True)
-        
-        # 保存图像并检查是否成功
-        # 使用PIL保存图像，因为它能正确处理中文路径
-        try:
-            # 将BGR转换为RGB
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            pil_image = Image.fromarray(rgb_frame)
-            pil_image.save(screenshot_path, 'PNG')
-            success = True
-        except Exception as e:
-            success = False
-            logger.error(f"保存截图失败: {screenshot_path}, 错误: {e}")
-        
-        if not success:
-            logger.error(f"保存截图失败: {screenshot_path}")
-        return screenshot_path
-
-    def process_video(self, interval: float = 1.0, method: str = "combined") -> List[str]:
-        """
-        处理视频并提取变化的截图
-        :param interval: 处理帧的时间间隔（秒）
-        :param method: 检测方法 ("text", "image", "combined")
-        :return: 截图文件路径列表
-        """
-        return self.extract_frames_with_changes(interval, method)
 
 
 def main():
@@ -0,0 +1,258 @@
+import os
+import json
+import hashlib
+import logging
+from typing import Callable, List, Optional
+
+import numpy as np
+from skimage.metrics import structural_similarity as ssim
+
+from text_compare import DEFAULT_TEXT_SIMILARITY, text_changed
+from frame_hash import average_hash_batch, average_hash_input, pack_hashes
+from frame_analysis import to_analysis_gray
+
+logger = logging.getLogger(__name__)
+
+# 索引文件格式版本，格式或特征计算方式变化时旧索引将被重建
+INDEX_VERSION = 4
+
+# 索引中缩略图的宽度（像素），与分析分辨率无关，长视频的索引也只占很少的内存和磁盘
+THUMBNAIL_WIDTH = 96
+
+# 非相邻取样帧的缩略图SSIM与阈值相差不到这个值时，用分析分辨率重新计算SSIM
+VERIFY_MARGIN = 0.05
+
+
+def default_index_dir() -> str:
+    """
+    默认索引目录：PathConfig.TEMP_DIR 下的 analysis_index
+    :return: 索引目录
+    """
+    try:
+        from config import PathConfig
+        temp_dir = PathConfig.TEMP_DIR
+    except ImportError:
+        temp_dir = os.path.join(os.path.expanduser('~'), '.video_processor', 'temp')
+    return os.path.join(temp_dir, 'analysis_index')
+
+
+def index_path_for(video_path: str, index_dir: Optional[str] = None) -> str:
+    """
+    每个视频一个索引文件，文件名包含视频名和完整路径的哈希，不同目录下的同名视频互不覆盖
+    :param video_path: 视频文件路径
+    :param index_dir: 索引目录，默认为 default_index_dir()
+    :return: 索引文件路径
+    """
+    video_path = os.path.abspath(video_path)
+    digest = hashlib.blake2b(video_path.encode('utf-8'), digest_size=8).hexdigest()
+    name = os.path.splitext(os.path.basename(video_path))[0]
+    return os.path.join(index_dir or default_index_dir(), f"{name}_{digest}.index.npz")
+
+
+def video_signature(video_path: str) -> dict:
+    """
+    视频文件的标识（路径、大小、修改时间），文件变化后索引失效
+    :param video_path: 视频文件路径
+    :return: 标识字典
+    """
+    stat = os.stat(video_path)
+    return {'video_path': os.path.abspath(video_path), 'size': stat.st_size, 'mtime': stat.st_mtime}
+
+
+class AnalysisIndex:
+    """
+    视频分析索引：每个取样帧的帧编号、时间戳、灰度缩略图、平均哈希、与上一取样帧的SSIM和OCR文字
+    哈希和相邻取样帧的SSIM在分析灰度图（宽度为处理器的analysis_width）上计算，与逐帧处理相同；
+    只保存固定宽度的小缩略图，用于估计非相邻取样帧之间的SSIM，接近阈值时再按分析分辨率重新计算。
+    分析一次后，任意相似度/哈希阈值的截图决策都可以在索引上重放，
+    不必重新解码整个视频，只需要解码最终保存的帧和少数需要核对的帧
+    """
+
+    def __init__(self, params: dict, frame_indices: np.ndarray, timestamps: np.ndarray,
+                 thumbnails: np.ndarray, hashes: np.ndarray, ssim_previous: np.ndarray,
+                 texts: Optional[List[str]] = None):
+        """
+        :param params: 生成索引时的视频标识和处理参数，参数不一致时索引不可用
+        :param frame_indices: 取样帧编号
+        :param timestamps: 取样帧时间戳（秒）
+        :param thumbnails: 识别区域的灰度缩略图 (N, H, W)，宽度不超过THUMBNAIL_WIDTH
+        :param hashes: 分析灰度图的64位平均哈希，按位打包为 (N, 8)
+        :param ssim_previous: 与上一取样帧的SSIM，第一帧或无法计算时为NaN
+        :param texts: OCR文字，未做OCR时为None
+        """
+        self.params = params
+        self.frame_indices = frame_indices
+        self.timestamps = timestamps
+        self.thumbnails = thumbnails
+        self.hashes = hashes
+        self.ssim_previous = ssim_previous
+        self.texts = texts
+
+    def __len__(self) -> int:
+        return len(self.frame_indices)
+
+    @property
+    def has_text(self) -> bool:
+        return self.texts is not None
+
+    def save(self, path: str):
+        """
+        保存索引，先写临时文件再替换
+        :param path: 索引文件路径
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        meta = {'version': INDEX_VERSION, 'params': self.params, 'has_text': self.has_text}
+        arrays = {
+            'frame_indices': self.frame_indices,
+            'timestamps': self.timestamps,
+            'thumbnails': self.thumbnails,
+            'hashes': self.hashes,
+            'ssim_previous': self.ssim_previous,
+        }
+        if self.texts is not None:
+            arrays['texts'] = np.array(self.texts, dtype=str)
+        temp_path = path + ".tmp"
+        with open(temp_path, 'wb') as f:
+            np.savez_compressed(f, meta=np.array(json.dumps(meta, ensure_ascii=False)), **arrays)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional['AnalysisIndex']:
+        """
+        读取索引
+        :param path: 索引文件路径
+        :return: 索引，不存在、无法读取或版本不兼容时返回None
+        """
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data['meta']))
+                if meta.get('version') != INDEX_VERSION:
+                    logger.warning(f"分析索引版本不兼容，将重建: {path}")
+                    return None
+                texts = [str(text) for text in data['texts']] if meta['has_text'] else None
+                return cls(meta['params'], data['frame_indices'], data['timestamps'], data['thumbnails'],
+                           data['hashes'], data['ssim_previous'], texts)
+        except Exception as e:
+            logger.warning(f"无法读取分析索引 {path}: {e}")
+            return None
+
+    def replay(self, method: str = "combined", similarity_threshold: float = 0.95,
+               hash_threshold: int = 10, text_similarity: float = DEFAULT_TEXT_SIMILARITY,
+               pair_similarity: Optional[Callable[[int, int], Optional[float]]] = None) -> List[int]:
+        """
+        按给定阈值重放截图决策，规则与逐帧处理时相同：
+        SSIM与上一张截图的画面比较，无法计算时使用平均哈希差异；文字与上一次变化时的文字比较
+        :param method: 检测方法 ("text", "image", "combined")
+        :param similarity_threshold: 图像相似度阈值
+        :param hash_threshold: 哈希差异阈值
+        :param text_similarity: 文字相似度阈值
+        :param pair_similarity: 按分析分辨率计算两个取样位置之间SSIM的函数，
+                                为None时非相邻取样帧只用缩略图比较
+        :return: 需要保存截图的取样位置（索引中的下标）
+        """
+        if method in ("text", "combined") and not self.has_text:
+            raise ValueError("分析索引中没有OCR文字，无法重放文字检测")
+        selected = []
+        reference = None
+        previous_text = ""
+        for position in range(len(self)):
+            text_change = image_change = False
+            if method in ("text", "combined"):
+                current_text = self.texts[position]
+                text_change = not previous_text or text_changed(previous_text, current_text, text_similarity)
+                if text_change:
+                    previous_text = current_text
+            if method in ("image", "combined"):
+                if reference is None:
+                    image_change = True
+                else:
+                    image_change = self._image_changed(reference, position, similarity_threshold, hash_threshold,
+                                                       pair_similarity)
+                if image_change:
+                    reference = position
+            if text_change or image_change:
+                selected.append(position)
+        return selected
+
+    def _image_changed(self, reference: int, position: int, similarity_threshold: float,
+                       hash_threshold: int,
+                       pair_similarity: Optional[Callable[[int, int], Optional[float]]]) -> bool:
+        """
+        比较取样帧与上一张截图：上一张截图恰好是上一取样帧时直接使用索引中的SSIM，
+        否则比较缩略图，缩略图SSIM接近阈值时按分析分辨率重新计算
+        """
+        similarity = self.ssim_previous[position] if reference == position - 1 else None
+        if similarity is None or np.isnan(similarity):
+            try:
+                similarity = ssim(self.thumbnails[reference], self.thumbnails[position])
+            except Exception:
+                similarity = None
+            if pair_similarity is not None and (similarity is None or
+                                                abs(similarity - similarity_threshold) < VERIFY_MARGIN):
+                similarity = pair_similarity(reference, position)
+        if similarity is not None:
+            return similarity < similarity_threshold
+        hash_diff = int(np.unpackbits(self.hashes[reference] ^ self.hashes[position]).sum())
+        return hash_diff > hash_threshold
+
+
+class IndexBuilder:
+    """逐个添加取样帧，生成分析索引"""
+
+    def __init__(self, params: dict, fps: float, with_text: bool):
+        """
+        :param params: 视频标识和处理参数（包括分析分辨率宽度）
+        :param fps: 视频帧率，用于计算时间戳
+        :param with_text: 是否记录OCR文字
+        """
+        self.params = params
+        self.fps = fps
+        self.frame_indices = []
+        self.thumbnails = []
+        # 每帧只保留缩小后的哈希输入，生成索引时整批计算哈希
+        self.hash_inputs = []
+        self.ssim_previous = []
+        self.texts = [] if with_text else None
+        # 只保留上一个取样帧的分析灰度图，用于计算相邻取样帧的SSIM
+        self._previous_gray = None
+
+    def add(self, frame_index: int, gray_frame: np.ndarray, text: Optional[str] = None):
+        """
+        添加一个取样帧
+        :param frame_index: 帧编号
+        :param gray_frame: 识别区域的分析灰度图，与逐帧处理时比较的图相同，添加后不能再修改
+        :param text: OCR文字
+        """
+        similarity = np.nan
+        if self._previous_gray is not None:
+            try:
+                similarity = ssim(self._previous_gray, gray_frame)
+            except Exception:
+                pass
+        self._previous_gray = gray_frame
+        self.frame_indices.append(frame_index)
+        self.thumbnails.append(to_analysis_gray(gray_frame, THUMBNAIL_WIDTH))
+        self.hash_inputs.append(average_hash_input(gray_frame))
+        self.ssim_previous.append(similarity)
+        if self.texts is not None:
+            self.texts.append(text or "")
+
+    def build(self) -> AnalysisIndex:
+        """
+        生成索引
+        :return: 分析索引
+        """
+        frame_indices = np.asarray(self.frame_indices, dtype=np.int64)
+        timestamps = frame_indices / self.fps if self.fps else np.zeros(len(frame_indices))
+        if self.thumbnails:
+            thumbnails = np.stack(self.thumbnails)
+            hashes = pack_hashes(average_hash_batch(np.stack(self.hash_inputs)))
+        else:
+            thumbnails = np.zeros((0, 0, 0), dtype=np.uint8)
+            hashes = np.zeros((0, 8), dtype=np.uint8)
+        return AnalysisIndex(self.params, frame_indices, timestamps, thumbnails, hashes,
+                             np.asarray(self.ssim_previous, dtype=np.float64), self.texts)
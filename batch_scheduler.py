@@ -0,0 +1,265 @@
+import os
+import time
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 进度队列结束标记
+_PROGRESS_DONE = None
+
+
+def estimate_work(video_path: str, interval: float) -> float:
+    """
+    估算视频的工作量：时长 × 每秒取样次数，即取样帧数
+    :param video_path: 视频文件路径
+    :param interval: 处理帧的时间间隔（秒）
+    :return: 估算的取样帧数，无法读取时返回0
+    """
+    import cv2
+
+    cap = cv2.VideoCapture(video_path)
+    try:
+        if not cap.isOpened():
+            return 0.0
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+        frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0.0
+    finally:
+        cap.release()
+    if fps <= 0:
+        return 0.0
+    duration = frame_count / fps
+    return duration / max(interval, 1.0 / fps)
+
+
+def schedule(video_paths: List[str], interval: float) -> List[int]:
+    """
+    按估算工作量从大到小排序，长视频先开始，减少最后只剩一个长任务在跑的情况
+    :param video_paths: 视频文件路径列表
+    :param interval: 处理帧的时间间隔（秒）
+    :return: 调度顺序（video_paths中的索引）
+    """
+    work = [estimate_work(path, interval) for path in video_paths]
+    return sorted(range(len(video_paths)), key=lambda i: work[i], reverse=True)
+
+
+def _new_result(video_path: str, error: Optional[str] = None) -> dict:
+    """处理结果字典的初始值（尚未成功）"""
+    return {
+        'video_path': video_path,
+        'success': False,
+        'screenshots': [],
+        'timestamps': [],
+        'output_dir': None,
+        'error': error,
+        'elapsed': 0.0,
+        'peak_memory_mb': 0.0,
+    }
+
+
+def run_video(video_path: str, interval: float, processor_type: str = "basic", method: str = "combined",
+              similarity_threshold: float = 0.95, hash_threshold: int = 10,
+              processor_options: Optional[dict] = None,
+              progress_callback: Optional[Callable[[float], None]] = None) -> dict:
+    """
+    处理单个视频并返回结果，不抛出异常
+    :param video_path: 视频文件路径
+    :param interval: 处理帧的时间间隔（秒）
+    :param processor_type: 处理器类型 ("basic", "advanced")
+    :param method: 检测方法 ("text", "image", "combined")
+    :param similarity_threshold: 图像相似度阈值
+    :param hash_threshold: 哈希差异阈值
+    :param processor_options: 传递给处理器构造函数的其他选项
+    :param progress_callback: 进度回调，参数为0-1之间的完成比例
+    :return: 结果字典 (video_path, success, screenshots, timestamps, output_dir, error, elapsed, peak_memory_mb)
+    """
+    result = _new_result(video_path)
+    if not os.path.exists(video_path):
+        result['error'] = f"视频文件不存在: {video_path}"
+        return result
+
+    options = dict(processor_options or {})
+    if progress_callback is not None:
+        options['progress_callback'] = progress_callback
+
+    from profiling import MemoryMonitor
+
+    start = time.perf_counter()
+    # 记录处理该视频期间本进程的峰值常驻内存
+    monitor = MemoryMonitor().start()
+    try:
+        if processor_type == "basic":
+            from video_processor import VideoProcessor
+            processor = VideoProcessor(video_path, **options)
+            screenshots = processor.process_video(interval)
+        else:  # advanced
+            from advanced_video_processor import AdvancedVideoProcessor
+            processor = AdvancedVideoProcessor(video_path, **options)
+            # 使用支持自定义阈值的新方法
+            screenshots = processor.extract_frames_with_custom_thresholds(interval, method, similarity_threshold, hash_threshold)
+        result.update(success=True, screenshots=screenshots, timestamps=processor.screenshot_times,
+                      output_dir=processor.output_dir)
+    except Exception as e:
+        result['error'] = str(e)
+    finally:
+        monitor.stop()
+    result['elapsed'] = time.perf_counter() - start
+    result['peak_memory_mb'] = monitor.peak_mb
+    if monitor.peak_mb > 0:
+        logger.info(f"{os.path.basename(video_path)}: 峰值内存 {monitor.peak_mb:.0f} MB"
+                    f"（开始时 {monitor.baseline_mb:.0f} MB）")
+    return result
+
+
+def _put_progress(progress_queue, video_path: str, fraction: float):
+    """工作进程中的进度回调：把进度放入队列"""
+    progress_queue.put((video_path, fraction))
+
+
+def _run_video_in_worker(video_path: str, progress_queue, kwargs: dict) -> dict:
+    """工作进程入口：进度通过队列发回主进程"""
+    progress_callback = partial(_put_progress, progress_queue, video_path) if progress_queue is not None else None
+    return run_video(video_path, progress_callback=progress_callback, **kwargs)
+
+
+def _pump_progress(progress_queue, on_progress: Callable[[str, float], None]):
+    """在主进程中转发工作进程的进度"""
+    while True:
+        item = progress_queue.get()
+        if item is _PROGRESS_DONE:
+            return
+        on_progress(*item)
+
+
+def _notify(callback: Optional[Callable], *args):
+    """调用可选的回调"""
+    if callback is not None:
+        callback(*args)
+
+
+def run_batch(video_paths: List[str], interval: float, processor_type: str = "basic", method: str = "combined",
+              similarity_threshold: float = 0.95, hash_threshold: int = 10,
+              processor_options: Optional[dict] = None, jobs: int = 1,
+              on_start: Optional[Callable[[str], None]] = None,
+              on_progress: Optional[Callable[[str, float], None]] = None,
+              on_complete: Optional[Callable[[dict], None]] = None) -> List[dict]:
+    """
+    批量处理视频，jobs大于1时在进程池中并行，按估算工作量从大到小调度
+    :param video_paths: 视频文件路径列表
+    :param jobs: 并行处理的视频数
+    :param on_start: 视频开始处理时的回调
+    :param on_progress: 视频进度回调 (视频路径, 完成比例)
+    :param on_complete: 视频处理完成时的回调，参数为结果字典
+    :return: 与video_paths顺序一致的结果字典列表
+    """
+    kwargs = {
+        'interval': interval,
+        'processor_type': processor_type,
+        'method': method,
+        'similarity_threshold': similarity_threshold,
+        'hash_threshold': hash_threshold,
+        'processor_options': processor_options,
+    }
+    if jobs <= 1 or len(video_paths) <= 1:
+        results = _run_sequential(video_paths, kwargs, on_start, on_progress, on_complete)
+    else:
+        results = _run_in_pool(video_paths, kwargs, jobs, on_start, on_progress, on_complete)
+    return [results[i] for i in range(len(video_paths))]
+
+
+def _run_sequential(video_paths: List[str], kwargs: dict, on_start: Optional[Callable[[str], None]],
+                    on_progress: Optional[Callable[[str, float], None]],
+                    on_complete: Optional[Callable[[dict], None]]) -> Dict[int, dict]:
+    """
+    在当前进程中依次处理，按给定顺序，不必估算工作量
+    :return: 视频索引到结果字典的映射
+    """
+    results: Dict[int, dict] = {}
+    for index, video_path in enumerate(video_paths):
+        _notify(on_start, video_path)
+        progress_callback = partial(on_progress, video_path) if on_progress is not None else None
+        results[index] = run_video(video_path, progress_callback=progress_callback, **kwargs)
+        _notify(on_complete, results[index])
+    return results
+
+
+def _run_in_pool(video_paths: List[str], kwargs: dict, jobs: int, on_start: Optional[Callable[[str], None]],
+                 on_progress: Optional[Callable[[str, float], None]],
+                 on_complete: Optional[Callable[[dict], None]]) -> Dict[int, dict]:
+    """
+    在进程池中并行处理，按估算工作量从大到小提交，进度由主进程中的线程转发
+    :return: 视频索引到结果字典的映射
+    """
+    ordered = schedule(video_paths, kwargs['interval'])
+    manager = multiprocessing.Manager() if on_progress is not None else None
+    progress_queue = manager.Queue() if manager is not None else None
+    pump = None
+    if progress_queue is not None:
+        pump = threading.Thread(target=_pump_progress, args=(progress_queue, on_progress), daemon=True)
+        pump.start()
+
+    try:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = {executor.submit(_run_video_in_worker, video_paths[index], progress_queue, kwargs): index
+                       for index in ordered}
+            return _collect_results(futures, video_paths, ordered, jobs, on_start, on_complete)
+    finally:
+        if pump is not None:
+            progress_queue.put(_PROGRESS_DONE)
+            pump.join()
+        if manager is not None:
+            manager.shutdown()
+
+
+def _collect_results(futures: dict, video_paths: List[str], ordered: List[int], jobs: int,
+                     on_start: Optional[Callable[[str], None]],
+                     on_complete: Optional[Callable[[dict], None]]) -> Dict[int, dict]:
+    """
+    等待进程池中的任务完成，工作进程中的异常转为失败结果
+    :return: 视频索引到结果字典的映射
+    """
+    results: Dict[int, dict] = {}
+    # 进程池按提交顺序取任务，前jobs个视频立即开始，之后每完成一个开始下一个
+    for index in ordered[:jobs]:
+        _notify(on_start, video_paths[index])
+    waiting = ordered[jobs:]
+
+    for future in as_completed(futures):
+        index = futures[future]
+        try:
+            result = future.result()
+        except Exception as e:
+            result = _new_result(video_paths[index], str(e))
+        results[index] = result
+        _notify(on_complete, result)
+        if waiting:
+            _notify(on_start, video_paths[waiting.pop(0)])
+    return results
+
+
+def summarize(results: List[dict]) -> str:
+    """
+    生成批量处理汇总
+    :param results: 结果字典列表
+    :return: 汇总文本
+    """
+    success = [r for r in results if r['success']]
+    failed = [r for r in results if not r['success']]
+    screenshot_total = sum(len(r['screenshots']) for r in success)
+    elapsed_total = sum(r['elapsed'] for r in results)
+
+    lines = [
+        f"批量处理完成: {len(success)}/{len(results)} 个视频处理成功，"
+        f"共生成 {screenshot_total} 张截图，累计处理时间 {elapsed_total:.1f} 秒"
+    ]
+    for result in success:
+        memory = f", 峰值内存 {result['peak_memory_mb']:.0f} MB" if result.get('peak_memory_mb') else ""
+        lines.append(f"  成功: {result['video_path']} ({len(result['screenshots'])} 张截图, "
+                     f"{result['elapsed']:.1f} 秒{memory})")
+    for result in failed:
+        lines.append(f"  失败: {result['video_path']}: {result['error']}")
+    return "\n".join(lines)
@@ -0,0 +1,112 @@
+"""
+解码后端对比
+============
+
+在合成视频上比较各解码后端（OpenCV、PyAV、ffmpeg管道）按取样间隔顺序取样的吞吐量（原视频帧/秒），
+以及不同解码线程数的影响。ffmpeg管道另外测试直接输出缩小灰度帧的模式。
+未安装的后端（PyAV、ffmpeg程序）会被跳过。
+
+用法:
+  python benchmarks/bench_decoders.py --resolutions 720p 1080p --duration 20 --interval 1 --threads 0 1 4
+  python benchmarks/bench_decoders.py --video my_video.mp4
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+import argparse
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import cv2
+
+from frame_sampler import FrameSampler
+from video_decoder import DECODER_BACKENDS, FFmpegPipeDecoder, find_ffmpeg, open_video
+from synthetic import generate_video
+
+RESOLUTIONS = {'720p': (1280, 720), '1080p': (1920, 1080), '4k': (3840, 2160)}
+
+
+def available_backends() -> list:
+    """当前环境可用的解码后端"""
+    backends = ['opencv']
+    try:
+        import av  # noqa: F401
+        backends.append('pyav')
+    except ImportError:
+        print("未安装PyAV，跳过pyav后端")
+    if find_ffmpeg():
+        backends.append('ffmpeg')
+    else:
+        print("未找到ffmpeg程序，跳过ffmpeg后端")
+    return backends
+
+
+def measure(cap, interval: float) -> dict:
+    """
+    按取样间隔顺序读取整个视频
+    :return: 原视频帧数、取样帧数和耗时
+    """
+    start = time.perf_counter()
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    sampler = FrameSampler(cap, max(1, int(fps * interval)), "grab")
+    samples = sum(1 for _ in sampler)
+    elapsed = time.perf_counter() - start
+    cap.release()
+    return {'frames': sampler.decoded_frames, 'samples': samples, 'elapsed': elapsed}
+
+
+def format_result(label: str, result: dict) -> str:
+    return (f"{label:28s} 取样 {result['samples']:5d} 帧  耗时 {result['elapsed']:6.2f} s  "
+            f"吞吐量 {result['frames'] / result['elapsed']:7.1f} 帧/秒")
+
+
+def run(path: str, backends: list, threads: list, interval: float, gray_width: int):
+    for backend in backends:
+        for thread_count in threads:
+            result = measure(open_video(path, backend, thread_count), interval)
+            print(format_result(f"{backend} threads={thread_count}", result))
+    if 'ffmpeg' in backends:
+        for thread_count in threads:
+            cap = FFmpegPipeDecoder(path, thread_count, pix_fmt="gray", width=gray_width)
+            result = measure(cap, interval)
+            print(format_result(f"ffmpeg gray{gray_width} threads={thread_count}", result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='解码后端对比')
+    parser.add_argument('--video', help='使用已有视频，不生成合成视频')
+    parser.add_argument('--resolutions', nargs='+', default=['720p'], choices=list(RESOLUTIONS))
+    parser.add_argument('--duration', type=float, default=20.0, help='合成视频时长（秒）')
+    parser.add_argument('--fps', type=float, default=30.0, help='合成视频帧率')
+    parser.add_argument('--interval', type=float, default=1.0, help='取样间隔（秒）')
+    parser.add_argument('--threads', nargs='+', type=int, default=[0, 1, 4], help='解码线程数')
+    parser.add_argument('--backends', nargs='+', choices=DECODER_BACKENDS, help='只测试这些后端')
+    parser.add_argument('--gray-width', type=int, default=640, help='ffmpeg灰度模式的输出宽度')
+    args = parser.parse_args()
+
+    backends = [backend for backend in available_backends() if not args.backends or backend in args.backends]
+    print(f"CPU核数: {os.cpu_count()}")
+    if args.video:
+        print(args.video)
+        run(args.video, backends, args.threads, args.interval, args.gray_width)
+        return
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        for name in args.resolutions:
+            width, height = RESOLUTIONS[name]
+            video = generate_video(os.path.join(temp_dir, f"{name}.mp4"), width, height, args.fps, args.duration)
+            print(f"{name} {video['frames']} 帧")
+            run(video['path'], backends, args.threads, args.interval, args.gray_width)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
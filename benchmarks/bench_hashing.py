@@ -0,0 +1,94 @@
+"""
+批量哈希对比
+============
+
+在合成幻灯片帧（分析分辨率灰度图）上比较逐帧imagehash（经过PIL转换）与frame_hash批量NumPy实现
+的耗时、哈希位差异，以及相邻帧汉明距离按哈希阈值判定变化时的一致率。
+
+用法:
+  python benchmarks/bench_hashing.py --frames 500 --hash-threshold 10
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+import imagehash
+from PIL import Image
+
+from frame_analysis import to_analysis_gray
+from frame_hash import HASH_METHODS, hash_batch, hamming_distance
+from synthetic import render_slide
+
+IMAGEHASH_FUNCTIONS = {'ahash': imagehash.average_hash, 'dhash': imagehash.dhash, 'phash': imagehash.phash}
+
+RESOLUTIONS = {'720p': (1280, 720), '1080p': (1920, 1080)}
+
+
+def make_frames(count: int, width: int, height: int, analysis_width: int, frames_per_slide: int) -> np.ndarray:
+    """
+    生成分析分辨率的灰度帧：每张幻灯片持续若干帧，帧之间叠加少量噪声
+    """
+    rng = np.random.default_rng(0)
+    frames = []
+    slide = None
+    for i in range(count):
+        if i % frames_per_slide == 0:
+            slide = to_analysis_gray(render_slide(i // frames_per_slide, width, height, rng), analysis_width)
+        noise = rng.integers(-3, 4, size=slide.shape, dtype=np.int16)
+        frames.append(np.clip(slide.astype(np.int16) + noise, 0, 255).astype(np.uint8))
+    return np.stack(frames)
+
+
+def compare(frames: np.ndarray, method: str, hash_threshold: int) -> dict:
+    """
+    分别用两种实现计算全部帧的哈希，统计耗时、位差异和相邻帧变化判定一致率
+    """
+    function = IMAGEHASH_FUNCTIONS[method]
+    t0 = time.perf_counter()
+    reference = np.stack([function(Image.fromarray(frame)).hash for frame in frames])
+    t1 = time.perf_counter()
+    batched = hash_batch(frames, method)
+    t2 = time.perf_counter()
+
+    reference_changes = hamming_distance(reference[1:], reference[:-1]) > hash_threshold
+    batched_changes = hamming_distance(batched[1:], batched[:-1]) > hash_threshold
+    return {
+        'frames': len(frames),
+        'changes': int(reference_changes.sum()),
+        'bit_difference': float(hamming_distance(reference, batched).mean()),
+        'agreement': float((reference_changes == batched_changes).mean()),
+        'imagehash_ms': (t1 - t0) / len(frames) * 1000,
+        'batch_ms': (t2 - t1) / len(frames) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='批量哈希对比')
+    parser.add_argument('--frames', type=int, default=500, help='帧数')
+    parser.add_argument('--frames-per-slide', type=int, default=10, help='每张幻灯片持续的帧数')
+    parser.add_argument('--analysis-width', type=int, default=640, help='分析分辨率宽度')
+    parser.add_argument('--hash-threshold', type=int, default=10, help='哈希差异阈值')
+    parser.add_argument('--resolutions', nargs='+', default=['720p'], choices=list(RESOLUTIONS))
+    parser.add_argument('--methods', nargs='+', default=HASH_METHODS, choices=HASH_METHODS)
+    args = parser.parse_args()
+
+    for name in args.resolutions:
+        width, height = RESOLUTIONS[name]
+        frames = make_frames(args.frames, width, height, args.analysis_width, args.frames_per_slide)
+        for method in args.methods:
+            result = compare(frames, method, args.hash_threshold)
+            print(f"{name:6s} {method:6s} {result['frames']} 帧（{result['changes']} 处变化）  "
+                  f"判定一致率 {result['agreement']:.1%}  平均位差异 {result['bit_difference']:.2f}  "
+                  f"imagehash {result['imagehash_ms']:6.3f} ms  批量 {result['batch_ms']:6.3f} ms  "
+                  f"加速 {result['imagehash_ms'] / result['batch_ms']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
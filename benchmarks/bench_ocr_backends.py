@@ -0,0 +1,96 @@
+"""
+OCR后端单帧延迟对比
+===================
+
+比较pytesseract（每帧启动tesseract进程）与tesserocr（常驻引擎）的识别延迟。
+
+用法:
+  python benchmarks/bench_ocr_backends.py --frames 20 --width 1280 --height 720
+"""
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from ocr_engine import create_ocr_engine
+
+
+def make_text_frame(index: int, width: int, height: int) -> Image.Image:
+    """生成带有文字的合成帧"""
+    frame = np.full((height, width, 3), 255, dtype=np.uint8)
+    scale = height / 360
+    cv2.putText(frame, f"Slide {index}", (int(40 * scale), int(120 * scale)),
+                cv2.FONT_HERSHEY_SIMPLEX, 2 * scale, (0, 0, 0), max(1, int(3 * scale)))
+    cv2.putText(frame, "The quick brown fox jumps over the lazy dog", (int(40 * scale), int(220 * scale)),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.8 * scale, (0, 0, 0), max(1, int(2 * scale)))
+    return Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+
+
+def bench_backend(backend: str, images, lang: str) -> dict:
+    """
+    测量单个后端的识别延迟
+    :return: 统计结果，后端不可用时包含error字段
+    """
+    start = time.perf_counter()
+    try:
+        engine = create_ocr_engine(backend, lang)
+        # 预热一次，避免首次加载计入单帧延迟
+        engine.image_to_string(images[0])
+    except Exception as e:
+        return {'backend': backend, 'error': str(e)}
+    init_time = time.perf_counter() - start
+
+    latencies = []
+    for image in images:
+        t0 = time.perf_counter()
+        engine.image_to_string(image)
+        latencies.append(time.perf_counter() - t0)
+    engine.close()
+
+    latencies = np.array(latencies) * 1000
+    return {
+        'backend': backend,
+        'init_ms': init_time * 1000,
+        'mean_ms': float(latencies.mean()),
+        'p95_ms': float(np.percentile(latencies, 95)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='OCR后端单帧延迟对比')
+    parser.add_argument('--frames', type=int, default=20, help='测试帧数')
+    parser.add_argument('--width', type=int, default=1280, help='帧宽度')
+    parser.add_argument('--height', type=int, default=720, help='帧高度')
+    parser.add_argument('--lang', default='chi_sim+eng', help='OCR语言')
+    args = parser.parse_args()
+
+    try:
+        from config import OCRConfig
+        import pytesseract
+        if OCRConfig.TESSERACT_CMD and os.path.exists(OCRConfig.TESSERACT_CMD):
+            pytesseract.pytesseract.tesseract_cmd = OCRConfig.TESSERACT_CMD
+    except ImportError:
+        pass
+
+    images = [make_text_frame(i, args.width, args.height) for i in range(args.frames)]
+    print(f"OCR后端延迟对比: {args.frames} 帧, {args.width}x{args.height}, 语言 {args.lang}")
+    for backend in ('pytesseract', 'tesserocr'):
+        result = bench_backend(backend, images, args.lang)
+        if 'error' in result:
+            print(f"  {backend:12s} 不可用: {result['error']}")
+        else:
+            print(f"  {backend:12s} 初始化 {result['init_ms']:8.1f} ms  "
+                  f"平均 {result['mean_ms']:8.1f} ms  p95 {result['p95_ms']:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
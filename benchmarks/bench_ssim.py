@@ -0,0 +1,128 @@
+"""
+降采样SSIM对比
+==============
+
+在合成的1080p/4K视频上比较原始分辨率SSIM（full=True）与分析分辨率SSIM（full=False）
+的变化判定一致性和耗时。
+
+用法:
+  python benchmarks/bench_ssim.py --analysis-width 640 --threshold 0.95
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+import argparse
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import cv2
+import numpy as np
+from skimage.metrics import structural_similarity as ssim
+
+from frame_analysis import to_analysis_gray
+
+RESOLUTIONS = {'1080p': (1920, 1080), '4k': (3840, 2160)}
+
+
+def make_clip(path: str, width: int, height: int, slides: int = 6, frames_per_slide: int = 4, fps: int = 2):
+    """
+    生成合成幻灯片视频：每张幻灯片持续若干帧，文字、背景和插图随幻灯片变化
+    """
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+    scale = height / 1080
+    rng = np.random.default_rng(0)
+    for slide in range(slides):
+        base = np.full((height, width, 3), 240 - (slide // 2) * 30, dtype=np.uint8)
+        # 每张幻灯片右侧配一张不同的纹理“插图”
+        picture = rng.integers(0, 256, size=(height // 16, width // 16, 3), dtype=np.uint8)
+        base[height // 4:height * 3 // 4, width // 2:width * 9 // 10] = cv2.resize(
+            picture, (width * 9 // 10 - width // 2, height * 3 // 4 - height // 4),
+            interpolation=cv2.INTER_CUBIC)
+        cv2.putText(base, f"Chapter {slide // 2}", (int(100 * scale), int(200 * scale)),
+                    cv2.FONT_HERSHEY_SIMPLEX, 4 * scale, (20, 20, 20), max(1, int(8 * scale)))
+        for line in range(slide + 1):
+            cv2.putText(base, f"bullet point {line} of slide {slide}",
+                        (int(100 * scale), int((350 + line * 90) * scale)),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1.5 * scale, (20, 20, 20), max(1, int(3 * scale)))
+        for _ in range(frames_per_slide):
+            noise = rng.integers(-3, 4, size=base.shape, dtype=np.int16)
+            writer.write(np.clip(base.astype(np.int16) + noise, 0, 255).astype(np.uint8))
+    writer.release()
+
+
+def read_frames(path: str):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def compare(frames, analysis_width: int, threshold: float) -> dict:
+    """
+    对相邻帧分别用两种方式计算SSIM，统计判定一致率和单帧耗时
+    """
+    full_time = 0.0
+    fast_time = 0.0
+    agree = 0
+    changes = 0
+    deviation = 0.0
+    pairs = len(frames) - 1
+
+    for previous, current in zip(frames, frames[1:]):
+        t0 = time.perf_counter()
+        full_sim, _ = ssim(cv2.cvtColor(previous, cv2.COLOR_BGR2GRAY),
+                           cv2.cvtColor(current, cv2.COLOR_BGR2GRAY), full=True)
+        t1 = time.perf_counter()
+        fast_sim = ssim(to_analysis_gray(previous, analysis_width), to_analysis_gray(current, analysis_width))
+        t2 = time.perf_counter()
+
+        full_time += t1 - t0
+        fast_time += t2 - t1
+        agree += (full_sim < threshold) == (fast_sim < threshold)
+        changes += full_sim < threshold
+        deviation += abs(full_sim - fast_sim)
+
+    return {
+        'pairs': pairs,
+        'changes': changes,
+        'agreement': agree / pairs,
+        'deviation': deviation / pairs,
+        'full_ms': full_time / pairs * 1000,
+        'fast_ms': fast_time / pairs * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='降采样SSIM对比')
+    parser.add_argument('--analysis-width', type=int, default=640, help='分析分辨率宽度')
+    parser.add_argument('--threshold', type=float, default=0.95, help='相似度阈值')
+    parser.add_argument('--resolutions', nargs='+', default=list(RESOLUTIONS), choices=list(RESOLUTIONS))
+    args = parser.parse_args()
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        for name in args.resolutions:
+            width, height = RESOLUTIONS[name]
+            clip_path = os.path.join(temp_dir, f"{name}.mp4")
+            make_clip(clip_path, width, height)
+            result = compare(read_frames(clip_path), args.analysis_width, args.threshold)
+            print(f"{name:6s} {result['pairs']} 对帧（{result['changes']} 处变化）  判定一致率 {result['agreement']:.0%}  "
+                  f"SSIM平均偏差 {result['deviation']:.4f}  "
+                  f"原始 {result['full_ms']:7.1f} ms  降采样 {result['fast_ms']:6.1f} ms  "
+                  f"加速 {result['full_ms'] / result['fast_ms']:.1f}x")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
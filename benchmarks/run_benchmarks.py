@@ -0,0 +1,241 @@
+"""
+处理器性能基准套件
+==================
+
+用合成视频（见 synthetic.py）测量 VideoProcessor 和 AdvancedVideoProcessor 各检测方法的
+吞吐量（帧/秒）、各阶段耗时（解码、转换、OCR、SSIM、哈希、编码、写盘）和峰值内存，
+结果写入JSON，可与之前提交的结果对比，发现性能回退。
+
+每个用例在独立的子进程中运行，峰值内存互不影响。
+
+用法:
+  python benchmarks/run_benchmarks.py --preset quick --output bench.json
+  python benchmarks/run_benchmarks.py --resolutions 1080p --durations 60 --change-rates 0.1 1 \\
+      --processors advanced --methods image combined --output new.json --compare bench.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import platform
+import argparse
+import tempfile
+import itertools
+import subprocess
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import cv2
+
+from profiling import PROFILE_STAGES
+from synthetic import generate_video
+
+RESOLUTIONS = {'360p': (640, 360), '720p': (1280, 720), '1080p': (1920, 1080), '4k': (3840, 2160)}
+
+# 各处理器支持的检测方法（基础处理器只检测文字变化）
+PROCESSOR_METHODS = {'basic': ['text'], 'advanced': ['text', 'image', 'combined']}
+
+
+PRESETS = {
+    'quick': {'resolutions': ['360p'], 'fps': [25], 'durations': [10], 'change_rates': [0.5]},
+    'default': {'resolutions': ['720p', '1080p'], 'fps': [30], 'durations': [30], 'change_rates': [0.2, 1.0]},
+}
+
+
+def peak_rss_mb():
+    """当前进程的峰值内存（MB），无法获取时返回None"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux单位为KB，macOS为字节
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+    except (ImportError, AttributeError):
+        return None
+
+
+def run_case(video: dict, processor_type: str, method: str, interval: float, options: dict) -> dict:
+    """
+    在子进程中运行单个用例
+    :return: 用例结果
+    """
+    logging.disable(logging.INFO)
+    from video_processor import VideoProcessor
+    from advanced_video_processor import AdvancedVideoProcessor
+
+    output_dir = tempfile.mkdtemp(prefix='bench_')
+    try:
+        # 各阶段耗时由处理器的分阶段计时器记录
+        if processor_type == 'basic':
+            processor = VideoProcessor(video['path'], output_dir, profile=True, **options)
+        else:
+            processor = AdvancedVideoProcessor(video['path'], output_dir, profile=True, **options)
+
+        start = time.perf_counter()
+        if processor_type == 'basic':
+            screenshots = processor.process_video(interval)
+        else:
+            screenshots = processor.extract_frames_with_custom_thresholds(interval, method)
+        elapsed = time.perf_counter() - start
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    sampled = processor.sampling_stats.get('inspected_frames', 0)
+    return {
+        'elapsed': elapsed,
+        'sampled_frames': sampled,
+        'sampled_fps': sampled / elapsed if elapsed else 0.0,
+        'video_fps': video['frames'] / elapsed if elapsed else 0.0,
+        'screenshots': len(screenshots),
+        'stages': processor.profiler.summary(),
+        'sampling': processor.sampling_stats,
+        'ocr': processor.ocr_stats,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def case_id(video: dict, processor_type: str, method: str, interval: float) -> str:
+    return (f"{video['width']}x{video['height']}@{video['fps']:g}_{video['duration']:g}s_"
+            f"r{video['change_rate']:g}/{processor_type}/{method}/i{interval:g}")
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=str(project_root),
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+
+def run_suite(args) -> dict:
+    preset = PRESETS[args.preset]
+    resolutions = args.resolutions or preset['resolutions']
+    fps_list = args.fps or preset['fps']
+    durations = args.durations or preset['durations']
+    change_rates = args.change_rates or preset['change_rates']
+    options = {'sampling_strategy': args.sampling, 'ocr_gate_threshold': args.ocr_gate_threshold,
+               'writer_threads': args.writer_threads, 'image_format': args.format}
+
+    results = []
+    temp_dir = tempfile.mkdtemp(prefix='bench_videos_')
+    # spawn保证每个用例都从干净的进程开始，峰值内存不受之前用例影响
+    context = multiprocessing.get_context('spawn')
+    try:
+        for seed, (resolution, fps, duration, change_rate) in enumerate(
+                itertools.product(resolutions, fps_list, durations, change_rates)):
+            width, height = RESOLUTIONS[resolution]
+            path = os.path.join(temp_dir, f"{resolution}_{fps}_{duration}_{change_rate}.mp4")
+            video = generate_video(path, width, height, fps, duration, change_rate, seed)
+            video.update(duration=duration, change_rate=change_rate)
+
+            for processor_type in args.processors:
+                for method in PROCESSOR_METHODS[processor_type]:
+                    if method not in args.methods:
+                        continue
+                    runs = []
+                    for _ in range(args.repeat):
+                        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                            runs.append(executor.submit(run_case, video, processor_type, method,
+                                                        args.interval, options).result())
+                    # 多次运行取最快的一次，减少偶然干扰
+                    result = min(runs, key=lambda r: r['elapsed'])
+                    result.update(id=case_id(video, processor_type, method, args.interval),
+                                  video={k: v for k, v in video.items() if k != 'path'},
+                                  processor=processor_type, method=method, interval=args.interval)
+                    results.append(result)
+                    print(format_result(result), flush=True)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'opencv': cv2.__version__,
+            'platform': platform.platform(),
+            'options': options,
+        },
+        'results': results,
+    }
+
+
+def format_result(result: dict) -> str:
+    stages = '  '.join(f"{stage} {result['stages'][stage]['total'] * 1000:.0f}ms" for stage in PROFILE_STAGES)
+    rss = '' if result['peak_rss_mb'] is None else f"峰值内存 {result['peak_rss_mb']:.0f}MB  "
+    return (f"{result['id']:50s} {result['elapsed']:7.2f}s  {result['sampled_fps']:7.1f} 取样帧/秒  "
+            f"{result['screenshots']:3d} 张截图  {rss}{stages}")
+
+
+def compare(baseline: dict, current: dict, tolerance: float) -> int:
+    """
+    与基准结果对比，耗时增加超过tolerance的用例视为回退
+    :return: 回退的用例数
+    """
+    previous = {result['id']: result for result in baseline['results']}
+    regressions = 0
+    print(f"\n与 {baseline['meta'].get('commit') or '基准'} 对比:")
+    for result in current['results']:
+        old = previous.get(result['id'])
+        if old is None:
+            print(f"  {result['id']:50s} 无基准数据")
+            continue
+        ratio = result['elapsed'] / old['elapsed'] if old['elapsed'] else float('inf')
+        regressed = ratio > 1 + tolerance
+        regressions += regressed
+        changed_screenshots = '' if result['screenshots'] == old['screenshots'] else \
+            f"  截图数 {old['screenshots']} -> {result['screenshots']}"
+        print(f"  {result['id']:50s} {old['elapsed']:7.2f}s -> {result['elapsed']:7.2f}s  "
+              f"{ratio:5.2f}x{'  回退' if regressed else ''}{changed_screenshots}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='处理器性能基准套件')
+    parser.add_argument('--preset', choices=list(PRESETS), default='quick', help='预设用例组合')
+    parser.add_argument('--resolutions', nargs='+', choices=list(RESOLUTIONS), help='分辨率')
+    parser.add_argument('--fps', nargs='+', type=float, help='帧率')
+    parser.add_argument('--durations', nargs='+', type=float, help='时长（秒）')
+    parser.add_argument('--change-rates', nargs='+', type=float, help='每秒画面切换次数')
+    parser.add_argument('--processors', nargs='+', choices=list(PROCESSOR_METHODS),
+                        default=list(PROCESSOR_METHODS), help='处理器类型')
+    parser.add_argument('--methods', nargs='+', choices=PROCESSOR_METHODS['advanced'],
+                        default=PROCESSOR_METHODS['advanced'], help='检测方法')
+    parser.add_argument('--interval', type=float, default=1.0, help='处理帧的时间间隔（秒）')
+    parser.add_argument('--sampling', default='auto', help='帧取样策略')
+    parser.add_argument('--ocr-gate-threshold', type=float, default=8.0, help='OCR闸门阈值')
+    parser.add_argument('--writer-threads', type=int, default=2, help='截图写入线程数')
+    parser.add_argument('--format', default='png', help='截图格式')
+    parser.add_argument('--repeat', type=int, default=1, help='每个用例运行次数，取最快的一次')
+    parser.add_argument('--output', help='结果JSON文件路径')
+    parser.add_argument('--compare', help='用于对比的基准结果JSON文件')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='判定为回退的耗时增加比例，默认为0.1')
+    args = parser.parse_args()
+
+    report = run_suite(args)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存到: {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare(baseline, report, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
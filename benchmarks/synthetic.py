@@ -0,0 +1,74 @@
+"""
+合成测试视频生成器
+==================
+
+生成确定性的幻灯片式视频：画面每隔一段时间切换一次（切换频率由change_rate控制），
+每张幻灯片带有标题、若干行文字和一张纹理插图，每帧叠加轻微噪声模拟压缩。
+相同参数和随机种子总是生成相同的视频，便于在不同提交之间对比性能。
+"""
+import cv2
+import numpy as np
+
+
+def render_slide(index: int, width: int, height: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    绘制一张幻灯片
+    :param index: 幻灯片序号
+    :param width: 画面宽度
+    :param height: 画面高度
+    :param rng: 随机数生成器
+    :return: BGR图像
+    """
+    scale = height / 1080
+    slide = np.full((height, width, 3), 235 - (index % 4) * 20, dtype=np.uint8)
+    picture = rng.integers(0, 256, size=(max(1, height // 16), max(1, width // 16), 3), dtype=np.uint8)
+    slide[height // 4:height * 3 // 4, width // 2:width * 9 // 10] = cv2.resize(
+        picture, (width * 9 // 10 - width // 2, height * 3 // 4 - height // 4),
+        interpolation=cv2.INTER_CUBIC)
+    cv2.putText(slide, f"Slide {index}", (int(100 * scale), int(200 * scale)),
+                cv2.FONT_HERSHEY_SIMPLEX, 4 * scale, (20, 20, 20), max(1, int(8 * scale)))
+    for line in range(index % 5 + 1):
+        cv2.putText(slide, f"point {line} of slide {index}",
+                    (int(100 * scale), int((350 + line * 90) * scale)),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.5 * scale, (20, 20, 20), max(1, int(3 * scale)))
+    return slide
+
+
+def generate_video(path: str, width: int = 1280, height: int = 720, fps: float = 30.0,
+                   duration: float = 10.0, change_rate: float = 0.5, seed: int = 0) -> dict:
+    """
+    生成合成测试视频
+    :param path: 输出路径（mp4）
+    :param width: 画面宽度
+    :param height: 画面高度
+    :param fps: 帧率
+    :param duration: 时长（秒）
+    :param change_rate: 每秒画面切换次数
+    :param seed: 随机种子
+    :return: 视频信息 (path, width, height, fps, frames, changes)
+    """
+    rng = np.random.default_rng(seed)
+    total_frames = max(1, int(round(fps * duration)))
+    frames_per_slide = max(1, int(round(fps / change_rate))) if change_rate > 0 else total_frames
+
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+    if not writer.isOpened():
+        raise RuntimeError(f"无法创建视频文件: {path}")
+    try:
+        slide = None
+        for frame_index in range(total_frames):
+            if frame_index % frames_per_slide == 0:
+                slide = render_slide(frame_index // frames_per_slide, width, height, rng).astype(np.int16)
+            noise = rng.integers(-3, 4, size=slide.shape, dtype=np.int16)
+            writer.write(np.clip(slide + noise, 0, 255).astype(np.uint8))
+    finally:
+        writer.release()
+
+    return {
+        'path': path,
+        'width': width,
+        'height': height,
+        'fps': fps,
+        'frames': total_frames,
+        'changes': (total_frames - 1) // frames_per_slide,
+    }
@@ -0,0 +1,84 @@
+import logging
+from typing import Optional, Tuple
+
+import numpy as np
+
+from roi import RegionSelector
+from profiling import StageProfiler
+
+logger = logging.getLogger(__name__)
+
+# (帧编号, 帧)
+Sample = Tuple[int, np.ndarray]
+
+
+class ChangeRefiner:
+    """
+    在两个取样帧之间二分查找画面切换的确切帧
+    使用独立的视频对象（与主循环相同的解码后端）按时间戳跳转，不影响主循环的顺序解码；
+    每次取中点帧，与前一帧更接近则为切换前，否则为切换后，O(log n)次解码即可定位
+    """
+
+    def __init__(self, video_path: str, fps: float, regions: Optional[RegionSelector] = None,
+                 profiler: Optional[StageProfiler] = None, decoder: str = "opencv", decoder_threads: int = 0):
+        """
+        :param video_path: 视频文件路径
+        :param fps: 视频帧率
+        :param regions: 识别区域，只比较这些区域
+        :param profiler: 分阶段计时器，记录二分查找耗时
+        :param decoder: 解码后端
+        :param decoder_threads: 解码线程数
+        """
+        from scene_detector import SceneDetector
+        from video_decoder import FrameFetcher
+
+        self.video_path = video_path
+        self.fps = fps
+        self.profiler = profiler or StageProfiler(enabled=False)
+        # 使用场景预筛的缩略图特征作为廉价的图像差异度量
+        self.detector = SceneDetector(method="mad", regions=regions)
+        self.fetcher = FrameFetcher(video_path, fps, decoder, decoder_threads)
+        self.refined = 0
+
+    @property
+    def decoded_frames(self) -> int:
+        """二分查找额外解码的帧数"""
+        return self.fetcher.fetched
+
+    def _read_at(self, frame_index: int) -> Optional[np.ndarray]:
+        """按时间戳跳转并读取指定帧"""
+        return self.fetcher.read(frame_index)
+
+    def refine(self, before: Sample, after: Sample) -> Sample:
+        """
+        查找切换帧
+        :param before: 切换前的取样 (帧编号, 帧)
+        :param after: 切换后的取样 (帧编号, 帧)
+        :return: 第一个属于切换后画面的 (帧编号, 帧)，无法定位时返回after
+        """
+        low, _ = before
+        high, high_frame = after
+        if high - low <= 1 or self.fps <= 0:
+            return after
+
+        with self.profiler.stage('refine'):
+            low_signature = self.detector.signature(before[1])
+            high_signature = self.detector.signature(high_frame)
+            while high - low > 1:
+                middle = (low + high) // 2
+                frame = self._read_at(middle)
+                if frame is None:
+                    break
+                signature = self.detector.signature(frame)
+                if self.detector.distance(signature, high_signature) < self.detector.distance(signature, low_signature):
+                    high, high_frame = middle, frame
+                else:
+                    low = middle
+        self.refined += 1
+        return high, high_frame
+
+    def close(self):
+        """释放视频对象"""
+        self.fetcher.close()
+        if self.refined:
+            logger.info(f"切换帧定位: {self.refined} 次，额外解码 {self.decoded_frames} 帧")
@@ -0,0 +1,86 @@
+import os
+import json
+import time
+import logging
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 检查点文件格式版本，格式变化时旧检查点将被忽略
+CHECKPOINT_VERSION = 1
+
+
+def checkpoint_path_for(output_dir: str) -> str:
+    """
+    检查点文件放在输出目录旁边，如 视频_截图.checkpoint.npz
+    :param output_dir: 截图输出目录
+    :return: 检查点文件路径
+    """
+    return os.path.normpath(output_dir) + ".checkpoint.npz"
+
+
+class Checkpoint:
+    """
+    处理进度检查点：定期保存上一个取样帧之后的继续位置、比较基准和截图计数，
+    中断后可以从检查点继续，不必从第0帧重新处理
+
+    状态中的numpy数组单独保存，其余字段保存为JSON；写入时先写临时文件再替换，
+    中途崩溃不会留下损坏的检查点
+    """
+
+    def __init__(self, output_dir: str, period: float = 30.0):
+        """
+        :param output_dir: 截图输出目录
+        :param period: 保存间隔（秒），0表示不定期保存
+        """
+        self.path = checkpoint_path_for(output_dir)
+        self.period = period
+        self._last_save = time.monotonic()
+
+    def due(self) -> bool:
+        """是否到了定期保存的时间"""
+        return self.period > 0 and time.monotonic() - self._last_save >= self.period
+
+    def save(self, state: dict):
+        """
+        保存检查点
+        :param state: 状态字典，值为numpy数组或可JSON序列化的对象
+        """
+        arrays = {f"array_{key}": value for key, value in state.items() if isinstance(value, np.ndarray)}
+        meta = {key: value for key, value in state.items() if not isinstance(value, np.ndarray)}
+        meta['version'] = CHECKPOINT_VERSION
+
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'wb') as f:
+            np.savez(f, meta=np.array(json.dumps(meta, ensure_ascii=False)), **arrays)
+        os.replace(temp_path, self.path)
+        self._last_save = time.monotonic()
+
+    def load(self) -> Optional[dict]:
+        """
+        读取检查点
+        :return: 状态字典，不存在或无法读取时返回None
+        """
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                state = json.loads(str(data['meta']))
+                for key in data.files:
+                    if key.startswith('array_'):
+                        state[key[len('array_'):]] = data[key]
+        except Exception as e:
+            logger.warning(f"无法读取检查点 {self.path}: {e}")
+            return None
+        if state.pop('version', None) != CHECKPOINT_VERSION:
+            logger.warning(f"检查点版本不兼容，忽略: {self.path}")
+            return None
+        return state
+
+    def remove(self):
+        """处理完成后删除检查点"""
+        for path in (self.path, self.path + ".tmp"):
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,34 @@
+"""
+命令行和图形界面中各选项的可选值
+本模块不导入OpenCV、numpy等依赖，显示帮助和启动界面时不必加载它们；
+各功能模块从这里导入并沿用原来的名称
+"""
+
+# 取样策略
+# read: 逐帧解码并转换（旧行为）
+# grab: 跳过的帧只调用grab()，仅在取样帧上retrieve()
+# seek: 按时间戳直接跳转到取样帧（适合远大于GOP的间隔）
+# auto: 根据帧间隔与GOP大小自动选择
+# adaptive: 画面不变时逐步加大间隔，发现变化时回退到最小间隔找到变化所在的取样点
+SAMPLING_STRATEGIES = ['auto', 'grab', 'seek', 'read', 'adaptive']
+
+# 解码后端
+# opencv: cv2.VideoCapture 的FFmpeg后端，可指定解码线程数
+# pyav: PyAV多线程解码，只解复用视频流的数据包，跳转时目标帧之前的非参考帧不解码，跳过的帧不转换像素格式
+# ffmpeg: ffmpeg子进程通过管道输出原始帧，取样、缩放和灰度转换都在ffmpeg中完成
+DECODER_BACKENDS = ['opencv', 'pyav', 'ffmpeg']
+
+# OCR后端
+# pytesseract: 每次识别启动一次tesseract进程（兼容性最好）
+# tesserocr: 通过C-API常驻进程内，语言模型只加载一次
+# auto: tesserocr可用时优先使用，否则回退到pytesseract
+OCR_BACKENDS = ['auto', 'pytesseract', 'tesserocr']
+
+# OCR默认语言（Tesseract语言代码，多种语言用+连接），配置见 OCRConfig.LANGUAGES
+DEFAULT_OCR_LANG = 'chi_sim+eng'
+
+# 支持的截图格式
+OUTPUT_FORMATS = ['png', 'jpg', 'webp']
+
+# 场景检测方法: mad(分块平均像素差异，对局部文字变化敏感), hist(颜色直方图距离，只适合画面整体切换)
+SCENE_METHODS = ['mad', 'hist']
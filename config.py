@@ -10,6 +10,31 @@ class OCRConfig:
     # OCR语言
     LANGUAGES = 'chi_sim+eng'  # 中文简体+英文
     
+    # OCR后端: auto(优先常驻的tesserocr), pytesseract, tesserocr
+    BACKEND = 'auto'
+    
+    # OCR闸门阈值：缩略图与上一次OCR的帧最大像素差异（0-255）不超过该值时跳过OCR，0表示关闭
+    GATE_THRESHOLD = 8
+    
+    # OCR工作进程数（0表示在解码循环中同步识别）
+    WORKERS = 0
+    
+    # 同时在途的最大帧数（0表示工作进程数的2倍）
+    QUEUE_DEPTH = 0
+    
+    # OCR结果磁盘缓存（PathConfig.TEMP_DIR下的ocr_cache.sqlite3），重复处理同一视频时复用识别结果
+    CACHE_ENABLED = True
+    
+    # OCR缓存大小上限（MB），超过时淘汰最久未使用的记录
+    CACHE_MAX_MB = 64
+    
+    # 文字相似度阈值（0-1）：文字规范化（全角转半角、忽略大小写、空白和标点）后，
+    # 与上一次变化时的文字的编辑距离相似度低于该值才认为文字变化，1表示规范化后完全相同才不截图
+    TEXT_SIMILARITY = 0.9
+    
+    # OCR单词置信度下限（0-100），低于该值的单词不参与比较，0表示不过滤
+    MIN_CONFIDENCE = 0
+    
 # 视频处理配置
 class VideoConfig:
     # 默认帧处理间隔（秒）
@@ -18,14 +43,87 @@ class VideoConfig:
     # 视频编码格式
     VIDEO_CODECS = ['mp4', 'avi', 'mov', 'mkv', 'flv', 'wmv']
     
+    # 取样策略: auto(根据帧间隔与GOP自动选择), grab, seek, read, adaptive(画面不变时逐步加大间隔)
+    SAMPLING_STRATEGY = 'auto'
+    
+    # 解码后端: opencv(cv2.VideoCapture), pyav(PyAV多线程解码，需要安装av), ffmpeg(ffmpeg子进程管道)
+    DECODER = 'opencv'
+    
+    # 解码线程数，0表示由解码后端决定
+    DECODER_THREADS = 0
+    
+    # ffmpeg程序路径，None表示在PATH中查找
+    FFMPEG_PATH = None
+    
+    # 自适应取样的最大间隔（秒），None表示处理间隔的8倍
+    MAX_INTERVAL = None
+    
+    # 检测到变化时，在两次取样之间二分查找确切的切换帧并保存该帧
+    REFINE_CHANGES = False
+    
+    # 检查点保存间隔（秒），检查点保存在输出目录旁边（<输出目录>.checkpoint.npz），0表示关闭
+    CHECKPOINT_INTERVAL = 30
+    
+    # 分析索引（仅高级处理器）：首次处理时在PathConfig.TEMP_DIR/analysis_index下保存每个取样帧的
+    # 缩略图、哈希、SSIM和OCR文字，之后调整相似度/哈希阈值时只重放决策并解码需要保存的帧
+    ANALYSIS_INDEX = False
+    
+    # 分析流（仅高级处理器）：解码器直接输出灰度帧，仅图像检测时同时缩小到分析分辨率，
+    # 只有保存截图时才读取原始分辨率的彩色帧
+    ANALYSIS_STREAM = False
+    
+    # 分段并行（仅高级处理器）：单个视频按时间分为几段，在独立进程中同时处理后拼接，0表示CPU核数
+    SEGMENTS = 1
+    
+    # 段间重叠（秒）：每段提前这么长开始预热检测状态，用于与前一段衔接
+    SEGMENT_OVERLAP = 2.0
+    
+    # 内存预算（MB，仅高级处理器），0表示不限制：按单帧大小限制截图写入队列和OCR流水线中的在途帧数，
+    # 分析用的灰度图和RGB图写入预分配的缓冲区，适合4K/8K视频
+    MEMORY_BUDGET_MB = 0
+    
+    # 图像比较（SSIM/哈希）使用的分析分辨率宽度，0表示原始分辨率
+    ANALYSIS_WIDTH = 640
+    
+    # 识别区域列表，只对这些区域做OCR和变化检测，空列表表示整帧
+    # 每个区域为 "x,y,w,h"，全部在0-1之间时按画面比例解释，否则为像素，如 "0,0.8,1,0.2" 为底部字幕带
+    ROI = []
+    
+    # 场景变化预筛（仅高级处理器）: None(关闭), mad(分块像素差异), hist(颜色直方图)
+    # 开启后只对候选变化点附近的帧做OCR和SSIM，可以配合较小的处理间隔使用
+    SCENE_METHOD = None
+    
+    # 场景预筛阈值，None表示使用默认值（mad为3，hist为0.15）
+    SCENE_THRESHOLD = None
+    
+    # 候选变化点之后继续分析的取样帧数
+    SCENE_SETTLE = 1
+    
+# 截图输出配置
+class OutputConfig:
+    # 后台写入线程数（0表示在解码循环中同步写入）
+    WRITER_THREADS = 2
+    
+    # 等待写入的最大截图数，队列满时解码循环等待
+    WRITER_QUEUE_SIZE = 8
+    
+    # 截图格式: png, jpg, webp
+    FORMAT = 'png'
+    
+    # JPEG/WebP质量（1-100），None表示使用默认值（JPEG 95，WebP 90）
+    QUALITY = None
+    
+    # PNG压缩级别（0-9），越大文件越小、编码越慢
+    PNG_COMPRESSION = 3
+    
+    # WebP是否使用无损压缩
+    WEBP_LOSSLESS = False
+    
 # 文件路径配置
+# 导入配置不创建任何目录，使用这些目录的模块（OCR缓存、分析索引）在第一次写入时创建
 class PathConfig:
     # 临时文件目录
     TEMP_DIR = os.path.join(Path.home(), '.video_processor', 'temp')
     
     # 日志目录
     LOG_DIR = os.path.join(Path.home(), '.video_processor', 'logs')
-    
-# 创建必要的目录
-os.makedirs(PathConfig.TEMP_DIR, exist_ok=True)
-os.makedirs(PathConfig.LOG_DIR, exist_ok=True)
\ No newline at end of file
@@ -83,6 +83,26 @@ def example_custom_output():
     print("可以通过修改VideoProcessor类来支持自定义输出目录")
 
 
+def example_iter_changes():
+    """逐个获取变化事件示例：不写入截图，调用方自行处理帧和文字"""
+    print("\n=== 变化事件迭代示例 ===")
+    
+    video_file = "example.mp4"
+    
+    if not os.path.exists(video_file):
+        print(f"警告: 视频文件 '{video_file}' 不存在，此为演示代码")
+        return
+    
+    from advanced_video_processor import AdvancedVideoProcessor
+    processor = AdvancedVideoProcessor(video_file)
+    for event in processor.iter_changes(interval=1.0, method="combined"):
+        # event.frame 为原始分辨率的BGR帧，可以写入自己的存储
+        print(f"{event.timestamp:.2f}秒 (第{event.frame_index}帧): 相似度 {event.similarity}, 文字 {event.text!r}")
+        if event.timestamp > 60:
+            # 可以随时停止，不需要处理完整个视频
+            break
+
+
 def main():
     """主函数"""
     print("视频变化截图工具使用示例")
@@ -92,6 +112,7 @@ def main():
     example_basic_usage()
     example_advanced_usage()
     example_custom_output()
+    example_iter_changes()
     
     print("\n" + "=" * 40)
     print("更多使用方法请参考README.md文件")
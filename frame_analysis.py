@@ -0,0 +1,74 @@
+import cv2
+import numpy as np
+
+# 默认分析分辨率宽度（像素），0表示使用原始分辨率
+DEFAULT_ANALYSIS_WIDTH = 640
+
+
+def to_analysis_gray(frame: np.ndarray, width: int = DEFAULT_ANALYSIS_WIDTH) -> np.ndarray:
+    """
+    将视频帧转换为分析用的灰度图，宽度超过分析分辨率时按比例缩小
+    SSIM和哈希都使用同一张分析图，每个取样帧只缩放一次
+    :param frame: BGR视频帧或灰度帧
+    :param width: 分析分辨率宽度，0表示不缩放
+    :return: 灰度分析图
+    """
+    gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    height, frame_width = gray.shape[:2]
+    if width <= 0 or frame_width <= width:
+        return gray
+    analysis_height = max(1, round(height * width / frame_width))
+    return cv2.resize(gray, (width, analysis_height), interpolation=cv2.INTER_AREA)
+
+
+class AnalysisBuffers:
+    """
+    预分配的分析缓冲区（内存预算模式）：缩放和颜色转换直接写入复用的数组，
+    不为每个取样帧分配整帧大小的灰度或RGB临时数组；先缩小再转灰度，只读一遍原始帧
+    返回的数组在下一次调用时被覆盖，需要保留时由调用方复制
+    """
+
+    def __init__(self):
+        self._buffers = {}
+
+    def _get(self, name: str, shape: tuple) -> np.ndarray:
+        """按名称取缓冲区，尺寸变化时重新分配"""
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.shape != shape:
+            buffer = np.empty(shape, dtype=np.uint8)
+            self._buffers[name] = buffer
+        return buffer
+
+    def analysis_gray(self, frame: np.ndarray, width: int = DEFAULT_ANALYSIS_WIDTH) -> np.ndarray:
+        """
+        与 to_analysis_gray 相同，结果写入复用的缓冲区
+        :param frame: BGR视频帧或灰度帧
+        :param width: 分析分辨率宽度，0表示不缩放
+        :return: 灰度分析图
+        """
+        height, frame_width = frame.shape[:2]
+        if 0 < width < frame_width:
+            analysis_height = max(1, round(height * width / frame_width))
+            small = self._get('small', (analysis_height, width) + frame.shape[2:])
+            cv2.resize(frame, (width, analysis_height), dst=small, interpolation=cv2.INTER_AREA)
+            frame = small
+        if frame.ndim == 2:
+            return frame
+        gray = self._get('gray', frame.shape[:2])
+        cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray)
+        return gray
+
+    def rgb(self, frame: np.ndarray) -> np.ndarray:
+        """
+        BGR转换为RGB，结果写入复用的缓冲区
+        :param frame: BGR帧
+        :return: RGB帧
+        """
+        rgb = self._get('rgb', frame.shape)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb)
+        return rgb
+
+    @property
+    def nbytes(self) -> int:
+        """缓冲区占用的字节数"""
+        return sum(buffer.nbytes for buffer in self._buffers.values())
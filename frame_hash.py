@@ -0,0 +1,124 @@
+from typing import Sequence, Union
+
+import cv2
+import numpy as np
+
+# 哈希边长，与imagehash默认值相同，哈希为 HASH_SIZE × HASH_SIZE 位
+HASH_SIZE = 8
+
+# 支持的哈希方法: ahash(平均哈希), dhash(差异哈希), phash(DCT感知哈希)
+HASH_METHODS = ['ahash', 'dhash', 'phash']
+
+# pHash先缩小到 HASH_SIZE × PHASH_FACTOR 再做DCT，与imagehash的highfreq_factor相同
+PHASH_FACTOR = 4
+
+Frames = Union[np.ndarray, Sequence[np.ndarray]]
+
+
+def resize_batch(frames: Frames, width: int, height: int) -> np.ndarray:
+    """
+    将一批同尺寸灰度帧缩小到指定大小（区域平均），写入预先分配的数组
+    每帧缩放仍由cv2完成（比整批矩阵乘法快），之后的哈希计算对整批进行
+    :param frames: 灰度帧 (N, H, W)、帧列表或单帧 (H, W)
+    :param width: 目标宽度
+    :param height: 目标高度
+    :return: 缩小后的帧 (N, height, width)，float32
+    """
+    if isinstance(frames, np.ndarray) and frames.ndim == 2:
+        frames = frames[np.newaxis]
+    result = np.empty((len(frames), height, width), dtype=np.uint8)
+    for i, frame in enumerate(frames):
+        cv2.resize(frame, (width, height), dst=result[i], interpolation=cv2.INTER_AREA)
+    return result.astype(np.float32)
+
+
+def average_hash_batch(frames: Frames, hash_size: int = HASH_SIZE) -> np.ndarray:
+    """
+    批量计算平均哈希：缩小后每个像素是否高于该帧的平均值
+    :param frames: 灰度帧 (N, H, W) 或单帧 (H, W)
+    :param hash_size: 哈希边长
+    :return: 哈希位图 (N, hash_size, hash_size)，bool
+    """
+    small = resize_batch(frames, hash_size, hash_size)
+    return small > small.mean(axis=(1, 2), keepdims=True)
+
+
+def average_hash_input(frame: np.ndarray, hash_size: int = HASH_SIZE) -> np.ndarray:
+    """
+    将单帧缩小为平均哈希的输入，逐帧收集后整批传给average_hash_batch，结果与传入原帧相同，
+    只需保留 hash_size × hash_size 字节
+    :param frame: 灰度帧 (H, W)
+    :param hash_size: 哈希边长
+    :return: 缩小后的帧 (hash_size, hash_size)，uint8
+    """
+    return cv2.resize(frame, (hash_size, hash_size), interpolation=cv2.INTER_AREA)
+
+
+def difference_hash_batch(frames: Frames, hash_size: int = HASH_SIZE) -> np.ndarray:
+    """
+    批量计算差异哈希：缩小后每个像素是否比左侧像素亮
+    :param frames: 灰度帧 (N, H, W) 或单帧 (H, W)
+    :param hash_size: 哈希边长
+    :return: 哈希位图 (N, hash_size, hash_size)，bool
+    """
+    small = resize_batch(frames, hash_size + 1, hash_size)
+    return small[:, :, 1:] > small[:, :, :-1]
+
+
+def _dct_matrix(size: int, rows: int) -> np.ndarray:
+    """DCT-II变换矩阵的前rows行（未归一化，与scipy.fftpack.dct相同）"""
+    k = np.arange(rows)[:, np.newaxis]
+    n = np.arange(size)[np.newaxis, :]
+    return (2 * np.cos(np.pi * k * (2 * n + 1) / (2 * size))).astype(np.float32)
+
+
+def perceptual_hash_batch(frames: Frames, hash_size: int = HASH_SIZE) -> np.ndarray:
+    """
+    批量计算感知哈希：二维DCT的低频系数是否高于其中位数
+    DCT用矩阵乘法对整批帧一次完成，只计算需要的低频部分
+    :param frames: 灰度帧 (N, H, W) 或单帧 (H, W)
+    :param hash_size: 哈希边长
+    :return: 哈希位图 (N, hash_size, hash_size)，bool
+    """
+    size = hash_size * PHASH_FACTOR
+    small = resize_batch(frames, size, size)
+    dct = _dct_matrix(size, hash_size)
+    low = dct @ small @ dct.T
+    median = np.median(low.reshape(len(low), -1), axis=1)
+    return low > median[:, np.newaxis, np.newaxis]
+
+
+def hash_batch(frames: Frames, method: str = "ahash", hash_size: int = HASH_SIZE) -> np.ndarray:
+    """
+    按方法批量计算哈希
+    :param frames: 灰度帧 (N, H, W) 或单帧 (H, W)
+    :param method: 哈希方法 ("ahash", "dhash", "phash")
+    :param hash_size: 哈希边长
+    :return: 哈希位图 (N, hash_size, hash_size)，bool
+    """
+    if method == "ahash":
+        return average_hash_batch(frames, hash_size)
+    if method == "dhash":
+        return difference_hash_batch(frames, hash_size)
+    if method == "phash":
+        return perceptual_hash_batch(frames, hash_size)
+    raise ValueError(f"不支持的哈希方法: {method}")
+
+
+def hamming_distance(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    哈希位图之间的汉明距离，支持广播，如一批哈希与同一个参考哈希比较
+    :param a: 哈希位图 (..., hash_size, hash_size)
+    :param b: 哈希位图 (..., hash_size, hash_size)
+    :return: 不同位的个数
+    """
+    return np.count_nonzero(a != b, axis=(-2, -1))
+
+
+def pack_hashes(hashes: np.ndarray) -> np.ndarray:
+    """
+    将哈希位图按位打包，便于存储
+    :param hashes: 哈希位图 (N, hash_size, hash_size)
+    :return: 打包后的哈希 (N, hash_size * hash_size / 8)，uint8
+    """
+    return np.packbits(hashes.reshape(len(hashes), -1), axis=1)
@@ -0,0 +1,289 @@
+import cv2
+import numpy as np
+import logging
+from typing import Iterator, Optional, Tuple
+
+from choices import SAMPLING_STRATEGIES
+from roi import RegionSelector
+
+logger = logging.getLogger(__name__)
+
+# 无法从容器中读取GOP大小时使用的默认值（x264默认keyint）
+DEFAULT_GOP_SIZE = 250
+
+# 自适应取样的默认最大间隔（最小间隔的倍数）
+ADAPTIVE_MAX_FACTOR = 8
+
+
+class FrameSampler:
+    """
+    按固定帧间隔从视频中取样，并统计实际解码与检查的帧数
+    """
+
+    def __init__(self, cap: cv2.VideoCapture, frame_interval: int,
+                 strategy: str = "auto", gop_size: Optional[int] = None, start_frame: int = 0,
+                 end_frame: Optional[int] = None):
+        """
+        :param cap: 已打开的视频对象
+        :param frame_interval: 取样帧间隔（帧）
+        :param strategy: 取样策略 ("auto", "grab", "seek", "read")
+        :param gop_size: 关键帧间隔，未知时使用默认值
+        :param start_frame: 开始取样的帧编号（从检查点继续或分段处理时使用）
+        :param end_frame: 结束取样的帧编号（不含），None表示到视频末尾
+        """
+        if strategy not in SAMPLING_STRATEGIES:
+            raise ValueError(f"不支持的取样策略: {strategy}")
+
+        self.cap = cap
+        self.frame_interval = max(1, int(frame_interval))
+        self.fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+        self.total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        self.gop_size = gop_size or DEFAULT_GOP_SIZE
+        self.gop_known = bool(gop_size)
+        self.start_frame = max(0, int(start_frame))
+        self.end_frame = end_frame
+        if self.start_frame > 0 and self.fps <= 0:
+            logger.warning(f"无法获取帧率，按帧编号跳转到第 {self.start_frame} 帧，位置可能不准确")
+        self.strategy = self.choose_strategy(strategy)
+        # 取样间隔提示，ffmpeg管道解码器据此只输出取样帧；逐帧读取时每一帧都需要转换
+        if self.strategy != "read" and hasattr(cap, 'set_frame_step'):
+            cap.set_frame_step(self.frame_interval)
+
+        # 统计信息
+        self.decoded_frames = 0
+        self.inspected_frames = 0
+        self.seek_count = 0
+
+    def choose_strategy(self, strategy: str) -> str:
+        """
+        选择开销最小的取样策略
+        :param strategy: 用户指定的策略
+        :return: 实际使用的策略
+        """
+        if strategy != "auto":
+            return strategy
+        if not self.gop_known:
+            logger.info(f"无法获取关键帧间隔，按默认值 {DEFAULT_GOP_SIZE} 帧选择取样策略")
+
+        # 跳转需要从上一个关键帧开始解码，平均约半个GOP；
+        # 只有间隔超过一个GOP时跳转才比连续grab更省
+        if self.frame_interval > self.gop_size and self.fps > 0:
+            return "seek"
+        return "grab"
+
+    def __iter__(self) -> Iterator[Tuple[int, np.ndarray]]:
+        if self.strategy == "seek":
+            return self._iter_seek()
+        return self._iter_sequential()
+
+    def _stop_frame(self) -> int:
+        """取样范围的结束帧（不含），总帧数和结束帧都未知时为0"""
+        limits = [limit for limit in (self.total_frames, self.end_frame or 0) if limit > 0]
+        return min(limits) if limits else 0
+
+    def _seek_to(self, frame_index: int):
+        """跳转到指定帧：按时间戳跳转，帧率未知时按帧编号跳转"""
+        if self.fps > 0:
+            self.cap.set(cv2.CAP_PROP_POS_MSEC, frame_index * 1000.0 / self.fps)
+        else:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+        self.seek_count += 1
+
+    def _seek_start(self) -> int:
+        """跳转到开始取样的帧，返回该帧编号"""
+        if self.start_frame > 0:
+            self._seek_to(self.start_frame)
+        return self.start_frame
+
+    def _iter_sequential(self) -> Iterator[Tuple[int, np.ndarray]]:
+        """顺序解码，跳过的帧只grab不转换"""
+        frame_index = self._seek_start()
+        while self.end_frame is None or frame_index < self.end_frame:
+            if frame_index % self.frame_interval == 0 or self.strategy == "read":
+                ret, frame = self.cap.read()
+                if not ret:
+                    break
+                self.decoded_frames += 1
+                if frame_index % self.frame_interval == 0:
+                    self.inspected_frames += 1
+                    yield frame_index, frame
+            else:
+                if not self.cap.grab():
+                    break
+                self.decoded_frames += 1
+            frame_index += 1
+
+    def _iter_seek(self) -> Iterator[Tuple[int, np.ndarray]]:
+        """按时间戳跳转到每个取样帧"""
+        frame_index = self.start_frame
+        stop_frame = self._stop_frame()
+        while stop_frame <= 0 or frame_index < stop_frame:
+            if frame_index > 0:
+                self._seek_to(frame_index)
+            ret, frame = self.cap.read()
+            if not ret:
+                break
+            self.decoded_frames += 1
+            self.inspected_frames += 1
+            yield frame_index, frame
+            frame_index += self.frame_interval
+
+    def stats(self) -> dict:
+        """
+        返回取样统计信息
+        :return: 统计字典
+        """
+        return {
+            'strategy': self.strategy,
+            'frame_interval': self.frame_interval,
+            'decoded_frames': self.decoded_frames,
+            'inspected_frames': self.inspected_frames,
+            'seek_count': self.seek_count,
+        }
+
+    def log_stats(self):
+        """输出取样统计信息"""
+        logger.info(
+            f"取样策略: {self.strategy}，解码 {self.decoded_frames} 帧，"
+            f"检查 {self.inspected_frames} 帧，跳转 {self.seek_count} 次"
+        )
+
+
+class AdaptiveSampler(FrameSampler):
+    """
+    自适应间隔取样：
+    画面与上一个变化点相比不变时，每次取样后间隔加倍（不超过最大间隔）；
+    发现变化且当前间隔大于最小间隔时，跳回上一个不变的取样点，按最小间隔向前探测，
+    产出第一个发生变化的取样帧，之后从最小间隔重新开始
+
+    变化探测使用场景预筛的分块像素差异，只产出不变的取样帧和变化点，
+    被探测但未产出的帧不会交给OCR和SSIM
+    """
+
+    def __init__(self, cap: cv2.VideoCapture, frame_interval: int, max_interval: Optional[int] = None,
+                 threshold: Optional[float] = None, regions: Optional[RegionSelector] = None,
+                 gop_size: Optional[int] = None, start_frame: int = 0, end_frame: Optional[int] = None):
+        """
+        :param cap: 已打开的视频对象
+        :param frame_interval: 最小取样间隔（帧）
+        :param max_interval: 最大取样间隔（帧），默认为最小间隔的ADAPTIVE_MAX_FACTOR倍
+        :param threshold: 变化探测阈值，为None时使用场景预筛的默认值
+        :param regions: 识别区域，只比较这些区域
+        :param gop_size: 关键帧间隔，未知时使用默认值
+        :param start_frame: 开始取样的帧编号（从检查点继续或分段处理时使用）
+        :param end_frame: 结束取样的帧编号（不含），None表示到视频末尾
+        """
+        from scene_detector import SceneDetector
+
+        super().__init__(cap, frame_interval, "grab", gop_size, start_frame, end_frame)
+        self.strategy = "adaptive"
+        self.max_interval = max(self.frame_interval,
+                                int(max_interval or self.frame_interval * ADAPTIVE_MAX_FACTOR))
+        self.detector = SceneDetector(threshold, "mad", regions=regions)
+        self.backsteps = 0
+        # 视频对象下一次read()返回的帧编号
+        self._position = 0
+
+    def _read_at(self, frame_index: int) -> Optional[np.ndarray]:
+        """
+        读取指定帧：向前不超过一个GOP时顺序grab，否则（包括向后）按时间戳跳转
+        :param frame_index: 帧编号
+        :return: 帧，读取失败时返回None
+        """
+        if frame_index < self._position or frame_index - self._position > self.gop_size:
+            self._seek_to(frame_index)
+        else:
+            while self._position < frame_index:
+                if not self.cap.grab():
+                    return None
+                self.decoded_frames += 1
+                self._position += 1
+        ret, frame = self.cap.read()
+        if not ret:
+            return None
+        self.decoded_frames += 1
+        self.inspected_frames += 1
+        self._position = frame_index + 1
+        return frame
+
+    def _next_index(self, frame_index: int, step: int) -> int:
+        """
+        下一个取样点，大间隔越过取样范围末尾时退回到最后一个最小间隔取样点，保证结尾也被检查
+        """
+        next_index = frame_index + step
+        stop_frame = self._stop_frame()
+        if stop_frame > 0 and next_index >= stop_frame:
+            last = (stop_frame - 1) // self.frame_interval * self.frame_interval
+            if last > frame_index:
+                return last
+        return next_index
+
+    def __iter__(self) -> Iterator[Tuple[int, np.ndarray]]:
+        reference = None
+        frame_index = self.start_frame
+        previous_index = frame_index
+        step = self.frame_interval
+        stop_frame = self._stop_frame()
+        while stop_frame <= 0 or frame_index < stop_frame:
+            frame = self._read_at(frame_index)
+            if frame is None:
+                break
+            signature = self.detector.signature(frame)
+            if reference is not None and self.detector.distance(reference, signature) <= self.detector.threshold:
+                # 画面不变，加大间隔
+                step = min(step * 2, self.max_interval)
+                yield frame_index, frame
+                previous_index, frame_index = frame_index, self._next_index(frame_index, step)
+                continue
+
+            if reference is not None and frame_index - previous_index > self.frame_interval:
+                # 变化发生在上一个不变的取样点之后，回退按最小间隔找到第一个变化的取样点
+                self.backsteps += 1
+                probe_index = previous_index + self.frame_interval
+                while probe_index < frame_index:
+                    probe = self._read_at(probe_index)
+                    if probe is None:
+                        break
+                    probe_signature = self.detector.signature(probe)
+                    if self.detector.distance(reference, probe_signature) > self.detector.threshold:
+                        frame_index, frame, signature = probe_index, probe, probe_signature
+                        break
+                    probe_index += self.frame_interval
+
+            reference = signature
+            step = self.frame_interval
+            yield frame_index, frame
+            previous_index, frame_index = frame_index, self._next_index(frame_index, step)
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        stats['max_interval'] = self.max_interval
+        stats['backsteps'] = self.backsteps
+        return stats
+
+    def log_stats(self):
+        super().log_stats()
+        logger.info(f"自适应取样: 最大间隔 {self.max_interval} 帧，回退 {self.backsteps} 次")
+
+
+def create_sampler(cap: cv2.VideoCapture, frame_interval: int, strategy: str = "auto",
+                   max_interval: Optional[int] = None, regions: Optional[RegionSelector] = None,
+                   start_frame: int = 0, end_frame: Optional[int] = None,
+                   gop_size: Optional[int] = None) -> FrameSampler:
+    """
+    按取样策略创建取样器
+    :param cap: 已打开的视频对象
+    :param frame_interval: 取样帧间隔（自适应取样时为最小间隔）
+    :param strategy: 取样策略
+    :param max_interval: 自适应取样的最大间隔（帧）
+    :param regions: 识别区域，自适应取样只比较这些区域
+    :param start_frame: 开始取样的帧编号（从检查点继续或分段处理时使用）
+    :param end_frame: 结束取样的帧编号（不含），None表示到视频末尾
+    :param gop_size: 关键帧间隔（见 video_decoder.probe_gop_size），auto策略和自适应取样据此选择grab或seek，
+                     未知时使用默认值
+    :return: 取样器
+    """
+    if strategy == "adaptive":
+        return AdaptiveSampler(cap, frame_interval, max_interval, regions=regions, gop_size=gop_size,
+                               start_frame=start_frame, end_frame=end_frame)
+    return FrameSampler(cap, frame_interval, strategy, gop_size, start_frame, end_frame)
@@ -5,15 +5,17 @@ import os
 import sys
 from pathlib import Path
 
-from main import process_single_video
-from config import OCRConfig
+from batch_scheduler import run_batch
+from config import OCRConfig, OutputConfig, VideoConfig
+from choices import OUTPUT_FORMATS
+from processor_options import processor_options_from_config
 
 
 class VideoProcessorGUI:
     def __init__(self, root):
         self.root = root
         self.root.title("视频变化截图工具")
-        self.root.geometry("600x500")
+        self.root.geometry("640x760")
         
         # 设置窗口图标（如果有的话）
         try:
@@ -131,27 +133,92 @@ class VideoProcessorGUI:
         self.similarity_threshold_var = tk.StringVar(value="0.95")
         ttk.Entry(main_frame, textvariable=self.similarity_threshold_var, width=10).grid(row=6, column=1, sticky=tk.W, pady=5)
         
+        # 高级处理器首次处理时建立分析索引，之后调整阈值只重放决策，不再重新解码整个视频
+        self.index_var = tk.BooleanVar(value=VideoConfig.ANALYSIS_INDEX)
+        ttk.Checkbutton(main_frame, text="使用分析索引", variable=self.index_var).grid(row=6, column=2, sticky=tk.W, pady=5)
+        
         # 哈希差异阈值设置
         ttk.Label(main_frame, text="哈希差异阈值:").grid(row=7, column=0, sticky=tk.W, pady=5)
         
         self.hash_threshold_var = tk.StringVar(value="10")
         ttk.Entry(main_frame, textvariable=self.hash_threshold_var, width=10).grid(row=7, column=1, sticky=tk.W, pady=5)
         
-        # 分隔线
-        ttk.Separator(main_frame, orient='horizontal').grid(row=8, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=10)
+        # OCR并行设置
+        ttk.Label(main_frame, text="OCR进程数:").grid(row=8, column=0, sticky=tk.W, pady=5)
+        
+        ocr_frame = ttk.Frame(main_frame)
+        ocr_frame.grid(row=8, column=1, columnspan=2, sticky=tk.W, pady=5)
+        
+        self.ocr_workers_var = tk.StringVar(value=str(OCRConfig.WORKERS))
+        ttk.Entry(ocr_frame, textvariable=self.ocr_workers_var, width=10).grid(row=0, column=0, sticky=tk.W)
+        
+        ttk.Label(ocr_frame, text="队列深度:").grid(row=0, column=1, sticky=tk.W, padx=(10, 0))
+        self.ocr_queue_depth_var = tk.StringVar(value=str(OCRConfig.QUEUE_DEPTH))
+        ttk.Entry(ocr_frame, textvariable=self.ocr_queue_depth_var, width=10).grid(row=0, column=2, sticky=tk.W, padx=(5, 0))
+        
+        ttk.Label(ocr_frame, text="并行视频数:").grid(row=0, column=3, sticky=tk.W, padx=(10, 0))
+        self.jobs_var = tk.StringVar(value="1")
+        ttk.Entry(ocr_frame, textvariable=self.jobs_var, width=6).grid(row=0, column=4, sticky=tk.W, padx=(5, 0))
+        
+        # 上次处理中断（如关闭窗口）时，从输出目录旁的检查点继续
+        self.resume_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(ocr_frame, text="从检查点继续", variable=self.resume_var).grid(row=0, column=5, sticky=tk.W, padx=(10, 0))
+        
+        # 截图格式设置
+        ttk.Label(main_frame, text="截图格式:").grid(row=9, column=0, sticky=tk.W, pady=5)
+        
+        format_frame = ttk.Frame(main_frame)
+        format_frame.grid(row=9, column=1, columnspan=2, sticky=tk.W, pady=5)
         
-        # 进度条
-        self.progress = ttk.Progressbar(main_frame, mode='indeterminate')
-        self.progress.grid(row=9, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=5)
+        self.format_var = tk.StringVar(value=OutputConfig.FORMAT)
+        ttk.Combobox(format_frame, textvariable=self.format_var, values=OUTPUT_FORMATS,
+                     state="readonly", width=8).grid(row=0, column=0, sticky=tk.W)
+        
+        ttk.Label(format_frame, text="质量:").grid(row=0, column=1, sticky=tk.W, padx=(10, 0))
+        self.quality_var = tk.StringVar(value="" if OutputConfig.QUALITY is None else str(OutputConfig.QUALITY))
+        ttk.Entry(format_frame, textvariable=self.quality_var, width=6).grid(row=0, column=2, sticky=tk.W, padx=(5, 0))
+        
+        ttk.Label(format_frame, text="PNG压缩级别:").grid(row=0, column=3, sticky=tk.W, padx=(10, 0))
+        self.png_compression_var = tk.StringVar(value=str(OutputConfig.PNG_COMPRESSION))
+        ttk.Entry(format_frame, textvariable=self.png_compression_var, width=4).grid(row=0, column=4, sticky=tk.W, padx=(5, 0))
+        
+        self.webp_lossless_var = tk.BooleanVar(value=OutputConfig.WEBP_LOSSLESS)
+        ttk.Checkbutton(format_frame, text="WebP无损", variable=self.webp_lossless_var).grid(row=0, column=5, sticky=tk.W, padx=(10, 0))
+        
+        # 识别区域设置
+        ttk.Label(main_frame, text="识别区域:").grid(row=10, column=0, sticky=tk.W, pady=5)
+        
+        self.roi_var = tk.StringVar(value="; ".join(VideoConfig.ROI))
+        ttk.Entry(main_frame, textvariable=self.roi_var, width=40).grid(row=10, column=1, sticky=tk.W, pady=5)
+        ttk.Label(main_frame, text="x,y,w,h；多个用分号分隔，留空为整帧").grid(row=10, column=2, sticky=tk.W, pady=5)
+        
+        # 分隔线
+        ttk.Separator(main_frame, orient='horizontal').grid(row=11, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=10)
+        
+        # 每个文件一行的进度列表
+        self.progress_tree = ttk.Treeview(main_frame, columns=("status", "progress"), height=4)
+        self.progress_tree.heading("#0", text="文件")
+        self.progress_tree.heading("status", text="状态")
+        self.progress_tree.heading("progress", text="进度")
+        self.progress_tree.column("#0", width=300)
+        self.progress_tree.column("status", width=180)
+        self.progress_tree.column("progress", width=80, anchor=tk.E)
+        self.progress_tree.grid(row=12, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=5)
+        self.progress_rows = {}
+        
+        # 总进度条
+        self.progress = ttk.Progressbar(main_frame, mode='determinate')
+        self.progress.grid(row=13, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=5)
+        self.processing = False
         
         # 状态标签
         self.status_var = tk.StringVar(value="就绪")
         self.status_label = ttk.Label(main_frame, textvariable=self.status_var)
-        self.status_label.grid(row=10, column=0, columnspan=3, sticky=tk.W, pady=5)
+        self.status_label.grid(row=14, column=0, columnspan=3, sticky=tk.W, pady=5)
         
         # 开始处理按钮
         self.start_button = ttk.Button(main_frame, text="开始处理", command=self.start_processing)
-        self.start_button.grid(row=11, column=0, columnspan=3, pady=10)
+        self.start_button.grid(row=15, column=0, columnspan=3, pady=10)
         
         # 绑定关闭事件
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
@@ -201,6 +268,10 @@ class VideoProcessorGUI:
         
     def validate_inputs(self):
         """验证用户输入"""
+        # 依赖OpenCV、numpy的模块在使用时才导入，界面启动更快
+        from roi import parse_rois
+        from screenshot_writer import ImageEncoder
+
         if not self.selected_files:
             messagebox.showerror("错误", "请至少选择一个视频文件")
             return False
@@ -213,16 +284,50 @@ class VideoProcessorGUI:
             messagebox.showerror("错误", f"帧间隔设置无效: {e}")
             return False
             
+        try:
+            ocr_workers = int(self.ocr_workers_var.get())
+            ocr_queue_depth = int(self.ocr_queue_depth_var.get())
+            jobs = int(self.jobs_var.get())
+            if ocr_workers < 0 or ocr_queue_depth < 0 or jobs < 1:
+                raise ValueError("OCR进程数和队列深度不能为负数，并行视频数至少为1")
+        except ValueError as e:
+            messagebox.showerror("错误", f"OCR并行设置无效: {e}")
+            return False
+            
+        try:
+            parse_rois(self.roi_var.get())
+        except ValueError as e:
+            messagebox.showerror("错误", f"识别区域设置无效: {e}")
+            return False
+            
+        try:
+            ImageEncoder(self.format_var.get(), self._get_quality(), int(self.png_compression_var.get()),
+                         self.webp_lossless_var.get())
+        except ValueError as e:
+            messagebox.showerror("错误", f"截图格式设置无效: {e}")
+            return False
+            
         return True
         
+    def _get_quality(self):
+        """获取截图质量，留空表示使用默认值"""
+        quality = self.quality_var.get().strip()
+        return int(quality) if quality else None
+        
     def start_processing(self):
         """开始处理视频文件"""
         if not self.validate_inputs():
             return
             
-        # 禁用开始按钮，显示进度条
+        # 禁用开始按钮，为每个文件创建进度行
         self.start_button.config(state=tk.DISABLED)
-        self.progress.start()
+        self.processing = True
+        self.progress_tree.delete(*self.progress_tree.get_children())
+        self.progress_rows = {}
+        for file_path in self.selected_files:
+            self.progress_rows[file_path] = self.progress_tree.insert(
+                "", tk.END, text=os.path.basename(file_path), values=("等待中", ""))
+        self.progress.config(maximum=len(self.selected_files), value=0)
         self.status_var.set("正在处理...")
         
         # 在新线程中处理文件，避免界面冻结
@@ -230,6 +335,8 @@ class VideoProcessorGUI:
         
     def process_files(self):
         """在后台线程中处理文件"""
+        from roi import parse_rois
+
         try:
             interval = float(self.interval_var.get())
             processor_type = self.processor_var.get()
@@ -239,24 +346,58 @@ class VideoProcessorGUI:
             similarity_threshold = float(self.similarity_threshold_var.get())
             hash_threshold = int(self.hash_threshold_var.get())
             
-            success_count = 0
-            total_files = len(self.selected_files)
+            # 其余选项沿用配置文件，界面上的OCR并行、截图格式、识别区域和检查点设置覆盖对应项
+            processor_options = processor_options_from_config(processor_type)
+            processor_options.update({
+                'ocr_workers': int(self.ocr_workers_var.get()),
+                'ocr_queue_depth': int(self.ocr_queue_depth_var.get()),
+                'image_format': self.format_var.get(),
+                'image_quality': self._get_quality(),
+                'png_compression': int(self.png_compression_var.get()),
+                'webp_lossless': self.webp_lossless_var.get(),
+                'roi': parse_rois(self.roi_var.get()),
+                'resume': self.resume_var.get(),
+            })
+            if processor_type == "advanced":
+                processor_options['analysis_index'] = self.index_var.get()
+            
+            # 多个视频在进程池中并行处理，长视频优先开始
+            results = run_batch(list(self.selected_files), interval, processor_type, method,
+                                similarity_threshold, hash_threshold, processor_options,
+                                jobs=int(self.jobs_var.get()),
+                                on_start=lambda path: self.root.after(0, self.on_file_start, path),
+                                on_progress=lambda path, fraction: self.root.after(0, self.on_file_progress, path, fraction),
+                                on_complete=lambda result: self.root.after(0, self.on_file_complete, result))
             
-            for i, file_path in enumerate(self.selected_files):
-                self.root.after(0, self.status_var.set, f"正在处理 ({i+1}/{total_files}): {os.path.basename(file_path)}")
-                
-                if process_single_video(file_path, interval, processor_type, method, similarity_threshold, hash_threshold):
-                    success_count += 1
-                    
             # 处理完成
-            self.root.after(0, self.on_processing_complete, success_count, total_files)
+            success_count = sum(1 for result in results if result['success'])
+            self.root.after(0, self.on_processing_complete, success_count, len(results))
             
         except Exception as e:
             self.root.after(0, self.on_processing_error, str(e))
             
+    def on_file_start(self, file_path):
+        """单个文件开始处理的回调函数"""
+        self.progress_tree.item(self.progress_rows[file_path], values=("处理中", "0%"))
+        
+    def on_file_progress(self, file_path, fraction):
+        """单个文件进度更新的回调函数"""
+        self.progress_tree.item(self.progress_rows[file_path], values=("处理中", f"{fraction:.0%}"))
+        
+    def on_file_complete(self, result):
+        """单个文件处理完成的回调函数"""
+        if result['success']:
+            status = f"完成，{len(result['screenshots'])} 张截图"
+            progress = "100%"
+        else:
+            status = f"失败: {result['error']}"
+            progress = ""
+        self.progress_tree.item(self.progress_rows[result['video_path']], values=(status, progress))
+        self.progress.config(value=self.progress["value"] + 1)
+        
     def on_processing_complete(self, success_count, total_files):
         """处理完成的回调函数"""
-        self.progress.stop()
+        self.processing = False
         self.start_button.config(state=tk.NORMAL)
         self.status_var.set(f"处理完成: {success_count}/{total_files} 个文件处理成功")
         
@@ -267,7 +408,7 @@ class VideoProcessorGUI:
         
     def on_processing_error(self, error_message):
         """处理出错的回调函数"""
-        self.progress.stop()
+        self.processing = False
         self.start_button.config(state=tk.NORMAL)
         self.status_var.set("处理出错")
         
@@ -275,7 +416,7 @@ class VideoProcessorGUI:
         
     def on_closing(self):
         """窗口关闭事件"""
-        if self.progress.instate(['active']):
+        if self.processing:
             if messagebox.askokcancel("确认退出", "正在处理文件，确定要退出吗？"):
                 self.root.destroy()
         else:
@@ -284,12 +425,6 @@ class VideoProcessorGUI:
 
 def main():
     print("GUI main函数开始执行...")
-    # 设置OCR路径
-    if OCRConfig.TESSERACT_CMD and os.path.exists(OCRConfig.TESSERACT_CMD):
-        import pytesseract
-        pytesseract.pytesseract.tesseract_cmd = OCRConfig.TESSERACT_CMD
-        print("OCR路径设置完成")
-    
     print("正在创建Tk根窗口...")
     root = tk.Tk()
     print("Tk根窗口创建完成")
@@ -5,58 +5,66 @@ import logging
 from pathlib import Path
 from typing import List
 
-from video_processor import VideoProcessor
-from advanced_video_processor import AdvancedVideoProcessor
-from config import OCRConfig, VideoConfig
+# 这里只导入不依赖OpenCV、numpy的模块，显示帮助或启动界面时不加载它们；
+# Tesseract路径在第一次创建OCR引擎时按配置设置
+from batch_scheduler import run_batch, run_video, summarize
+from config import OCRConfig, VideoConfig, OutputConfig
+from choices import DECODER_BACKENDS, OCR_BACKENDS, OUTPUT_FORMATS, SAMPLING_STRATEGIES, SCENE_METHODS
+from processor_options import processor_options_from_config
 
-# 设置OCR路径
-if OCRConfig.TESSERACT_CMD and os.path.exists(OCRConfig.TESSERACT_CMD):
-    import pytesseract
-    pytesseract.pytesseract.tesseract_cmd = OCRConfig.TESSERACT_CMD
+
+def parse_roi(spec: str):
+    """
+    解析 --roi 参数，识别区域模块依赖numpy，只在指定该参数时导入
+    :param spec: "x,y,w,h"
+    :return: 识别区域
+    """
+    import roi
+    return roi.parse_roi(spec)
 
 def process_single_video(video_path: str, interval: float = VideoConfig.DEFAULT_INTERVAL, 
                          processor_type: str = "basic", method: str = "combined",
-                         similarity_threshold: float = 0.95, hash_threshold: int = 10) -> bool:
+                         similarity_threshold: float = 0.95, hash_threshold: int = 10,
+                         **processor_options) -> bool:
     """
     处理单个视频文件
     :param video_path: 视频文件路径
     :param interval: 处理帧的时间间隔（秒）
+    :param processor_options: 传递给处理器构造函数的其他选项（如sampling_strategy）
     :return: 处理是否成功
     """
     if not os.path.exists(video_path):
         print(f"错误: 视频文件不存在: {video_path}")
         return False
         
-    try:
-        if processor_type == "basic":
-            processor = VideoProcessor(video_path)
-            screenshots = processor.process_video(interval)
-        else:  # advanced
-            processor = AdvancedVideoProcessor(video_path)
-            # 使用支持自定义阈值的新方法
-            screenshots = processor.extract_frames_with_custom_thresholds(interval, method, similarity_threshold, hash_threshold)
-            
-        print(f"处理完成: {video_path}")
-        print(f"生成截图数量: {len(screenshots)}")
-        print(f"截图保存位置: {processor.output_dir}")
-        return True
-    except Exception as e:
-        print(f"处理视频时出错: {e}")
+    result = run_video(video_path, interval, processor_type, method, similarity_threshold, hash_threshold,
+                       processor_options)
+    if not result['success']:
+        print(f"处理视频时出错: {result['error']}")
         return False
+        
+    print(f"处理完成: {video_path}")
+    print(f"生成截图数量: {len(result['screenshots'])}")
+    print(f"截图保存位置: {result['output_dir']}")
+    return True
 
 def process_multiple_videos(video_paths: List[str], interval: float = VideoConfig.DEFAULT_INTERVAL, 
-                            processor_type: str = "basic", method: str = "combined") -> None:
+                            processor_type: str = "basic", method: str = "combined",
+                            jobs: int = 1, **processor_options) -> None:
     """
     处理多个视频文件
     :param video_paths: 视频文件路径列表
     :param interval: 处理帧的时间间隔（秒）
+    :param jobs: 并行处理的视频数，长视频优先开始
     """
-    success_count = 0
-    for video_path in video_paths:
-        if process_single_video(video_path, interval, processor_type, method):
-            success_count += 1
-            
-    print(f"\n批量处理完成: {success_count}/{len(video_paths)} 个视频处理成功")
+    def on_complete(result):
+        status = "处理完成" if result['success'] else f"处理失败: {result['error']}"
+        print(f"{status}: {result['video_path']}")
+        
+    results = run_batch(video_paths, interval, processor_type, method,
+                        processor_options=processor_options, jobs=jobs, on_complete=on_complete)
+    print()
+    print(summarize(results))
 
 def main():
     parser = argparse.ArgumentParser(
@@ -67,7 +75,22 @@ def main():
   python main.py video1.mp4 video2.mp4
   python main.py video.mp4 --interval 0.5
   python main.py video.mp4 --processor advanced --method text
+  python main.py video.mp4 --interval 30 --sampling seek
+  python main.py video.mp4 --interval 0.5 --sampling adaptive --max-interval 8
+  python main.py video.mp4 --interval 2 --refine
+  python main.py video.mp4 --resume
+  python main.py video.mp4 --ocr-workers 4
+  python main.py video.mp4 --decoder pyav --decoder-threads 4
+  python main.py video.mp4 --format jpg --quality 85
+  python main.py video.mp4 --roi 0,0.8,1,0.2
+  python main.py video.mp4 --processor advanced --interval 0.2 --scene-detect mad
+  python main.py video.mp4 --processor advanced --index
+  python main.py video.mp4 --processor advanced --method image --analysis-stream --decoder ffmpeg
+  python main.py long_video.mp4 --processor advanced --segments 4
+  python main.py video_4k.mp4 --processor advanced --memory-budget 512
+  python main.py video.mp4 --profile --profile-trace trace.csv
   python main.py *.mp4
+  python main.py *.mp4 --jobs 4
         """
     )
     parser.add_argument('videos', nargs='*', help='视频文件路径（支持多个文件）')
@@ -77,6 +100,79 @@ def main():
                         help='处理器类型: basic(基础文字检测), advanced(高级综合检测), 默认为basic')
     parser.add_argument('--method', choices=['text', 'image', 'combined'], default='combined',
                         help='高级处理器的检测方法: text(文字变化), image(图像变化), combined(结合), 默认为combined')
+    parser.add_argument('--sampling', choices=SAMPLING_STRATEGIES, default=VideoConfig.SAMPLING_STRATEGY,
+                        help='取样策略: auto(自动选择), grab(跳帧不解码转换), seek(按时间戳跳转), read(逐帧读取), '
+                             'adaptive(画面不变时逐步加大间隔，发现变化时回退到--interval找到变化点), 默认为auto')
+    parser.add_argument('--max-interval', type=float, default=VideoConfig.MAX_INTERVAL,
+                        help='自适应取样的最大间隔（秒），默认为处理间隔的8倍')
+    parser.add_argument('--refine', action='store_true', default=VideoConfig.REFINE_CHANGES,
+                        help='检测到变化时在两次取样之间二分查找确切的切换帧，保存该帧并记录时间戳')
+    parser.add_argument('--resume', action='store_true',
+                        help='从上次中断时保存的检查点继续处理')
+    parser.add_argument('--checkpoint-interval', type=float, default=VideoConfig.CHECKPOINT_INTERVAL,
+                        help=f'检查点保存间隔（秒），0表示关闭，默认为{VideoConfig.CHECKPOINT_INTERVAL}')
+    parser.add_argument('--decoder', choices=DECODER_BACKENDS, default=VideoConfig.DECODER,
+                        help='解码后端: opencv(cv2.VideoCapture), pyav(PyAV多线程解码，需要安装av), '
+                             'ffmpeg(ffmpeg子进程管道，只输出取样帧)，默认为' + VideoConfig.DECODER)
+    parser.add_argument('--decoder-threads', type=int, default=VideoConfig.DECODER_THREADS,
+                        help='解码线程数，0表示由解码后端决定')
+    parser.add_argument('--ocr-backend', choices=OCR_BACKENDS, default=OCRConfig.BACKEND,
+                        help='OCR后端: auto(优先常驻引擎), pytesseract(每帧启动tesseract), tesserocr(常驻引擎)')
+    parser.add_argument('--ocr-workers', type=int, default=OCRConfig.WORKERS,
+                        help=f'OCR工作进程数，0表示同步识别，默认为{OCRConfig.WORKERS}')
+    parser.add_argument('--ocr-queue-depth', type=int, default=OCRConfig.QUEUE_DEPTH,
+                        help='同时等待OCR的最大帧数，0表示工作进程数的2倍')
+    parser.add_argument('--no-ocr-cache', action='store_true',
+                        help='不使用OCR结果磁盘缓存')
+    parser.add_argument('--ocr-gate-threshold', type=float, default=OCRConfig.GATE_THRESHOLD,
+                        help=f'画面与上次OCR的帧差异不超过该值(0-255)时跳过OCR，0表示关闭，默认为{OCRConfig.GATE_THRESHOLD}')
+    parser.add_argument('--text-similarity', type=float, default=OCRConfig.TEXT_SIMILARITY,
+                        help='规范化后的文字相似度低于该值(0-1)时认为文字变化，1表示只忽略空白、标点、全半角和大小写，'
+                             f'默认为{OCRConfig.TEXT_SIMILARITY}')
+    parser.add_argument('--ocr-lang', default=OCRConfig.LANGUAGES,
+                        help=f'OCR语言（Tesseract语言代码，多种语言用+连接），默认为{OCRConfig.LANGUAGES}')
+    parser.add_argument('--ocr-min-confidence', type=float, default=OCRConfig.MIN_CONFIDENCE,
+                        help='丢弃置信度低于该值(0-100)的OCR单词，0表示不过滤')
+    parser.add_argument('--analysis-width', type=int, default=VideoConfig.ANALYSIS_WIDTH,
+                        help=f'高级处理器图像比较使用的分析分辨率宽度，0表示原始分辨率，默认为{VideoConfig.ANALYSIS_WIDTH}')
+    parser.add_argument('--scene-detect', choices=SCENE_METHODS, default=VideoConfig.SCENE_METHOD,
+                        help='场景变化预筛（仅高级处理器）：只对候选变化点附近的帧做OCR和SSIM，'
+                             'mad对局部文字变化敏感，hist只适合画面整体切换')
+    parser.add_argument('--scene-threshold', type=float, default=VideoConfig.SCENE_THRESHOLD,
+                        help='场景预筛阈值，默认mad为3、hist为0.15')
+    parser.add_argument('--scene-settle', type=int, default=VideoConfig.SCENE_SETTLE,
+                        help=f'候选变化点之后继续分析的取样帧数，默认为{VideoConfig.SCENE_SETTLE}')
+    parser.add_argument('--index', action='store_true', default=VideoConfig.ANALYSIS_INDEX,
+                        help='使用分析索引（仅高级处理器）：首次处理时保存每个取样帧的特征，'
+                             '之后调整阈值时不再重新解码整个视频')
+    parser.add_argument('--analysis-stream', action='store_true', default=VideoConfig.ANALYSIS_STREAM,
+                        help='使用分析流（仅高级处理器）：解码器直接输出灰度帧（仅图像检测时缩小到分析分辨率），'
+                             '只在保存截图时读取原始彩色帧')
+    parser.add_argument('--segments', type=int, default=VideoConfig.SEGMENTS,
+                        help='分段并行（仅高级处理器）：单个视频分为几段在多个进程中同时处理，0表示CPU核数，'
+                             f'默认为{VideoConfig.SEGMENTS}')
+    parser.add_argument('--segment-overlap', type=float, default=VideoConfig.SEGMENT_OVERLAP,
+                        help=f'段间重叠（秒），默认为{VideoConfig.SEGMENT_OVERLAP}')
+    parser.add_argument('--memory-budget', type=float, default=VideoConfig.MEMORY_BUDGET_MB, metavar='MB',
+                        help='内存预算（仅高级处理器）：限制在途整帧数并复用转换缓冲区，0表示不限制')
+    parser.add_argument('--writer-threads', type=int, default=OutputConfig.WRITER_THREADS,
+                        help=f'截图后台写入线程数，0表示同步写入，默认为{OutputConfig.WRITER_THREADS}')
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default=OutputConfig.FORMAT,
+                        help=f'截图格式: png(无损), jpg, webp，默认为{OutputConfig.FORMAT}')
+    parser.add_argument('--quality', type=int, default=OutputConfig.QUALITY,
+                        help='JPEG/WebP质量(1-100)，默认JPEG为95、WebP为90')
+    parser.add_argument('--png-compression', type=int, default=OutputConfig.PNG_COMPRESSION,
+                        help=f'PNG压缩级别(0-9)，越大文件越小、编码越慢，默认为{OutputConfig.PNG_COMPRESSION}')
+    parser.add_argument('--webp-lossless', action='store_true', default=OutputConfig.WEBP_LOSSLESS,
+                        help='WebP使用无损压缩')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='批量处理时并行处理的视频数，默认为1（依次处理）')
+    parser.add_argument('--roi', type=parse_roi, action='append', metavar='X,Y,W,H',
+                        help='只对该区域做OCR和变化检测，可多次指定；0-1之间的值按画面比例解释，否则为像素')
+    parser.add_argument('--profile', action='store_true',
+                        help='处理结束后输出各阶段（解码、转换、OCR、SSIM、哈希、编码、写盘）的耗时汇总')
+    parser.add_argument('--profile-trace', metavar='PATH',
+                        help='将逐次计时记录写入JSON或CSV文件（按扩展名），批量处理时指定目录，按视频名生成文件')
     parser.add_argument('--version', action='version', version='视频变化截图工具 1.0')
     parser.add_argument('--gui', action='store_true', help='启动图形界面')
     
@@ -99,26 +195,59 @@ def main():
             traceback.print_exc()
         return
     
-    # 设置OCR路径
-    if OCRConfig.TESSERACT_CMD and os.path.exists(OCRConfig.TESSERACT_CMD):
-        import pytesseract
-        pytesseract.pytesseract.tesseract_cmd = OCRConfig.TESSERACT_CMD
-    
     # 检查是否提供了视频文件
     if not args.videos:
         parser.print_help()
         return
     
-    # 设置OCR路径
-    if OCRConfig.TESSERACT_CMD and os.path.exists(OCRConfig.TESSERACT_CMD):
-        import pytesseract
-        pytesseract.pytesseract.tesseract_cmd = OCRConfig.TESSERACT_CMD
+    # 命令行参数覆盖配置文件中的对应选项
+    processor_options = processor_options_from_config(args.processor)
+    processor_options.update({
+        'sampling_strategy': args.sampling,
+        'max_interval': args.max_interval,
+        'refine_changes': args.refine,
+        'resume': args.resume,
+        'checkpoint_interval': args.checkpoint_interval,
+        'decoder': args.decoder,
+        'decoder_threads': args.decoder_threads,
+        'ocr_workers': args.ocr_workers,
+        'ocr_queue_depth': args.ocr_queue_depth,
+        'ocr_backend': args.ocr_backend,
+        'ocr_gate_threshold': args.ocr_gate_threshold,
+        'text_similarity': args.text_similarity,
+        'ocr_min_confidence': args.ocr_min_confidence,
+        'ocr_lang': args.ocr_lang,
+        'ocr_cache': OCRConfig.CACHE_ENABLED and not args.no_ocr_cache,
+        'writer_threads': args.writer_threads,
+        'image_format': args.format,
+        'image_quality': args.quality,
+        'png_compression': args.png_compression,
+        'webp_lossless': args.webp_lossless,
+        'roi': args.roi or VideoConfig.ROI,
+        'profile': args.profile,
+        'profile_trace': args.profile_trace,
+    })
+    if args.processor == 'advanced':
+        # 仅高级处理器进行图像比较和场景预筛
+        processor_options.update({
+            'analysis_width': args.analysis_width,
+            'scene_method': args.scene_detect,
+            'scene_threshold': args.scene_threshold,
+            'scene_settle': args.scene_settle,
+            'analysis_index': args.index,
+            'analysis_stream': args.analysis_stream,
+            'segments': args.segments,
+            'segment_overlap': args.segment_overlap,
+            'memory_budget_mb': args.memory_budget,
+        })
     
     # 处理视频文件
     if len(args.videos) == 1:
-        process_single_video(args.videos[0], args.interval, args.processor, args.method)
+        process_single_video(args.videos[0], args.interval, args.processor, args.method,
+                             **processor_options)
     else:
-        process_multiple_videos(args.videos, args.interval, args.processor, args.method)
+        process_multiple_videos(args.videos, args.interval, args.processor, args.method,
+                                args.jobs, **processor_options)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
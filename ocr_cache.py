@@ -0,0 +1,192 @@
+import os
+import importlib.util
+import time
+import sqlite3
+import hashlib
+import logging
+from typing import Optional
+
+import numpy as np
+
+from choices import DEFAULT_OCR_LANG
+
+logger = logging.getLogger(__name__)
+
+# 缓存格式版本，OCR预处理或键的计算方式变化时递增，旧记录自然失效
+OCR_CACHE_VERSION = 1
+
+# 默认缓存上限（MB）
+DEFAULT_CACHE_MAX_MB = 64
+
+# 每累计这么多次写入提交一次事务，减少磁盘同步
+_COMMIT_EVERY = 32
+
+# 每条记录除键和文字外的估计开销（字节）
+_ROW_OVERHEAD = 64
+
+
+def default_cache_path() -> str:
+    """
+    默认缓存文件路径：PathConfig.TEMP_DIR 下的 ocr_cache.sqlite3
+    :return: 缓存文件路径
+    """
+    try:
+        from config import PathConfig
+        temp_dir = PathConfig.TEMP_DIR
+    except ImportError:
+        temp_dir = os.path.join(os.path.expanduser('~'), '.video_processor', 'temp')
+    return os.path.join(temp_dir, 'ocr_cache.sqlite3')
+
+
+def resolve_backend(backend: str) -> str:
+    """
+    预估auto将使用的OCR后端（只检查tesserocr是否已安装，不导入）
+    tesserocr创建引擎失败时仍会回退到pytesseract，缓存的命名空间以实际创建的引擎为准，见 OCRCache.set_backend()
+    :param backend: OCR后端
+    :return: 预估的后端名称
+    """
+    if backend != "auto":
+        return backend
+    return "tesserocr" if importlib.util.find_spec("tesserocr") is not None else "pytesseract"
+
+
+class OCRCache:
+    """
+    OCR结果磁盘缓存（SQLite）：同一帧的识别结果不会变化，重复处理同一视频时直接复用
+    键为OCR输入图像内容的哈希加上后端和语言，超过大小上限时按最近使用时间淘汰
+    后端为auto时，需要在创建OCR引擎后用 set_backend() 记录实际的后端，之后才能计算键
+    多个进程可以同时使用同一个缓存文件
+    """
+
+    def __init__(self, path: Optional[str] = None, backend: str = "auto", lang: str = DEFAULT_OCR_LANG,
+                 max_mb: float = DEFAULT_CACHE_MAX_MB, min_confidence: float = 0):
+        """
+        :param path: 缓存文件路径，默认为 default_cache_path()
+        :param backend: OCR后端，auto表示由实际创建的引擎决定
+        :param lang: OCR语言
+        :param max_mb: 缓存大小上限（MB）
+        :param min_confidence: OCR单词置信度下限，过滤后的结果与未过滤的分开缓存
+        """
+        self.path = path or default_cache_path()
+        self.lang = lang
+        self.min_confidence = min_confidence
+        self.namespace = None
+        if backend != "auto":
+            self.set_backend(backend)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self._pending = 0
+        self._conn = None
+        self._size = 0
+
+    def set_backend(self, backend: str):
+        """
+        记录实际使用的OCR后端（引擎的name），不同后端的识别结果分开缓存
+        :param backend: 后端名称
+        """
+        namespace = f"{OCR_CACHE_VERSION}|{backend}|{self.lang}"
+        if self.min_confidence > 0:
+            namespace += f"|conf={self.min_confidence:g}"
+        self.namespace = namespace.encode('utf-8')
+
+    def _connect(self) -> sqlite3.Connection:
+        """首次使用时打开数据库"""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS ocr_cache ("
+                "key BLOB PRIMARY KEY, text TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS ocr_cache_last_used ON ocr_cache (last_used)")
+            self._size = self._total_size()
+        return self._conn
+
+    def _total_size(self) -> int:
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM ocr_cache").fetchone()[0]
+
+    def key(self, image: np.ndarray) -> bytes:
+        """
+        计算OCR输入图像的缓存键
+        :param image: OCR输入图像（RGB数组）
+        :return: 缓存键
+        """
+        if self.namespace is None:
+            raise RuntimeError("OCR后端尚未确定，需要先调用 set_backend()")
+        digest = hashlib.blake2b(self.namespace, digest_size=16)
+        digest.update(str(image.shape).encode('ascii'))
+        digest.update(np.ascontiguousarray(image).data)
+        return digest.digest()
+
+    def get(self, key: bytes) -> Optional[str]:
+        """
+        查询缓存
+        :param key: 缓存键
+        :return: 识别出的文字，未命中时返回None
+        """
+        conn = self._connect()
+        row = conn.execute("SELECT text FROM ocr_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        conn.execute("UPDATE ocr_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+        self._maybe_commit()
+        return row[0]
+
+    def put(self, key: bytes, text: str):
+        """
+        写入缓存，超过大小上限时淘汰最久未使用的记录
+        :param key: 缓存键
+        :param text: 识别出的文字
+        """
+        conn = self._connect()
+        size = len(key) + len(text.encode('utf-8')) + _ROW_OVERHEAD
+        conn.execute("INSERT OR REPLACE INTO ocr_cache (key, text, size, last_used) VALUES (?, ?, ?, ?)",
+                     (key, text, size, time.time()))
+        self._size += size
+        if self._size > self.max_bytes:
+            self._evict()
+        self._maybe_commit()
+
+    def _evict(self):
+        """淘汰最久未使用的记录，直到占用降到上限的90%"""
+        conn = self._conn
+        # 其他进程也可能写入，淘汰前重新统计
+        self._size = self._total_size()
+        target = int(self.max_bytes * 0.9)
+        if self._size <= target:
+            return
+        removed = 0
+        for key, size in conn.execute("SELECT key, size FROM ocr_cache ORDER BY last_used").fetchall():
+            if self._size <= target:
+                break
+            conn.execute("DELETE FROM ocr_cache WHERE key = ?", (key,))
+            self._size -= size
+            removed += 1
+        logger.debug(f"OCR缓存淘汰 {removed} 条记录")
+
+    def _maybe_commit(self):
+        self._pending += 1
+        if self._pending >= _COMMIT_EVERY:
+            self._conn.commit()
+            self._pending = 0
+
+    def stats(self) -> dict:
+        """
+        返回缓存统计信息
+        :return: 统计字典
+        """
+        return {'ocr_cache_hits': self.hits, 'ocr_cache_misses': self.misses}
+
+    def close(self):
+        """提交未写入的记录并关闭数据库"""
+        if self._conn is not None:
+            self._conn.commit()
+            self._conn.close()
+            self._conn = None
+            self._pending = 0
@@ -0,0 +1,160 @@
+import os
+import logging
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from PIL import Image
+
+from choices import DEFAULT_OCR_LANG, OCR_BACKENDS
+
+logger = logging.getLogger(__name__)
+
+# 是否已按配置设置过Tesseract程序路径
+_tesseract_configured = False
+
+
+class OCREngine(ABC):
+    """
+    OCR引擎基类，子类实现 image_to_string()
+    """
+    name = "base"
+
+    def __init__(self, lang: str = DEFAULT_OCR_LANG, min_confidence: float = 0):
+        """
+        :param lang: OCR语言
+        :param min_confidence: 单词置信度下限（0-100），低于该值的单词不计入结果，0表示不过滤
+        """
+        self.lang = lang
+        self.min_confidence = min_confidence
+
+    @abstractmethod
+    def image_to_string(self, image: Image.Image) -> str:
+        """
+        识别图像中的文字
+        :param image: PIL图像对象
+        :return: 识别出的文字
+        """
+
+    def close(self):
+        """释放引擎资源"""
+        pass
+
+
+class PytesseractEngine(OCREngine):
+    """
+    基于pytesseract的OCR引擎，每帧启动一次tesseract进程
+    """
+    name = "pytesseract"
+
+    def image_to_string(self, image: Image.Image) -> str:
+        import pytesseract
+        if self.min_confidence > 0:
+            return text_from_tsv(pytesseract.image_to_data(image, lang=self.lang), self.min_confidence)
+        return pytesseract.image_to_string(image, lang=self.lang)
+
+
+class TesserocrEngine(OCREngine):
+    """
+    基于tesserocr的常驻OCR引擎，语言模型在初始化时加载一次
+    """
+    name = "tesserocr"
+
+    def __init__(self, lang: str = DEFAULT_OCR_LANG, tessdata_dir: Optional[str] = None,
+                 min_confidence: float = 0):
+        super().__init__(lang, min_confidence)
+        import tesserocr
+
+        if tessdata_dir:
+            self.api = tesserocr.PyTessBaseAPI(path=tessdata_dir, lang=lang)
+        else:
+            self.api = tesserocr.PyTessBaseAPI(lang=lang)
+
+    def image_to_string(self, image: Image.Image) -> str:
+        self.api.SetImage(image)
+        if self.min_confidence > 0:
+            return text_from_tsv(self.api.GetTSVText(0), self.min_confidence)
+        return self.api.GetUTF8Text()
+
+    def close(self):
+        self.api.End()
+
+
+def text_from_tsv(tsv: str, min_confidence: float) -> str:
+    """
+    从Tesseract的TSV输出（image_to_data）中取出置信度不低于下限的单词，同一行的单词以空格连接
+    :param tsv: TSV文本，列为 level page_num block_num par_num line_num word_num left top width height conf text，
+                可以带表头
+    :param min_confidence: 单词置信度下限（0-100）
+    :return: 过滤后的文字，每行一行
+    """
+    lines = {}
+    for row in tsv.splitlines():
+        columns = row.split('\t')
+        if len(columns) < 12:
+            continue
+        try:
+            confidence = float(columns[10])
+        except ValueError:
+            # 表头
+            continue
+        text = columns[11].strip()
+        if not text or confidence < min_confidence:
+            continue
+        lines.setdefault(tuple(columns[1:5]), []).append(text)
+    return '\n'.join(' '.join(words) for words in lines.values())
+
+
+def configure_tesseract():
+    """
+    按配置设置pytesseract使用的Tesseract程序路径（程序存在时），每个进程只设置一次，
+    在第一次创建OCR引擎时调用，不使用OCR的处理不会导入pytesseract
+    """
+    global _tesseract_configured
+    if _tesseract_configured:
+        return
+    _tesseract_configured = True
+    try:
+        from config import OCRConfig
+    except ImportError:
+        return
+    if OCRConfig.TESSERACT_CMD and os.path.exists(OCRConfig.TESSERACT_CMD):
+        import pytesseract
+        pytesseract.pytesseract.tesseract_cmd = OCRConfig.TESSERACT_CMD
+
+
+def get_tessdata_dir() -> Optional[str]:
+    """
+    获取tessdata目录（与配置的tesseract程序位于同一目录）
+    :return: tessdata目录，不存在时返回None
+    """
+    try:
+        from config import OCRConfig
+    except ImportError:
+        return None
+    if not OCRConfig.TESSERACT_CMD:
+        return None
+    tessdata_dir = os.path.join(os.path.dirname(OCRConfig.TESSERACT_CMD), 'tessdata')
+    return tessdata_dir if os.path.isdir(tessdata_dir) else None
+
+
+def create_ocr_engine(backend: str = "auto", lang: str = DEFAULT_OCR_LANG, min_confidence: float = 0) -> OCREngine:
+    """
+    创建OCR引擎
+    :param backend: OCR后端 ("auto", "pytesseract", "tesserocr")
+    :param lang: OCR语言
+    :param min_confidence: 单词置信度下限（0-100），0表示不过滤
+    :return: OCR引擎
+    """
+    if backend not in OCR_BACKENDS:
+        raise ValueError(f"不支持的OCR后端: {backend}")
+    configure_tesseract()
+
+    if backend in ("auto", "tesserocr"):
+        try:
+            return TesserocrEngine(lang, get_tessdata_dir(), min_confidence)
+        except Exception as e:
+            if backend == "tesserocr":
+                raise
+            logger.debug(f"tesserocr不可用，回退到pytesseract: {e}")
+
+    return PytesseractEngine(lang, min_confidence)
@@ -0,0 +1,68 @@
+import cv2
+import numpy as np
+from typing import Optional
+
+from roi import RegionSelector
+
+# 缩略图宽度（高度按比例计算）
+GATE_THUMBNAIL_WIDTH = 160
+
+
+class OCRGate:
+    """
+    OCR前的像素差异闸门：与上一次OCR的帧缩略图几乎相同时跳过OCR，复用缓存文字
+    """
+
+    def __init__(self, threshold: float = 8.0, thumbnail_width: int = GATE_THUMBNAIL_WIDTH,
+                 regions: Optional[RegionSelector] = None):
+        """
+        :param threshold: 缩略图最大像素差异阈值（0-255），超过时才重新OCR
+        :param thumbnail_width: 缩略图宽度
+        :param regions: 识别区域，只比较这些区域
+        """
+        self.threshold = threshold
+        self.thumbnail_width = thumbnail_width
+        self.regions = regions or RegionSelector()
+        self.last_thumbnail: Optional[np.ndarray] = None
+        self.ocr_calls = 0
+        self.skipped = 0
+
+    def thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        """
+        生成灰度缩略图（先缩小再转灰度，减少计算量）
+        :param frame: BGR视频帧
+        :return: 灰度缩略图
+        """
+        frame = self.regions.apply(frame)
+        height, width = frame.shape[:2]
+        thumb_height = max(1, round(height * self.thumbnail_width / width))
+        small = cv2.resize(frame, (self.thumbnail_width, thumb_height), interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return small
+
+    def needs_ocr(self, frame: np.ndarray) -> bool:
+        """
+        判断当前帧是否需要OCR
+        区域平均后的缩略图能滤掉压缩噪声，而文字变化会在局部产生明显差异，
+        因此使用最大像素差异而不是平均差异
+        :param frame: BGR视频帧
+        :return: 是否需要OCR
+        """
+        thumb = self.thumbnail(frame)
+        if self.last_thumbnail is not None and self.last_thumbnail.shape == thumb.shape:
+            diff = cv2.absdiff(self.last_thumbnail, thumb)
+            if int(diff.max()) <= self.threshold:
+                self.skipped += 1
+                return False
+
+        self.last_thumbnail = thumb
+        self.ocr_calls += 1
+        return True
+
+    def stats(self) -> dict:
+        """
+        返回闸门统计信息
+        :return: 统计字典
+        """
+        return {'ocr_calls': self.ocr_calls, 'ocr_skipped': self.skipped}
@@ -0,0 +1,188 @@
+import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+
+from choices import DEFAULT_OCR_LANG
+from ocr_engine import configure_tesseract, create_ocr_engine
+from ocr_gate import OCRGate
+from ocr_cache import OCRCache, resolve_backend
+
+logger = logging.getLogger(__name__)
+
+# 工作进程内常驻的OCR引擎
+_worker_engine = None
+
+
+def _init_worker(tesseract_cmd: Optional[str], backend: str, lang: str, min_confidence: float):
+    """OCR工作进程初始化：沿用主进程的Tesseract路径并创建常驻引擎"""
+    global _worker_engine
+    if tesseract_cmd:
+        import pytesseract
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+    _worker_engine = create_ocr_engine(backend, lang, min_confidence)
+
+
+def _ocr_worker(image: np.ndarray) -> str:
+    """
+    在工作进程中识别一张图像
+    :param image: RGB图像数组
+    :return: 识别出的文字
+    """
+    from PIL import Image
+
+    try:
+        text = _worker_engine.image_to_string(Image.fromarray(image))
+    except Exception as e:
+        # pytesseract的部分异常无法跨进程序列化，统一转换为RuntimeError
+        raise RuntimeError(str(e)) from None
+    return text.strip()
+
+
+def _worker_backend() -> str:
+    """返回工作进程中实际创建的OCR引擎的后端名称"""
+    return _worker_engine.name
+
+
+class _CachedResult:
+    """缓存命中的结果，接口与Future一致"""
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def result(self) -> str:
+        return self.text
+
+
+class OCRWorkerPool:
+    """
+    多进程OCR工作池，队列深度有上限，结果按提交顺序返回
+    """
+
+    def __init__(self, workers: int, queue_depth: int = 0, backend: str = "auto",
+                 lang: str = DEFAULT_OCR_LANG, min_confidence: float = 0):
+        """
+        :param workers: 工作进程数
+        :param queue_depth: 同时在途的最大帧数，0表示工作进程数的2倍
+        :param backend: OCR后端
+        :param lang: OCR语言
+        :param min_confidence: 单词置信度下限（0-100），0表示不过滤
+        """
+        configure_tesseract()
+        # 只有使用pytesseract时才需要把主进程的Tesseract路径传给工作进程，只安装了tesserocr时不导入pytesseract
+        tesseract_cmd = None
+        if resolve_backend(backend) == "pytesseract":
+            import pytesseract
+            tesseract_cmd = pytesseract.pytesseract.tesseract_cmd
+        self.workers = max(1, int(workers))
+        self.queue_depth = max(1, int(queue_depth) or self.workers * 2)
+        self.lang = lang
+        self.last_text = ""
+        self.cache: Optional[OCRCache] = None
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(tesseract_cmd, backend, lang, min_confidence),
+        )
+
+    def iter_ordered(self, frames: Iterable[Tuple[int, np.ndarray]],
+                     to_image: Callable[[np.ndarray], np.ndarray],
+                     gate: Optional[OCRGate] = None,
+                     cache: Optional[OCRCache] = None) -> Iterator[Tuple[int, np.ndarray, str]]:
+        """
+        流水线识别：解码线程持续提交帧，结果按帧序号依次产出
+        :param frames: (帧编号, 帧) 可迭代对象
+        :param to_image: 将视频帧转换为OCR输入图像的函数
+        :param gate: OCR闸门，未通过的帧复用上一次OCR的文字
+        :param cache: OCR结果缓存，命中时不提交给工作进程
+        :return: (帧编号, 帧, 文字) 迭代器
+        """
+        self.cache = cache
+        if cache is not None and cache.namespace is None:
+            # 按工作进程实际创建的引擎区分缓存，tesserocr初始化失败回退到pytesseract时也不会混用
+            cache.set_backend(self.executor.submit(_worker_backend).result())
+        pending = deque()
+        for frame_index, frame in frames:
+            key = None
+            if gate is None or gate.needs_ocr(frame):
+                image = to_image(frame)
+                text = None
+                if cache is not None:
+                    key = cache.key(image)
+                    text = cache.get(key)
+                if text is None:
+                    future = self.executor.submit(_ocr_worker, image)
+                else:
+                    future, key = _CachedResult(text), None
+            else:
+                # 结果按顺序消费，取出时上一次OCR的结果已经就绪
+                future = None
+            pending.append((frame_index, frame, future, key))
+            # 队列已满时等待最早的结果，形成背压
+            while len(pending) >= self.queue_depth:
+                yield self._pop_result(pending)
+        while pending:
+            yield self._pop_result(pending)
+
+    def _pop_result(self, pending: deque) -> Tuple[int, np.ndarray, str]:
+        frame_index, frame, future, key = pending.popleft()
+        if future is None:
+            return frame_index, frame, self.last_text
+        try:
+            text = future.result()
+        except Exception as e:
+            logger.error(f"OCR识别失败: {e}")
+            text = ""
+        else:
+            # 只缓存识别成功的结果
+            if key is not None:
+                self.cache.put(key, text)
+        self.last_text = text
+        return frame_index, frame, text
+
+    def close(self):
+        """关闭工作池"""
+        self.executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def iter_frame_texts(frames: Iterable[Tuple[int, np.ndarray]],
+                     to_image: Callable[[np.ndarray], np.ndarray],
+                     extract_text: Callable[[np.ndarray], str],
+                     workers: int = 0, queue_depth: int = 0,
+                     backend: str = "auto",
+                     gate: Optional[OCRGate] = None,
+                     cache: Optional[OCRCache] = None,
+                     min_confidence: float = 0,
+                     lang: str = DEFAULT_OCR_LANG) -> Iterator[Tuple[int, np.ndarray, str]]:
+    """
+    依次产出每个取样帧及其文字，workers大于0时使用多进程流水线
+    :param frames: (帧编号, 帧) 可迭代对象
+    :param to_image: 将视频帧转换为OCR输入图像的函数
+    :param extract_text: 同步识别函数（workers为0时使用）
+    :param workers: OCR工作进程数
+    :param queue_depth: 在途帧数上限
+    :param backend: 工作进程使用的OCR后端
+    :param gate: OCR闸门，与上一次OCR的帧几乎相同时跳过OCR并复用文字
+    :param cache: OCR结果缓存，仅用于工作进程（同步识别时由extract_text自行处理缓存）
+    :param min_confidence: 工作进程的单词置信度下限
+    :param lang: 工作进程的OCR语言
+    :return: (帧编号, 帧, 文字) 迭代器
+    """
+    if workers > 0:
+        with OCRWorkerPool(workers, queue_depth, backend, lang, min_confidence) as pool:
+            yield from pool.iter_ordered(frames, to_image, gate, cache)
+        return
+
+    text = ""
+    for frame_index, frame in frames:
+        if gate is None or gate.needs_ocr(frame):
+            text = extract_text(to_image(frame))
+        yield frame_index, frame, text
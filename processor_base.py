@@ -0,0 +1,386 @@
+import os
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, List, Tuple, Optional, Union
+
+import cv2
+import numpy as np
+
+from choices import DEFAULT_OCR_LANG
+from ocr_cache import DEFAULT_CACHE_MAX_MB, OCRCache
+from text_compare import DEFAULT_TEXT_SIMILARITY, text_changed
+from screenshot_writer import ImageEncoder, write_image
+from roi import ROI, RegionSelector
+from profiling import StageProfiler, resolve_trace_path
+from change_refiner import ChangeRefiner
+from checkpoint import Checkpoint
+
+if TYPE_CHECKING:
+    from PIL import Image
+    from ocr_engine import OCREngine
+    from ocr_gate import OCRGate
+
+logger = logging.getLogger(__name__)
+
+
+class BaseVideoProcessor:
+    """
+    VideoProcessor 和 AdvancedVideoProcessor 共用的部分：OCR引擎和缓存、文字比较、检查点、
+    切换帧定位、截图保存、进度汇报、资源释放和性能报告
+    """
+
+    def __init__(self, video_path: str, output_dir: Optional[str] = None,
+                 sampling_strategy: str = "auto", ocr_workers: int = 0, ocr_queue_depth: int = 0,
+                 ocr_backend: str = "auto", ocr_gate_threshold: float = 8.0,
+                 writer_threads: int = 2, writer_queue_size: int = 8,
+                 image_format: str = "png", image_quality: Optional[int] = None,
+                 png_compression: int = 3, webp_lossless: bool = False,
+                 progress_callback: Optional[Callable[[float], None]] = None,
+                 roi: Optional[List[Union[ROI, str]]] = None,
+                 profile: bool = False, profile_trace: Optional[str] = None,
+                 max_interval: Optional[float] = None,
+                 refine_changes: bool = False, resume: bool = False, checkpoint_interval: float = 30.0,
+                 ocr_cache: bool = True, ocr_cache_max_mb: float = DEFAULT_CACHE_MAX_MB,
+                 decoder: str = "opencv", decoder_threads: int = 0,
+                 text_similarity: float = DEFAULT_TEXT_SIMILARITY, ocr_min_confidence: float = 0,
+                 ocr_lang: str = DEFAULT_OCR_LANG):
+        self.video_path = video_path
+        self.video_name = Path(video_path).stem
+        # 输出目录在保存第一张截图时创建
+        self.output_dir = output_dir or os.path.join(os.path.dirname(video_path), f"{self.video_name}_截图")
+        self.previous_text = ""
+        self.screenshot_count = 0
+        self.sampling_strategy = sampling_strategy
+        # 视频的关键帧间隔，auto取样策略第一次需要时探测（0表示无法探测）
+        self.gop_size = None
+        self.max_interval = max_interval
+        # 在两次取样之间二分查找确切的切换帧，并记录每张截图的时间戳（秒）
+        self.refine_changes = refine_changes
+        self.refiner = None
+        self.screenshot_times = []
+        # 每隔checkpoint_interval秒保存检查点（0表示关闭），resume时从检查点继续
+        self.resume = resume
+        self.checkpoint_interval = checkpoint_interval
+        self.sampling_stats = {}
+        self.ocr_workers = ocr_workers
+        self.ocr_queue_depth = ocr_queue_depth
+        self.ocr_backend = ocr_backend
+        self.ocr_engine = None
+        self.ocr_gate_threshold = ocr_gate_threshold
+        self.ocr_lang = ocr_lang
+        self.ocr_stats = {}
+        # OCR单词置信度下限（0表示不过滤）；文字规范化后相似度低于text_similarity才认为文字变化，
+        # 个别字符的OCR抖动不会产生新的截图
+        self.ocr_min_confidence = ocr_min_confidence
+        self.text_similarity = text_similarity
+        # OCR结果磁盘缓存，重复处理同一视频（如调整阈值）时不再重复识别
+        self.ocr_cache = (OCRCache(backend=ocr_backend, lang=ocr_lang, max_mb=ocr_cache_max_mb,
+                                   min_confidence=ocr_min_confidence)
+                          if ocr_cache else None)
+        # 解码后端和解码线程数
+        self.decoder = decoder
+        self.decoder_threads = decoder_threads
+        self.writer_threads = writer_threads
+        self.writer_queue_size = writer_queue_size
+        self.writer = None
+        self.save_errors = []
+        self.encoder = ImageEncoder(image_format, image_quality, png_compression, webp_lossless)
+        self.progress_callback = progress_callback
+        self._last_progress = -1.0
+        # 只对识别区域进行OCR和变化检测，截图仍保存整帧
+        self.regions = RegionSelector(roi)
+        # 分阶段计时，未启用时为空操作
+        self.profiler = StageProfiler(enabled=profile or bool(profile_trace))
+        self.profile_trace = profile_trace
+
+    def _extract_text_from_array(self, rgb_frame: np.ndarray) -> str:
+        """从RGB图像数组中提取文字"""
+        from PIL import Image
+
+        with self.profiler.stage('ocr'):
+            if self.ocr_cache is None:
+                return self.extract_text_from_image(Image.fromarray(rgb_frame))
+            if self.ocr_cache.namespace is None:
+                # 按实际创建的引擎区分缓存
+                self.ocr_cache.set_backend(self.get_ocr_engine().name)
+            key = self.ocr_cache.key(rgb_frame)
+            text = self.ocr_cache.get(key)
+            if text is None:
+                try:
+                    text = self.get_ocr_engine().image_to_string(Image.fromarray(rgb_frame)).strip()
+                except Exception as e:
+                    # 识别失败的结果不写入缓存
+                    logger.error(f"OCR识别失败: {e}")
+                    return ""
+                self.ocr_cache.put(key, text)
+            return text
+
+    def get_ocr_engine(self) -> 'OCREngine':
+        """获取常驻的OCR引擎，首次使用时创建"""
+        if self.ocr_engine is None:
+            from ocr_engine import create_ocr_engine
+
+            self.ocr_engine = create_ocr_engine(self.ocr_backend, self.ocr_lang, self.ocr_min_confidence)
+            logger.info(f"使用OCR后端: {self.ocr_engine.name}")
+        return self.ocr_engine
+
+    def extract_text_from_image(self, image: 'Image.Image') -> str:
+        """
+        从图像中提取文字
+        :param image: PIL图像对象
+        :return: 提取的文字
+        """
+        try:
+            # 使用常驻OCR引擎识别，不可用时为pytesseract
+            text = self.get_ocr_engine().image_to_string(image)
+            return text.strip()
+        except Exception as e:
+            logger.error(f"OCR识别失败: {e}")
+            return ""
+
+    def has_text_changed(self, current_text: str) -> bool:
+        """
+        检查文字是否发生变化
+        :param current_text: 当前帧提取的文字
+        :return: 是否发生变化
+        """
+        # 如果是第一帧，认为有变化
+        if not self.previous_text:
+            return True
+
+        # 比较规范化后的文字内容，相似度低于阈值时认为发生变化
+        return text_changed(self.previous_text, current_text, self.text_similarity)
+
+    def _log_ocr_stats(self, gate: Optional['OCRGate']):
+        """记录OCR闸门和OCR缓存的统计信息"""
+        if gate is not None:
+            self.ocr_stats = gate.stats()
+            logger.info(f"OCR调用 {gate.ocr_calls} 次，跳过 {gate.skipped} 次")
+        if self.ocr_cache is not None and self.ocr_cache.hits + self.ocr_cache.misses:
+            self.ocr_stats.update(self.ocr_cache.stats())
+            logger.info(f"OCR缓存命中 {self.ocr_cache.hits} 次，未命中 {self.ocr_cache.misses} 次")
+
+    def _open_checkpoint(self) -> Optional[Checkpoint]:
+        """定期保存或需要继续时创建检查点，否则返回None"""
+        if self.checkpoint_interval > 0 or self.resume:
+            return Checkpoint(self.output_dir, self.checkpoint_interval)
+        return None
+
+    def _save_checkpoint(self, checkpoint: Checkpoint, mode: str, frame_interval: int, next_frame: int,
+                         saved_screenshots: List[str], detection_state: Optional[dict] = None):
+        """
+        保存检查点，先等待已提交的截图写完，保证检查点中的截图都已在磁盘上
+        :param checkpoint: 检查点
+        :param mode: 检测方法，继续时必须一致
+        :param frame_interval: 取样帧间隔，继续时必须一致
+        :param next_frame: 继续处理的帧编号
+        :param saved_screenshots: 已保存的截图路径
+        :param detection_state: 与next_frame对应的检测状态，为None时使用当前状态
+        """
+        if self.writer is not None:
+            self.writer.flush()
+        if detection_state is None:
+            detection_state = self._detection_state()
+        state = {
+            'video_path': os.path.abspath(self.video_path),
+            'mode': mode,
+            'frame_interval': frame_interval,
+            'next_frame': next_frame,
+            'screenshots': list(saved_screenshots),
+            'screenshot_times': list(self.screenshot_times),
+            **self._checkpoint_params(),
+            **detection_state,
+        }
+        try:
+            checkpoint.save(state)
+        except OSError as e:
+            logger.warning(f"保存检查点失败: {e}")
+
+    def _save_interrupt_checkpoint(self, checkpoint: Optional[Checkpoint], mode: str, frame_interval: int,
+                                   last_frame: Optional[int], saved_screenshots: List[str],
+                                   detection_state: Optional[dict] = None):
+        """
+        中断时保存最后处理完的取样帧之后的位置，还没有处理过取样帧时不保存
+        :param checkpoint: 检查点，为None时不保存
+        :param mode: 检测方法
+        :param frame_interval: 取样帧间隔
+        :param last_frame: 最后处理完的取样帧编号
+        :param saved_screenshots: 已保存的截图路径
+        :param detection_state: 处理完last_frame时的检测状态，为None时使用当前状态
+        """
+        if checkpoint is None or last_frame is None:
+            return
+        self._save_checkpoint(checkpoint, mode, frame_interval, last_frame + frame_interval, saved_screenshots,
+                              detection_state)
+
+    def _detection_state(self) -> dict:
+        """检查点中保存的检测状态：上一次的文字、截图计数和比较基准"""
+        return {
+            'previous_text': self.previous_text,
+            'screenshot_count': self.screenshot_count,
+            **self._reference_state(),
+        }
+
+    def _checkpoint_params(self) -> dict:
+        """影响取样帧和识别区域的参数，继续时必须与检查点一致"""
+        return {
+            'roi': [list(roi) for roi in self.regions.rois],
+            'sampling_strategy': self.sampling_strategy,
+            'max_interval': self.max_interval,
+        }
+
+    def _reference_state(self) -> dict:
+        """检查点中保存的文字以外的比较基准"""
+        return {}
+
+    def _restore_reference_state(self, state: dict):
+        """从检查点恢复文字以外的比较基准"""
+        pass
+
+    def _resume_from_checkpoint(self, checkpoint: Optional[Checkpoint], mode: str, frame_interval: int,
+                                saved_screenshots: List[str]) -> int:
+        """
+        从检查点恢复比较基准和截图计数
+        :param checkpoint: 检查点
+        :param mode: 检测方法
+        :param frame_interval: 取样帧间隔
+        :param saved_screenshots: 已保存的截图路径，恢复的截图追加到其中
+        :return: 继续处理的帧编号，不继续时为0
+        """
+        if not self.resume or checkpoint is None:
+            return 0
+        state = checkpoint.load()
+        if state is None:
+            logger.info("没有可用的检查点，从头开始处理")
+            return 0
+        expected = {'video_path': os.path.abspath(self.video_path), 'mode': mode, 'frame_interval': frame_interval,
+                    **self._checkpoint_params()}
+        mismatched = [key for key, value in expected.items() if state.get(key) != value]
+        if mismatched:
+            logger.warning(f"检查点与当前视频或参数不一致（{', '.join(mismatched)}），丢弃检查点，从头开始处理")
+            checkpoint.remove()
+            return 0
+        self.previous_text = state['previous_text']
+        self.screenshot_count = state['screenshot_count']
+        self.screenshot_times = state['screenshot_times']
+        self._restore_reference_state(state)
+        saved_screenshots.extend(state['screenshots'])
+        logger.info(f"从检查点继续: 第 {state['next_frame']} 帧，已有 {self.screenshot_count} 张截图")
+        return state['next_frame']
+
+    def _create_refiner(self, fps: float):
+        """开启切换帧定位时创建定位器"""
+        if self.refine_changes:
+            self.refiner = ChangeRefiner(self.video_path, fps, self.regions, self.profiler,
+                                         self.decoder, self.decoder_threads)
+
+    def _locate_change(self, previous_sample: Optional[Tuple[int, np.ndarray]],
+                       frame_index: int, frame: np.ndarray) -> Tuple[int, np.ndarray]:
+        """
+        定位切换帧，未开启定位或没有上一个取样时返回当前取样
+        :param previous_sample: 上一个取样 (帧编号, 帧)
+        :param frame_index: 当前取样的帧编号
+        :param frame: 当前取样的帧
+        :return: 切换帧 (帧编号, 帧)
+        """
+        if self.refiner is None or previous_sample is None:
+            return frame_index, frame
+        return self.refiner.refine(previous_sample, (frame_index, frame))
+
+    def save_screenshot(self, frame: np.ndarray, frame_number: int) -> str:
+        """
+        保存截图
+        :param frame: 视频帧
+        :param frame_number: 帧编号
+        :return: 截图文件路径
+        """
+        self.screenshot_count += 1
+        filename = f"{self.video_name}_截图_{self.screenshot_count:03d}{self.encoder.extension}"
+        screenshot_path = os.path.join(self.output_dir, filename)
+
+        # 处理过程中交给后台写入器，路径立即返回，顺序与编号一致
+        if self.writer is not None:
+            self.writer.submit(frame, screenshot_path)
+            return screenshot_path
+
+        # 确保输出目录存在
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        # 保存图像并检查是否成功
+        try:
+            write_image(frame, screenshot_path, self.encoder)
+        except Exception as e:
+            logger.error(f"保存截图失败: {screenshot_path}, 错误: {e}")
+        return screenshot_path
+
+    def _gop_size(self) -> Optional[int]:
+        """
+        auto和自适应取样策略根据关键帧间隔选择grab或seek，只在第一次需要时探测
+        :return: 关键帧间隔（帧），不需要或无法探测时返回None
+        """
+        if self.sampling_strategy not in ("auto", "adaptive"):
+            return None
+        if self.gop_size is None:
+            from video_decoder import probe_gop_size
+
+            self.gop_size = probe_gop_size(self.video_path) or 0
+            if self.gop_size:
+                logger.info(f"关键帧间隔: {self.gop_size} 帧")
+        return self.gop_size or None
+
+    def _report_progress(self, frame_index: int, total_frames: int):
+        """
+        汇报处理进度，每增加1%回调一次
+        :param frame_index: 当前帧编号
+        :param total_frames: 总帧数，未知时不汇报
+        """
+        if self.progress_callback is None or total_frames <= 0:
+            return
+        fraction = min(1.0, frame_index / total_frames)
+        if fraction - self._last_progress >= 0.01 or fraction >= 1.0:
+            self._last_progress = fraction
+            self.progress_callback(fraction)
+
+    def _release_resources(self, cap: cv2.VideoCapture):
+        """
+        处理结束或中断时释放资源：视频对象、截图写入线程、切换帧定位器和OCR缓存连接
+        :param cap: 视频对象
+        """
+        cap.release()
+        self._close_writer()
+        if self.refiner is not None:
+            self.refiner.close()
+            self.refiner = None
+        if self.ocr_cache is not None:
+            self.ocr_cache.close()
+
+    def _close_writer(self):
+        """等待后台写入完成并汇报写入失败的截图"""
+        if self.writer is None:
+            return
+        self.save_errors = self.writer.close()
+        self.writer = None
+        if self.save_errors:
+            logger.error(f"共有 {len(self.save_errors)} 张截图保存失败")
+
+    def _profile_counts(self) -> dict:
+        """性能报告中附带的计数"""
+        return dict(self.ocr_stats)
+
+    def _finish_profile(self, wall_time: float, screenshot_count: int):
+        """
+        输出分阶段计时报告，配置了记录文件时写出逐次计时
+        :param wall_time: 处理耗时（秒）
+        :param screenshot_count: 保存的截图数
+        """
+        if not self.profiler.enabled:
+            return
+        self.profiler.count('sampled_frames', self.sampling_stats.get('inspected_frames', 0))
+        self.profiler.count('screenshots', screenshot_count)
+        for name, value in self._profile_counts().items():
+            self.profiler.count(name, value)
+        logger.info(f"性能分析:\n{self.profiler.format_report(wall_time)}")
+        trace_path = resolve_trace_path(self.profile_trace, self.video_name)
+        if trace_path:
+            self.profiler.write_trace(trace_path)
+            logger.info(f"计时记录已保存到: {trace_path}")
@@ -0,0 +1,52 @@
+"""
+按配置文件生成处理器构造参数，命令行和图形界面共用，
+各自再用命令行参数或界面上的设置覆盖其中的对应项
+本模块只导入配置，不导入OpenCV、numpy等依赖
+"""
+from config import OCRConfig, OutputConfig, VideoConfig
+
+
+def processor_options_from_config(processor_type: str = "basic") -> dict:
+    """
+    按配置生成处理器构造参数
+    :param processor_type: 处理器类型 ("basic", "advanced")
+    :return: 传递给处理器构造函数的选项字典
+    """
+    options = {
+        'sampling_strategy': VideoConfig.SAMPLING_STRATEGY,
+        'max_interval': VideoConfig.MAX_INTERVAL,
+        'refine_changes': VideoConfig.REFINE_CHANGES,
+        'checkpoint_interval': VideoConfig.CHECKPOINT_INTERVAL,
+        'decoder': VideoConfig.DECODER,
+        'decoder_threads': VideoConfig.DECODER_THREADS,
+        'roi': list(VideoConfig.ROI),
+        'ocr_workers': OCRConfig.WORKERS,
+        'ocr_queue_depth': OCRConfig.QUEUE_DEPTH,
+        'ocr_backend': OCRConfig.BACKEND,
+        'ocr_gate_threshold': OCRConfig.GATE_THRESHOLD,
+        'text_similarity': OCRConfig.TEXT_SIMILARITY,
+        'ocr_min_confidence': OCRConfig.MIN_CONFIDENCE,
+        'ocr_lang': OCRConfig.LANGUAGES,
+        'ocr_cache': OCRConfig.CACHE_ENABLED,
+        'ocr_cache_max_mb': OCRConfig.CACHE_MAX_MB,
+        'writer_threads': OutputConfig.WRITER_THREADS,
+        'writer_queue_size': OutputConfig.WRITER_QUEUE_SIZE,
+        'image_format': OutputConfig.FORMAT,
+        'image_quality': OutputConfig.QUALITY,
+        'png_compression': OutputConfig.PNG_COMPRESSION,
+        'webp_lossless': OutputConfig.WEBP_LOSSLESS,
+    }
+    if processor_type == "advanced":
+        # 仅高级处理器进行图像比较、场景预筛、分析索引和分段并行
+        options.update({
+            'analysis_width': VideoConfig.ANALYSIS_WIDTH,
+            'scene_method': VideoConfig.SCENE_METHOD,
+            'scene_threshold': VideoConfig.SCENE_THRESHOLD,
+            'scene_settle': VideoConfig.SCENE_SETTLE,
+            'analysis_index': VideoConfig.ANALYSIS_INDEX,
+            'analysis_stream': VideoConfig.ANALYSIS_STREAM,
+            'segments': VideoConfig.SEGMENTS,
+            'segment_overlap': VideoConfig.SEGMENT_OVERLAP,
+            'memory_budget_mb': VideoConfig.MEMORY_BUDGET_MB,
+        })
+    return options
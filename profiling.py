@@ -0,0 +1,301 @@
+import os
+import csv
+import json
+import time
+import logging
+import threading
+import unicodedata
+from contextlib import contextmanager
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 处理器中计时的阶段，报告按此顺序输出
+PROFILE_STAGES = ['decode', 'scene', 'convert', 'ocr', 'ssim', 'hash', 'index', 'refine', 'encode', 'write']
+
+# 报告中阶段名列和数值列的显示宽度（等宽终端中的列数，中文字符占两列）
+REPORT_STAGE_WIDTH = 10
+REPORT_COLUMN_WIDTH = 10
+
+# 内存采样间隔（秒）
+MEMORY_SAMPLE_INTERVAL = 0.05
+
+_psutil_process = None
+
+
+def _pad(text: str, width: int, left: bool = False) -> str:
+    """
+    按显示宽度补齐空格，中文等全角字符占两列
+    :param text: 文字
+    :param width: 显示宽度
+    :param left: 是否左对齐，默认右对齐
+    :return: 补齐后的文字
+    """
+    display_width = sum(2 if unicodedata.east_asian_width(char) in ('W', 'F') else 1 for char in text)
+    padding = ' ' * max(0, width - display_width)
+    return text + padding if left else padding + text
+
+
+def current_rss() -> int:
+    """
+    当前进程的常驻内存，优先使用psutil（可选依赖，Windows上需要），否则读取 /proc/self/statm
+    :return: 字节数，无法获取时返回0
+    """
+    global _psutil_process
+    try:
+        import psutil
+        if _psutil_process is None:
+            _psutil_process = psutil.Process()
+        return _psutil_process.memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+class StageProfiler:
+    """
+    分阶段计时器：记录每个阶段每次执行的耗时和计数器，结束时输出汇总（总计、平均、p95）
+    截图编码在后台写入线程中执行，因此记录时加锁
+    未启用时所有方法都是空操作，不影响处理速度
+    """
+
+    def __init__(self, enabled: bool = True):
+        """
+        :param enabled: 是否启用
+        """
+        self.enabled = enabled
+        self.origin = time.perf_counter()
+        # (阶段, 相对开始时间, 耗时)
+        self.events: List[Tuple[str, float, float]] = []
+        self.counters: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, start: float, elapsed: float):
+        """
+        记录一次阶段耗时
+        :param stage: 阶段名称
+        :param start: 开始时间（perf_counter）
+        :param elapsed: 耗时（秒）
+        """
+        with self._lock:
+            self.events.append((stage, start - self.origin, elapsed))
+
+    @contextmanager
+    def _timed(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, start, time.perf_counter() - start)
+
+    @contextmanager
+    def _noop(self):
+        yield
+
+    def stage(self, stage: str):
+        """
+        计时上下文管理器
+        :param stage: 阶段名称
+        """
+        return self._timed(stage) if self.enabled else self._noop()
+
+    def wrap(self, stage: str, func: Callable) -> Callable:
+        """
+        返回计时版本的函数
+        :param stage: 阶段名称
+        :param func: 被计时的函数
+        """
+        if not self.enabled:
+            return func
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(stage, start, time.perf_counter() - start)
+        return timed
+
+    def iterate(self, stage: str, iterable: Iterable) -> Iterator:
+        """
+        对迭代器每次取下一个元素计时，用于解码
+        :param stage: 阶段名称
+        :param iterable: 被计时的可迭代对象
+        """
+        if not self.enabled:
+            return iter(iterable)
+        return self._iterate(stage, iter(iterable))
+
+    def _iterate(self, stage: str, iterator: Iterator) -> Iterator:
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self.record(stage, start, time.perf_counter() - start)
+            yield item
+
+    def count(self, name: str, n: int = 1):
+        """
+        累加计数器
+        :param name: 计数器名称
+        :param n: 增加值
+        """
+        if self.enabled:
+            with self._lock:
+                self.counters[name] += n
+
+    def summary(self) -> Dict[str, dict]:
+        """
+        按阶段汇总
+        :return: {阶段: {count, total, mean, p95}}，时间单位为秒
+        """
+        with self._lock:
+            durations = defaultdict(list)
+            for stage, _, elapsed in self.events:
+                durations[stage].append(elapsed)
+        stages = PROFILE_STAGES + sorted(set(durations) - set(PROFILE_STAGES))
+        result = {}
+        for stage in stages:
+            values = np.asarray(durations.get(stage, []))
+            result[stage] = {
+                'count': int(values.size),
+                'total': float(values.sum()) if values.size else 0.0,
+                'mean': float(values.mean()) if values.size else 0.0,
+                'p95': float(np.percentile(values, 95)) if values.size else 0.0,
+            }
+        return result
+
+    def format_report(self, wall_time: Optional[float] = None) -> str:
+        """
+        生成可读的汇总报告
+        :param wall_time: 整个处理的耗时，用于计算各阶段占比
+        :return: 报告文本
+        """
+        header = [_pad('阶段', REPORT_STAGE_WIDTH, left=True)]
+        header += [_pad(title, REPORT_COLUMN_WIDTH) for title in ('次数', '总计(s)', '平均(ms)', 'p95(ms)', '占比')]
+        lines = [''.join(header)]
+        for stage, stats in self.summary().items():
+            if not stats['count']:
+                continue
+            share = f"{stats['total'] / wall_time:.0%}" if wall_time else '-'
+            columns = [str(stats['count']), f"{stats['total']:.2f}", f"{stats['mean'] * 1000:.1f}",
+                       f"{stats['p95'] * 1000:.1f}", share]
+            lines.append(_pad(stage, REPORT_STAGE_WIDTH, left=True)
+                         + ''.join(_pad(column, REPORT_COLUMN_WIDTH) for column in columns))
+        if wall_time:
+            lines.append(f"总耗时 {wall_time:.2f} 秒（截图编码写入在后台线程中，与其他阶段重叠）")
+        if self.counters:
+            lines.append("计数: " + ", ".join(f"{name}={value}" for name, value in sorted(self.counters.items())))
+        return "\n".join(lines)
+
+    def write_trace(self, path: str):
+        """
+        写出逐次计时记录，扩展名为.csv时写CSV，否则写JSON（含汇总和计数器）
+        :param path: 输出路径
+        """
+        with self._lock:
+            events = list(self.events)
+            counters = dict(self.counters)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if path.lower().endswith('.csv'):
+            with open(path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(['stage', 'start', 'duration'])
+                writer.writerows((stage, f"{start:.6f}", f"{elapsed:.6f}") for stage, start, elapsed in events)
+            return
+
+        trace = {
+            'summary': self.summary(),
+            'counters': counters,
+            'events': [{'stage': stage, 'start': start, 'duration': elapsed} for stage, start, elapsed in events],
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(trace, f, ensure_ascii=False, indent=2)
+
+
+class MemoryMonitor:
+    """
+    后台线程定期采样进程的常驻内存，记录处理一个视频期间的峰值；
+    进程级的峰值(ru_maxrss)覆盖整个进程生命周期，批量处理时无法区分各个视频
+    无法获取内存信息时为空操作
+    """
+
+    def __init__(self, interval: float = MEMORY_SAMPLE_INTERVAL):
+        """
+        :param interval: 采样间隔（秒）
+        """
+        self.interval = interval
+        self.baseline = 0
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sample(self):
+        """采样一次"""
+        self.peak = max(self.peak, current_rss())
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def start(self) -> 'MemoryMonitor':
+        """开始采样"""
+        self.baseline = self.peak = current_rss()
+        if self.baseline > 0:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="memory-monitor", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> float:
+        """
+        停止采样
+        :return: 峰值常驻内存（MB），无法获取时为0
+        """
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            self.sample()
+        return self.peak_mb
+
+    @property
+    def peak_mb(self) -> float:
+        return self.peak / (1024 * 1024)
+
+    @property
+    def baseline_mb(self) -> float:
+        return self.baseline / (1024 * 1024)
+
+    def __enter__(self) -> 'MemoryMonitor':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+def resolve_trace_path(trace: Optional[str], video_name: str) -> Optional[str]:
+    """
+    确定计时记录文件路径
+    :param trace: 文件路径，或目录（已存在或以路径分隔符结尾），目录时按视频名生成文件名
+    :param video_name: 视频文件名（不含扩展名）
+    :return: 文件路径，未配置时返回None
+    """
+    if not trace:
+        return None
+    if os.path.isdir(trace) or trace.endswith(('/', os.sep)):
+        return os.path.join(trace, f"{video_name}_profile.json")
+    return trace
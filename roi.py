@@ -0,0 +1,117 @@
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+# 识别区域: (x, y, 宽, 高)，全部在0-1之间时按画面比例解释，否则为像素
+ROI = Tuple[float, float, float, float]
+
+# 多个区域拼接时之间留出的间隔（像素）
+REGION_GAP = 8
+
+
+def parse_roi(spec: str) -> ROI:
+    """
+    解析识别区域字符串
+    :param spec: "x,y,w,h"，如 "0,0.8,1,0.2"（比例）或 "0,860,1920,220"（像素）
+    :return: 识别区域
+    """
+    parts = [part.strip() for part in spec.split(',')]
+    if len(parts) != 4:
+        raise ValueError(f"识别区域格式应为 x,y,w,h: {spec}")
+    try:
+        x, y, w, h = (float(part) for part in parts)
+    except ValueError:
+        raise ValueError(f"识别区域必须是数字: {spec}") from None
+    if x < 0 or y < 0 or w <= 0 or h <= 0:
+        raise ValueError(f"识别区域的坐标不能为负，宽高必须大于0: {spec}")
+    return x, y, w, h
+
+
+def parse_rois(spec: str) -> List[ROI]:
+    """
+    解析以分号分隔的多个识别区域
+    :param spec: 如 "0,0.8,1,0.2; 0.1,0.1,0.8,0.6"，空字符串表示整帧
+    :return: 识别区域列表
+    """
+    return [parse_roi(part) for part in spec.split(';') if part.strip()]
+
+
+def resolve_roi(roi: ROI, width: int, height: int) -> Tuple[int, int, int, int]:
+    """
+    将识别区域转换为画面内的像素矩形
+    :param roi: 识别区域
+    :param width: 画面宽度
+    :param height: 画面高度
+    :return: 像素矩形 (x, y, 宽, 高)
+    """
+    x, y, w, h = roi
+    if max(roi) <= 1.0:
+        x, y, w, h = x * width, y * height, w * width, h * height
+    left = min(max(0, int(round(x))), width - 1)
+    top = min(max(0, int(round(y))), height - 1)
+    right = min(width, max(left + 1, int(round(x + w))))
+    bottom = min(height, max(top + 1, int(round(y + h))))
+    return left, top, right - left, bottom - top
+
+
+class RegionSelector:
+    """
+    从视频帧中截取识别区域，多个区域纵向拼接为一张图
+    没有配置区域时原样返回整帧
+    """
+
+    def __init__(self, rois: Optional[Sequence[Union[ROI, str]]] = None):
+        """
+        :param rois: 识别区域列表，元素可以是 (x, y, w, h) 或 "x,y,w,h" 字符串
+        """
+        self.rois: List[ROI] = [parse_roi(roi) if isinstance(roi, str) else tuple(roi) for roi in rois or []]
+        self._rects: Dict[Tuple[int, int], List[Tuple[int, int, int, int]]] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.rois)
+
+    def proportional(self, width: int, height: int) -> 'RegionSelector':
+        """
+        将像素区域换算为画面比例，换算后的区域可以在缩小的帧上截取同一块画面
+        :param width: 原始画面宽度
+        :param height: 原始画面高度
+        :return: 只包含比例区域的选择器
+        """
+        rois = []
+        for roi in self.rois:
+            x, y, w, h = resolve_roi(roi, width, height)
+            rois.append((x / width, y / height, w / width, h / height))
+        return RegionSelector(rois)
+
+    def rects(self, width: int, height: int) -> List[Tuple[int, int, int, int]]:
+        """
+        获取指定画面尺寸下的像素矩形（按尺寸缓存）
+        :param width: 画面宽度
+        :param height: 画面高度
+        :return: 像素矩形列表
+        """
+        key = (width, height)
+        if key not in self._rects:
+            self._rects[key] = [resolve_roi(roi, width, height) for roi in self.rois]
+        return self._rects[key]
+
+    def apply(self, frame: np.ndarray) -> np.ndarray:
+        """
+        截取识别区域
+        :param frame: 视频帧（彩色或灰度）
+        :return: 单个区域时为该区域的视图，多个区域时为纵向拼接的新图像
+        """
+        if not self.rois:
+            return frame
+        height, width = frame.shape[:2]
+        crops = [frame[y:y + h, x:x + w] for x, y, w, h in self.rects(width, height)]
+        if len(crops) == 1:
+            return crops[0]
+
+        out_width = max(crop.shape[1] for crop in crops)
+        out_height = sum(crop.shape[0] for crop in crops) + REGION_GAP * (len(crops) - 1)
+        composite = np.zeros((out_height, out_width) + frame.shape[2:], dtype=frame.dtype)
+        top = 0
+        for crop in crops:
+            composite[top:top + crop.shape[0], :crop.shape[1]] = crop
+            top += crop.shape[0] + REGION_GAP
+        return composite
@@ -0,0 +1,129 @@
+from typing import Iterable, Iterator, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from choices import SCENE_METHODS
+from roi import RegionSelector
+from profiling import StageProfiler
+
+# 各方法的默认阈值：mad为0-255的像素差异，hist为0-1的Bhattacharyya距离
+DEFAULT_SCENE_THRESHOLDS = {'mad': 3.0, 'hist': 0.15}
+
+# 缩略图宽度（高度按比例计算）
+SCENE_THUMBNAIL_WIDTH = 128
+
+# mad方法将缩略图划分为 GRID × GRID 个区块，取差异最大的区块，局部的文字变化不会被整帧平均掉
+SCENE_GRID = 8
+
+
+class SceneDetector:
+    """
+    廉价的场景变化预筛：在极小的缩略图上比较相邻取样帧，标记候选变化点
+    只有候选点及其后的若干帧才需要做OCR和SSIM
+    """
+
+    def __init__(self, threshold: Optional[float] = None, method: str = "mad", settle_frames: int = 1,
+                 thumbnail_width: int = SCENE_THUMBNAIL_WIDTH, regions: Optional[RegionSelector] = None,
+                 profiler: Optional[StageProfiler] = None):
+        """
+        :param threshold: 变化阈值，为None时使用所选方法的默认值
+        :param method: 检测方法 ("mad", "hist")
+        :param settle_frames: 候选点之后继续分析的取样帧数，用于捕获切换动画结束后的稳定画面
+        :param thumbnail_width: 缩略图宽度
+        :param regions: 识别区域，只比较这些区域
+        :param profiler: 分阶段计时器，记录预筛耗时
+        """
+        if method not in SCENE_METHODS:
+            raise ValueError(f"不支持的场景检测方法: {method}")
+        self.method = method
+        self.threshold = DEFAULT_SCENE_THRESHOLDS[method] if threshold is None else threshold
+        self.settle_frames = max(0, int(settle_frames))
+        self.thumbnail_width = thumbnail_width
+        self.regions = regions or RegionSelector()
+        self.profiler = profiler or StageProfiler(enabled=False)
+        self.previous = None
+        self.reference = None
+        self.candidates = 0
+        self.analyzed = 0
+        self.skipped = 0
+
+    def signature(self, frame: np.ndarray) -> np.ndarray:
+        """
+        计算用于比较的帧特征：mad为灰度缩略图，hist为HSV颜色直方图
+        :param frame: BGR视频帧
+        :return: 帧特征
+        """
+        frame = self.regions.apply(frame)
+        height, width = frame.shape[:2]
+        thumb_height = max(SCENE_GRID, round(height * self.thumbnail_width / width))
+        small = cv2.resize(frame, (self.thumbnail_width, thumb_height), interpolation=cv2.INTER_AREA)
+        if self.method == "hist":
+            if small.ndim == 2:
+                small = cv2.cvtColor(small, cv2.COLOR_GRAY2BGR)
+            hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV)
+            hist = cv2.calcHist([hsv], [0, 1, 2], None, [8, 4, 4], [0, 180, 0, 256, 0, 256])
+            return cv2.normalize(hist, hist).flatten()
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return small
+
+    def distance(self, a: np.ndarray, b: np.ndarray) -> float:
+        """
+        计算两个帧特征的差异
+        :return: mad为差异最大区块的平均像素差异，hist为直方图Bhattacharyya距离
+        """
+        if self.method == "hist":
+            return float(cv2.compareHist(a, b, cv2.HISTCMP_BHATTACHARYYA))
+        if a.shape != b.shape:
+            return float('inf')
+        diff = cv2.absdiff(a, b).astype(np.float32)
+        # INTER_AREA缩小到网格大小即得到各区块的平均差异
+        blocks = cv2.resize(diff, (SCENE_GRID, SCENE_GRID), interpolation=cv2.INTER_AREA)
+        return float(blocks.max())
+
+    def is_candidate(self, frame: np.ndarray) -> bool:
+        """
+        判断当前帧是否为候选变化点
+        同时与上一取样帧（突变）和上一个候选点（渐变累积）比较
+        :param frame: BGR视频帧
+        :return: 是否为候选变化点
+        """
+        current = self.signature(frame)
+        previous, self.previous = self.previous, current
+        if previous is None or self.reference is None:
+            self.reference = current
+            return True
+        if (self.distance(previous, current) > self.threshold or
+                self.distance(self.reference, current) > self.threshold):
+            self.reference = current
+            return True
+        return False
+
+    def filter(self, frames: Iterable[Tuple[int, np.ndarray]]) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        只产出候选变化点及其后settle_frames个取样帧
+        :param frames: (帧编号, 帧) 可迭代对象
+        :return: 需要进一步分析的 (帧编号, 帧) 迭代器
+        """
+        remaining = 0
+        for frame_index, frame in frames:
+            with self.profiler.stage('scene'):
+                candidate = self.is_candidate(frame)
+            if candidate:
+                self.candidates += 1
+                remaining = self.settle_frames + 1
+            if remaining > 0:
+                remaining -= 1
+                self.analyzed += 1
+                yield frame_index, frame
+            else:
+                self.skipped += 1
+
+    def stats(self) -> dict:
+        """
+        返回场景检测统计信息
+        :return: 统计字典
+        """
+        return {'scene_candidates': self.candidates, 'scene_analyzed': self.analyzed,
+                'scene_skipped': self.skipped}
@@ -0,0 +1,171 @@
+import os
+import queue
+import logging
+import threading
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from choices import OUTPUT_FORMATS
+from profiling import StageProfiler
+
+logger = logging.getLogger(__name__)
+
+# 队列结束标记
+_STOP = object()
+
+# 各格式的默认参数
+DEFAULT_PNG_COMPRESSION = 3
+DEFAULT_JPEG_QUALITY = 95
+DEFAULT_WEBP_QUALITY = 90
+
+
+class ImageEncoder:
+    """
+    截图编码器：通过cv2.imencode编码为PNG/JPEG/WebP
+    """
+
+    def __init__(self, image_format: str = "png", quality: Optional[int] = None,
+                 png_compression: int = DEFAULT_PNG_COMPRESSION, webp_lossless: bool = False):
+        """
+        :param image_format: 输出格式 ("png", "jpg", "webp")
+        :param quality: JPEG/WebP质量（1-100），为None时使用默认值
+        :param png_compression: PNG压缩级别（0-9），越大文件越小、编码越慢
+        :param webp_lossless: WebP是否使用无损压缩
+        """
+        image_format = image_format.lower()
+        if image_format == "jpeg":
+            image_format = "jpg"
+        if image_format not in OUTPUT_FORMATS:
+            raise ValueError(f"不支持的截图格式: {image_format}")
+        if quality is not None and not 1 <= quality <= 100:
+            raise ValueError(f"图像质量必须在1-100之间: {quality}")
+        if not 0 <= png_compression <= 9:
+            raise ValueError(f"PNG压缩级别必须在0-9之间: {png_compression}")
+
+        self.image_format = image_format
+        self.extension = f".{image_format}"
+        if image_format == "png":
+            self.params = [cv2.IMWRITE_PNG_COMPRESSION, png_compression]
+        elif image_format == "jpg":
+            self.params = [cv2.IMWRITE_JPEG_QUALITY, quality or DEFAULT_JPEG_QUALITY]
+        else:
+            # OpenCV中WebP质量大于100表示无损
+            self.params = [cv2.IMWRITE_WEBP_QUALITY, 101 if webp_lossless else quality or DEFAULT_WEBP_QUALITY]
+
+    def encode(self, frame: np.ndarray) -> bytes:
+        """
+        编码BGR视频帧
+        :param frame: BGR视频帧
+        :return: 编码后的字节
+        """
+        success, buffer = cv2.imencode(self.extension, frame, self.params)
+        if not success:
+            raise RuntimeError(f"图像编码失败: {self.image_format}")
+        return buffer.tobytes()
+
+
+def write_image(frame: np.ndarray, path: str, encoder: Optional[ImageEncoder] = None):
+    """
+    将BGR视频帧写入文件
+    用cv2编码后通过Python文件接口写入，因为cv2.imwrite不能正确处理中文路径
+    :param frame: BGR视频帧
+    :param path: 输出路径
+    :param encoder: 截图编码器，默认为PNG
+    """
+    data = (encoder or ImageEncoder()).encode(frame)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+class ScreenshotWriter:
+    """
+    后台截图写入器：编码和写盘在后台线程中进行，队列有上限，满时阻塞解码循环（背压）
+    """
+
+    def __init__(self, output_dir: str, threads: int = 2, queue_size: int = 8,
+                 encoder: Optional[ImageEncoder] = None, profiler: Optional[StageProfiler] = None):
+        """
+        :param output_dir: 输出目录
+        :param threads: 写入线程数，0表示在调用线程中同步写入
+        :param queue_size: 等待写入的最大帧数
+        :param encoder: 截图编码器，默认为PNG
+        :param profiler: 分阶段计时器，记录编码和写盘耗时
+        """
+        self.output_dir = output_dir
+        self.encoder = encoder or ImageEncoder()
+        self.profiler = profiler or StageProfiler(enabled=False)
+        self.threads = max(0, int(threads))
+        self.errors: List[Tuple[str, str]] = []
+        self._errors_lock = threading.Lock()
+
+        # 输出目录只在开始时创建一次
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        self.queue = queue.Queue(maxsize=max(1, int(queue_size)))
+        self.workers = []
+        for i in range(self.threads):
+            worker = threading.Thread(target=self._run, name=f"screenshot-writer-{i}", daemon=True)
+            worker.start()
+            self.workers.append(worker)
+
+    def submit(self, frame: np.ndarray, path: str):
+        """
+        提交一帧等待写入，提交后调用方不应再修改该帧
+        :param frame: BGR视频帧
+        :param path: 输出路径
+        """
+        if not self.workers:
+            self._write(frame, path)
+            return
+        self.queue.put((frame, path))
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is _STOP:
+                    return
+                self._write(*item)
+            finally:
+                self.queue.task_done()
+
+    def _write(self, frame: np.ndarray, path: str):
+        try:
+            with self.profiler.stage('encode'):
+                data = self.encoder.encode(frame)
+            with self.profiler.stage('write'):
+                with open(path, 'wb') as f:
+                    f.write(data)
+        except Exception as e:
+            logger.error(f"保存截图失败: {path}, 错误: {e}")
+            with self._errors_lock:
+                self.errors.append((path, str(e)))
+
+    def flush(self) -> List[Tuple[str, str]]:
+        """
+        等待所有已提交的截图写入完成
+        :return: 写入失败的 (路径, 错误信息) 列表
+        """
+        self.queue.join()
+        return list(self.errors)
+
+    def close(self) -> List[Tuple[str, str]]:
+        """
+        写完所有截图并停止后台线程
+        :return: 写入失败的 (路径, 错误信息) 列表
+        """
+        errors = self.flush()
+        for _ in self.workers:
+            self.queue.put(_STOP)
+        for worker in self.workers:
+            worker.join()
+        self.workers = []
+        return errors
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
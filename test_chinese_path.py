@@ -1,16 +1,21 @@
 import cv2
 import numpy as np
 import os
+import shutil
+import tempfile
 
 # 创建一个简单的测试图像
 image = np.zeros((100, 100, 3), dtype=np.uint8)
 image[:, :] = [255, 0, 0]  # 红色图像
 
+# 测试目录都建在临时目录下，测试结束后删除
+base_dir = tempfile.mkdtemp()
+
 # 测试不同路径
 print("测试不同路径的保存能力:")
 
 # 1. 英文路径
-english_dir = r"H:\test_screenshots"
+english_dir = os.path.join(base_dir, "test_screenshots")
 os.makedirs(english_dir, exist_ok=True)
 english_path = os.path.join(english_dir, "test.png")
 try:
@@ -20,7 +25,7 @@ except Exception as e:
     print(f"英文路径保存异常: {e}")
 
 # 2. 中文路径
-chinese_dir = r"H:\测试截图"
+chinese_dir = os.path.join(base_dir, "测试截图")
 os.makedirs(chinese_dir, exist_ok=True)
 chinese_path = os.path.join(chinese_dir, "测试.png")
 try:
@@ -30,7 +35,7 @@ except Exception as e:
     print(f"中文路径保存异常: {e}")
 
 # 3. 混合路径
-mixed_dir = r"H:\test_测试"
+mixed_dir = os.path.join(base_dir, "test_测试")
 os.makedirs(mixed_dir, exist_ok=True)
 mixed_path = os.path.join(mixed_dir, "test_测试.png")
 try:
@@ -39,4 +44,5 @@ try:
 except Exception as e:
     print(f"混合路径保存异常: {e}")
 
+shutil.rmtree(base_dir, ignore_errors=True)
 print("\n测试完成")
\ No newline at end of file
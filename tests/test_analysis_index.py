@@ -0,0 +1,119 @@
+"""分析索引测试文件"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# 将项目根目录添加到Python路径中
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import cv2
+import numpy as np
+
+from analysis_index import THUMBNAIL_WIDTH, AnalysisIndex, IndexBuilder
+from advanced_video_processor import AdvancedVideoProcessor
+
+
+class TestAnalysisIndex(unittest.TestCase):
+    """分析索引测试类"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.video_path = os.path.join(self.temp_dir, 'slides.mp4')
+        # 每秒在画面上多画一个方块，变化逐渐累积
+        writer = cv2.VideoWriter(self.video_path, cv2.VideoWriter_fourcc(*'mp4v'), 10, (160, 120))
+        frame = np.full((120, 160, 3), 40, dtype=np.uint8)
+        for i in range(80):
+            if i % 10 == 0:
+                cv2.rectangle(frame, (i * 2, 20), (i * 2 + 12, 100), (220, 220, 220), -1)
+            writer.write(frame)
+        writer.release()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _processor(self, name: str, **options) -> AdvancedVideoProcessor:
+        processor = AdvancedVideoProcessor(self.video_path, os.path.join(self.temp_dir, name), writer_threads=0,
+                                           checkpoint_interval=0, analysis_index=True, **options)
+        processor.index_path = os.path.join(self.temp_dir, 'slides.index.npz')
+        return processor
+
+    def test_replay_text(self):
+        """测试按文字重放，没有文字的索引不能重放文字检测"""
+        builder = IndexBuilder({}, 10, with_text=True)
+        for i, text in enumerate(["a", "a", "b", "b ", "c"]):
+            builder.add(i * 10, np.full((40, 60), i, dtype=np.uint8), text)
+        index = builder.build()
+        self.assertEqual(index.replay("text"), [0, 2, 4])
+        self.assertEqual(list(index.timestamps), [0.0, 1.0, 2.0, 3.0, 4.0])
+
+        path = os.path.join(self.temp_dir, 'text.index.npz')
+        index.save(path)
+        loaded = AnalysisIndex.load(path)
+        self.assertEqual(loaded.texts, ["a", "a", "b", "b ", "c"])
+        loaded.texts = None
+        with self.assertRaises(ValueError):
+            loaded.replay("combined")
+
+    def test_replay_verifies_close_pairs(self):
+        """测试非相邻取样帧的缩略图SSIM接近阈值时，按分析分辨率重新计算"""
+        builder = IndexBuilder({}, 10, with_text=False)
+        frame = np.random.RandomState(0).randint(0, 256, (120, 320), dtype=np.uint8)
+        for i in range(3):
+            builder.add(i * 10, frame)
+        index = builder.build()
+        self.assertEqual(index.thumbnails.shape[1:], (36, THUMBNAIL_WIDTH))
+        self.assertEqual(index.replay("image", 0.97), [0])
+
+        calls = []
+
+        def pair_similarity(reference, position):
+            calls.append((reference, position))
+            return 0.5
+
+        self.assertEqual(index.replay("image", 0.97, pair_similarity=pair_similarity), [0, 2])
+        # 相邻取样帧直接使用索引中的SSIM，远离阈值时不核对
+        self.assertEqual(calls, [(0, 2)])
+        calls.clear()
+        self.assertEqual(index.replay("image", 0.5, pair_similarity=pair_similarity), [0])
+        self.assertEqual(calls, [])
+
+    def test_replay_matches_full_run(self):
+        """测试重放结果与逐帧处理一致，调整阈值时不再重新分析视频"""
+        counts = []
+        for threshold in (0.99, 0.9):
+            expected = AdvancedVideoProcessor(self.video_path, os.path.join(self.temp_dir, f'full{threshold}'),
+                                              writer_threads=0, checkpoint_interval=0)
+            expected.extract_frames_with_custom_thresholds(1.0, "image", threshold)
+
+            processor = self._processor(f'index{threshold}')
+            screenshots = processor.extract_frames_with_custom_thresholds(1.0, "image", threshold)
+            self.assertEqual(processor.screenshot_times, expected.screenshot_times)
+            self.assertTrue(all(os.path.exists(path) for path in screenshots))
+            # 只有第一次处理建立索引
+            self.assertEqual(bool(processor.sampling_stats), threshold == 0.99)
+            counts.append(len(screenshots))
+        # 索引中只保存固定宽度的缩略图
+        self.assertLessEqual(AnalysisIndex.load(processor.index_path).thumbnails.shape[2], THUMBNAIL_WIDTH)
+        self.assertGreater(counts[0], counts[1])
+
+    def test_analysis_width(self):
+        """测试索引使用处理器的分析分辨率，分析分辨率变化时重建索引"""
+        for width in (80, 40):
+            expected = AdvancedVideoProcessor(self.video_path, os.path.join(self.temp_dir, f'full{width}'),
+                                              writer_threads=0, checkpoint_interval=0, analysis_width=width)
+            expected.extract_frames_with_custom_thresholds(1.0, "image", 0.97)
+
+            processor = self._processor(f'index{width}', analysis_width=width)
+            processor.extract_frames_with_custom_thresholds(1.0, "image", 0.97)
+            self.assertEqual(processor.screenshot_times, expected.screenshot_times)
+            # 两次的分析分辨率不同，都需要建立索引
+            self.assertTrue(processor.sampling_stats)
+        index = AnalysisIndex.load(processor.index_path)
+        self.assertEqual(index.params['analysis_width'], 40)
+        self.assertEqual(index.thumbnails.shape[2], 40)
+
+
+if __name__ == '__main__':
+    unittest.main()
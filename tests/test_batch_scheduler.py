@@ -0,0 +1,75 @@
+"""批量调度测试文件"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# 将项目根目录添加到Python路径中
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import cv2
+import numpy as np
+
+from batch_scheduler import run_batch, schedule, summarize
+
+
+def create_test_video(output_path, frame_count, fps=10):
+    """创建每秒变换一次画面的测试视频"""
+    writer = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (160, 120))
+    for i in range(frame_count):
+        frame = np.zeros((120, 160, 3), dtype=np.uint8)
+        cv2.rectangle(frame, ((i // fps) * 20 % 140, 20), ((i // fps) * 20 % 140 + 20, 100), (255, 255, 255), -1)
+        writer.write(frame)
+    writer.release()
+
+
+class TestBatchScheduler(unittest.TestCase):
+    """批量调度测试类"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.short_video = os.path.join(self.temp_dir, "short.mp4")
+        self.long_video = os.path.join(self.temp_dir, "long.mp4")
+        create_test_video(self.short_video, 20)
+        create_test_video(self.long_video, 50)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_longest_first(self):
+        """测试长视频优先调度"""
+        missing = os.path.join(self.temp_dir, "missing.mp4")
+        self.assertEqual(schedule([self.short_video, missing, self.long_video], 1.0), [2, 0, 1])
+
+    def test_parallel_batch(self):
+        """测试并行批量处理的结果汇总"""
+        missing = os.path.join(self.temp_dir, "missing.mp4")
+        videos = [self.short_video, missing, self.long_video]
+        completed = []
+        results = run_batch(videos, 1.0, "advanced", "image", jobs=2,
+                            processor_options={'writer_threads': 0},
+                            on_complete=lambda result: completed.append(result['video_path']))
+
+        self.assertEqual([r['video_path'] for r in results], videos)
+        self.assertEqual([r['success'] for r in results], [True, False, True])
+        self.assertEqual(len(results[0]['screenshots']), 2)
+        self.assertEqual(len(results[2]['screenshots']), 5)
+        self.assertEqual(sorted(completed), sorted(videos))
+        self.assertIn("2/3", summarize(results))
+
+    def test_sequential_batch(self):
+        """测试依次处理时按给定顺序处理，失败结果与成功结果的字段一致"""
+        missing = os.path.join(self.temp_dir, "missing.mp4")
+        videos = [self.short_video, missing, self.long_video]
+        started = []
+        results = run_batch(videos, 1.0, "advanced", "image", processor_options={'writer_threads': 0},
+                            on_start=started.append)
+
+        self.assertEqual(started, videos)
+        self.assertEqual([r['success'] for r in results], [True, False, True])
+        self.assertEqual(set(results[1]), set(results[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
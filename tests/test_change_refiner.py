@@ -0,0 +1,77 @@
+"""切换帧定位测试文件"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# 将项目根目录添加到Python路径中
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import cv2
+import numpy as np
+
+from change_refiner import ChangeRefiner
+from advanced_video_processor import AdvancedVideoProcessor
+
+
+class TestChangeRefiner(unittest.TestCase):
+    """切换帧定位测试类"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.video_path = os.path.join(self.temp_dir, 'slides.mp4')
+        # 100帧，画面在第37帧切换
+        writer = cv2.VideoWriter(self.video_path, cv2.VideoWriter_fourcc(*'mp4v'), 10, (160, 120))
+        for i in range(100):
+            writer.write(np.full((120, 160, 3), 200 if i >= 37 else 40, dtype=np.uint8))
+        writer.release()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_bisect(self):
+        """测试二分查找到切换帧"""
+        cap = cv2.VideoCapture(self.video_path)
+        frames = []
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(frame)
+        cap.release()
+
+        refiner = ChangeRefiner(self.video_path, 10)
+        index, frame = refiner.refine((0, frames[0]), (90, frames[90]))
+        refiner.close()
+        self.assertEqual(index, 37)
+        self.assertGreater(int(frame[0, 0, 0]), 120)
+        self.assertLessEqual(refiner.decoded_frames, 7)
+
+    def test_decoder_backend(self):
+        """测试二分查找使用处理器选择的解码后端"""
+        try:
+            import av  # noqa: F401
+        except ImportError:
+            self.skipTest("PyAV不可用")
+        processor = AdvancedVideoProcessor(self.video_path, os.path.join(self.temp_dir, 'out'),
+                                           writer_threads=0, refine_changes=True, decoder="pyav")
+        processor.extract_frames_with_custom_thresholds(3.0, "image")
+        self.assertEqual(processor.screenshot_times, [0.0, 3.7])
+
+        refiner = ChangeRefiner(self.video_path, 10, decoder="pyav")
+        refiner._read_at(50)
+        self.assertEqual(type(refiner.fetcher.cap).__name__, "PyAVDecoder")
+        refiner.close()
+
+    def test_processor_records_timestamps(self):
+        """测试处理器保存切换帧并记录时间戳"""
+        processor = AdvancedVideoProcessor(self.video_path, os.path.join(self.temp_dir, 'out'),
+                                           writer_threads=0, refine_changes=True)
+        screenshots = processor.extract_frames_with_custom_thresholds(3.0, "image")
+        self.assertEqual(len(screenshots), 2)
+        self.assertEqual(processor.screenshot_times, [0.0, 3.7])
+
+
+if __name__ == '__main__':
+    unittest.main()
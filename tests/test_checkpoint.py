@@ -0,0 +1,102 @@
+"""检查点测试文件"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# 将项目根目录添加到Python路径中
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import cv2
+import numpy as np
+
+from checkpoint import Checkpoint, checkpoint_path_for
+from advanced_video_processor import AdvancedVideoProcessor
+
+
+class TestCheckpoint(unittest.TestCase):
+    """检查点测试类"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.output_dir = os.path.join(self.temp_dir, '视频_截图')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_save_and_load(self):
+        """测试保存和读取检查点"""
+        checkpoint = Checkpoint(self.output_dir)
+        self.assertEqual(checkpoint.path, os.path.join(self.temp_dir, '视频_截图.checkpoint.npz'))
+        self.assertIsNone(checkpoint.load())
+
+        thumbnail = np.arange(12, dtype=np.uint8).reshape(3, 4)
+        checkpoint.save({'next_frame': 120, 'previous_text': '第一页', 'previous_frame': thumbnail})
+        state = checkpoint.load()
+        self.assertEqual(state['next_frame'], 120)
+        self.assertEqual(state['previous_text'], '第一页')
+        np.testing.assert_array_equal(state['previous_frame'], thumbnail)
+
+        checkpoint.remove()
+        self.assertFalse(os.path.exists(checkpoint_path_for(self.output_dir)))
+
+    def _interrupted_run(self, interrupt_at: float = 0.5, inclusive: bool = False) -> str:
+        """
+        处理到一半时中断，留下检查点，返回视频路径
+        :param interrupt_at: 进度超过该值时中断
+        :param inclusive: 进度等于该值时也中断
+        """
+        video_path = os.path.join(self.temp_dir, 'slides.mp4')
+        writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*'mp4v'), 10, (160, 120))
+        for i in range(120):
+            writer.write(np.full((120, 160, 3), 30 + 50 * (i // 30), dtype=np.uint8))
+        writer.release()
+
+        def interrupt(fraction):
+            if fraction > interrupt_at or (inclusive and fraction == interrupt_at):
+                raise KeyboardInterrupt
+
+        processor = AdvancedVideoProcessor(video_path, self.output_dir, writer_threads=0,
+                                           progress_callback=interrupt)
+        with self.assertRaises(KeyboardInterrupt):
+            processor.extract_frames_with_custom_thresholds(1.0, "image")
+        self.assertTrue(os.path.exists(checkpoint_path_for(self.output_dir)))
+        return video_path
+
+    def test_resume_after_interrupt(self):
+        """测试中断后从检查点继续，截图编号不重复"""
+        video_path = self._interrupted_run()
+
+        processor = AdvancedVideoProcessor(video_path, self.output_dir, writer_threads=0, resume=True)
+        screenshots = processor.extract_frames_with_custom_thresholds(1.0, "image")
+        self.assertEqual([os.path.basename(path) for path in screenshots],
+                         [f"slides_截图_{i:03d}.png" for i in range(1, 5)])
+        self.assertEqual(processor.screenshot_times, [0.0, 3.0, 6.0, 9.0])
+        self.assertFalse(os.path.exists(checkpoint_path_for(self.output_dir)))
+
+    def test_resume_after_interrupt_on_change_frame(self):
+        """测试在检测到变化、截图还没保存时中断，继续后的截图与不中断时一致"""
+        # 第60帧是变化帧，进度回调在保存截图之前调用
+        video_path = self._interrupted_run(0.5, inclusive=True)
+
+        processor = AdvancedVideoProcessor(video_path, self.output_dir, writer_threads=0, resume=True)
+        screenshots = processor.extract_frames_with_custom_thresholds(1.0, "image")
+        self.assertEqual(processor.screenshot_times, [0.0, 3.0, 6.0, 9.0])
+        self.assertEqual([os.path.basename(path) for path in screenshots],
+                         [f"slides_截图_{i:03d}.png" for i in range(1, 5)])
+
+    def test_discard_on_changed_settings(self):
+        """测试分析分辨率与检查点不一致时丢弃检查点，从头开始处理"""
+        video_path = self._interrupted_run()
+        processor = AdvancedVideoProcessor(video_path, self.output_dir, writer_threads=0, resume=True,
+                                           analysis_width=80)
+        with self.assertLogs('processor_base', level='WARNING') as logs:
+            screenshots = processor.extract_frames_with_custom_thresholds(1.0, "image")
+        self.assertIn('analysis_width', '\n'.join(logs.output))
+        self.assertEqual(len(screenshots), 4)
+        self.assertEqual(processor.screenshot_times, [0.0, 3.0, 6.0, 9.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -19,5 +19,23 @@ class TestConfig(unittest.TestCase):
         except ImportError as e:
             self.fail(f"无法导入模块: {e}")
 
+    def test_processor_options(self):
+        """测试按配置生成的选项都是对应处理器的构造参数"""
+        import inspect
+        from config import OutputConfig, VideoConfig
+        from processor_options import processor_options_from_config
+        from video_processor import VideoProcessor
+        from advanced_video_processor import AdvancedVideoProcessor
+
+        for processor_type, processor_class in (("basic", VideoProcessor), ("advanced", AdvancedVideoProcessor)):
+            options = processor_options_from_config(processor_type)
+            parameters = inspect.signature(processor_class.__init__).parameters
+            self.assertEqual([name for name in options if name not in parameters], [])
+        options = processor_options_from_config("advanced")
+        self.assertEqual(options['sampling_strategy'], VideoConfig.SAMPLING_STRATEGY)
+        self.assertEqual(options['writer_threads'], OutputConfig.WRITER_THREADS)
+        self.assertEqual(options['scene_method'], VideoConfig.SCENE_METHOD)
+        self.assertNotIn('analysis_width', processor_options_from_config("basic"))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,43 @@
+"""分析帧测试文件"""
+import unittest
+import sys
+import os
+
+# 将项目根目录添加到Python路径中
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from frame_analysis import AnalysisBuffers, to_analysis_gray
+
+
+class TestFrameAnalysis(unittest.TestCase):
+    """分析帧测试类"""
+
+    def test_downscale(self):
+        """测试按分析宽度等比缩小为灰度图"""
+        frame = np.zeros((2160, 3840, 3), dtype=np.uint8)
+        self.assertEqual(to_analysis_gray(frame, 640).shape, (360, 640))
+
+    def test_no_upscale(self):
+        """测试小于分析宽度或宽度为0时不缩放"""
+        frame = np.zeros((240, 320, 3), dtype=np.uint8)
+        self.assertEqual(to_analysis_gray(frame, 640).shape, (240, 320))
+        self.assertEqual(to_analysis_gray(frame, 0).shape, (240, 320))
+
+    def test_buffers(self):
+        """测试预分配缓冲区被复用，结果与逐帧分配时基本相同"""
+        rng = np.random.default_rng(0)
+        frame = rng.integers(0, 256, (1080, 1920, 3), dtype=np.uint8)
+        buffers = AnalysisBuffers()
+        gray = buffers.analysis_gray(frame, 640)
+        self.assertEqual(gray.shape, (360, 640))
+        self.assertLessEqual(np.abs(gray.astype(int) - to_analysis_gray(frame, 640)).max(), 1)
+        self.assertIs(buffers.analysis_gray(frame[::-1], 640), gray)
+        rgb = buffers.rgb(frame)
+        self.assertTrue(np.array_equal(rgb[..., 0], frame[..., 2]))
+        self.assertIs(buffers.rgb(frame), rgb)
+
+
+if __name__ == '__main__':
+    unittest.main()
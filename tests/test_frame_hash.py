@@ -0,0 +1,56 @@
+"""批量哈希测试文件"""
+import unittest
+import sys
+import os
+
+# 将项目根目录添加到Python路径中
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import cv2
+import numpy as np
+
+from frame_hash import (HASH_METHODS, average_hash_batch, average_hash_input, hash_batch, hamming_distance,
+                        pack_hashes, resize_batch)
+
+
+class TestFrameHash(unittest.TestCase):
+    """批量哈希测试类"""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.frames = np.stack([cv2.resize(rng.integers(0, 256, (6, 10), dtype=np.uint8), (320, 180),
+                                           interpolation=cv2.INTER_CUBIC) for _ in range(5)])
+
+    def test_batch_matches_single(self):
+        """测试批量结果与逐帧计算一致"""
+        for method in HASH_METHODS:
+            batch = hash_batch(self.frames, method)
+            self.assertEqual(batch.shape, (5, 8, 8))
+            for frame, expected in zip(self.frames, batch):
+                np.testing.assert_array_equal(hash_batch(frame, method)[0], expected)
+
+    def test_resize_matches_opencv(self):
+        """测试缩小结果与cv2.INTER_AREA一致"""
+        expected = cv2.resize(self.frames[0], (9, 8), interpolation=cv2.INTER_AREA)
+        np.testing.assert_array_equal(resize_batch(self.frames, 9, 8)[0], expected)
+
+    def test_average_hash_input(self):
+        """测试先缩小为哈希输入再整批计算，结果与直接传入原帧相同"""
+        inputs = np.stack([average_hash_input(frame) for frame in self.frames])
+        self.assertEqual(inputs.shape, (5, 8, 8))
+        np.testing.assert_array_equal(average_hash_batch(inputs), average_hash_batch(self.frames))
+
+    def test_hamming_distance(self):
+        """测试汉明距离：相同帧为0，不同帧大于0，支持与参考哈希广播比较"""
+        for method in HASH_METHODS:
+            hashes = hash_batch(self.frames, method)
+            distances = hamming_distance(hashes, hashes[0])
+            self.assertEqual(distances[0], 0)
+            self.assertTrue((distances[1:] > 0).all())
+            # 反色后几乎所有位都翻转
+            self.assertGreater(int(hamming_distance(hash_batch(255 - self.frames[0], method)[0], hashes[0])), 48)
+        self.assertEqual(pack_hashes(hash_batch(self.frames)).shape, (5, 8))
+
+
+if __name__ == '__main__':
+    unittest.main()
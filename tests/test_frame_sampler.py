@@ -0,0 +1,131 @@
+"""帧取样器测试文件"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# 将项目根目录添加到Python路径中
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import cv2
+import numpy as np
+
+from frame_sampler import AdaptiveSampler, FrameSampler, create_sampler
+
+
+def create_test_video(output_path, frame_count=60, fps=30):
+    """创建每帧亮度不同的测试视频"""
+    writer = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (160, 120))
+    for i in range(frame_count):
+        writer.write(np.full((120, 160, 3), (i * 4) % 256, dtype=np.uint8))
+    writer.release()
+
+
+class UnknownFpsCapture:
+    """无法获取帧率的视频对象"""
+
+    def __init__(self, video_path):
+        self.cap = cv2.VideoCapture(video_path)
+
+    def get(self, prop_id):
+        return 0.0 if prop_id == cv2.CAP_PROP_FPS else self.cap.get(prop_id)
+
+    def __getattr__(self, name):
+        return getattr(self.cap, name)
+
+
+class TestFrameSampler(unittest.TestCase):
+    """帧取样器测试类"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.video_path = os.path.join(self.temp_dir, 'test.mp4')
+        create_test_video(self.video_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _sample(self, strategy, frame_interval=10):
+        cap = cv2.VideoCapture(self.video_path)
+        sampler = FrameSampler(cap, frame_interval, strategy)
+        frames = [(index, frame[0, 0, 0]) for index, frame in sampler]
+        cap.release()
+        return sampler, frames
+
+    def test_strategies_return_same_frames(self):
+        """测试各取样策略返回相同的取样帧"""
+        _, read_frames = self._sample("read")
+        for strategy in ("grab", "seek"):
+            _, frames = self._sample(strategy)
+            self.assertEqual([i for i, _ in frames], [0, 10, 20, 30, 40, 50])
+            for (_, expected), (_, actual) in zip(read_frames, frames):
+                self.assertLessEqual(abs(int(expected) - int(actual)), 4)
+
+    def test_stats(self):
+        """测试解码帧数与检查帧数统计"""
+        sampler, _ = self._sample("grab")
+        stats = sampler.stats()
+        self.assertEqual(stats['inspected_frames'], 6)
+        self.assertEqual(stats['decoded_frames'], 60)
+
+        sampler, _ = self._sample("seek")
+        self.assertEqual(sampler.stats()['decoded_frames'], 6)
+        self.assertEqual(sampler.stats()['seek_count'], 5)
+
+    def test_auto_strategy(self):
+        """测试自动选择策略"""
+        cap = cv2.VideoCapture(self.video_path)
+        self.assertEqual(FrameSampler(cap, 10, gop_size=250).strategy, "grab")
+        self.assertEqual(FrameSampler(cap, 300, gop_size=250).strategy, "seek")
+        # 探测到的关键帧间隔由create_sampler传给取样器
+        self.assertEqual(create_sampler(cap, 10, "auto", gop_size=5).strategy, "seek")
+        self.assertEqual(create_sampler(cap, 10, "adaptive", gop_size=5).gop_size, 5)
+        cap.release()
+
+    def test_start_without_fps(self):
+        """测试帧率未知时按帧编号跳转到开始帧，并记录警告"""
+        cap = UnknownFpsCapture(self.video_path)
+        with self.assertLogs('frame_sampler', level='WARNING'):
+            sampler = FrameSampler(cap, 10, "grab", start_frame=30)
+        self.assertEqual([index for index, _ in sampler], [30, 40, 50])
+        cap.release()
+
+
+class TestAdaptiveSampler(unittest.TestCase):
+    """自适应取样测试类"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.video_path = os.path.join(self.temp_dir, 'slides.mp4')
+        # 200帧，画面在第70帧和第150帧切换
+        writer = cv2.VideoWriter(self.video_path, cv2.VideoWriter_fourcc(*'mp4v'), 10, (160, 120))
+        for i in range(200):
+            writer.write(np.full((120, 160, 3), 40 + 80 * ((i >= 70) + (i >= 150)), dtype=np.uint8))
+        writer.release()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_finds_changes_on_min_grid(self):
+        """测试加大间隔后仍能回退找到最小间隔上的第一个变化帧"""
+        cap = cv2.VideoCapture(self.video_path)
+        sampler = create_sampler(cap, 5, "adaptive", max_interval=40)
+        self.assertIsInstance(sampler, AdaptiveSampler)
+        samples = [(index, int(frame[0, 0, 0])) for index, frame in sampler]
+        cap.release()
+
+        indices = [index for index, _ in samples]
+        self.assertEqual(indices, sorted(indices))
+        self.assertIn(70, indices)
+        self.assertIn(150, indices)
+        # 变化点之前的取样帧仍是旧画面
+        values = dict(samples)
+        self.assertLess(values[max(i for i in indices if i < 70)], 80)
+        # 比固定最小间隔检查的帧更少
+        self.assertLess(sampler.inspected_frames, 200 // 5)
+        self.assertEqual(sampler.stats()['backsteps'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
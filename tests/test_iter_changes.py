@@ -0,0 +1,84 @@
+"""变化事件流测试文件"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+# 将项目根目录添加到Python路径中
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import cv2
+import numpy as np
+
+import config
+from advanced_video_processor import AdvancedVideoProcessor
+
+
+class FakeEngine:
+    """按画面亮度返回文字的OCR引擎"""
+    name = "fake"
+
+    def image_to_string(self, image):
+        return "bright" if np.asarray(image).mean() > 120 else "dark"
+
+
+class TestIterChanges(unittest.TestCase):
+    """变化事件流测试类"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.video_path = os.path.join(self.temp_dir, 'slides.mp4')
+        # 100帧，画面在第37帧切换
+        writer = cv2.VideoWriter(self.video_path, cv2.VideoWriter_fourcc(*'mp4v'), 10, (160, 120))
+        for i in range(100):
+            writer.write(np.full((120, 160, 3), 200 if i >= 37 else 40, dtype=np.uint8))
+        writer.release()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_image_events(self):
+        """测试逐个产出变化事件，不创建输出目录"""
+        output_dir = os.path.join(self.temp_dir, 'events')
+        processor = AdvancedVideoProcessor(self.video_path, output_dir, refine_changes=True)
+        events = list(processor.iter_changes(3.0, "image"))
+        self.assertEqual([event.frame_index for event in events], [0, 37])
+        self.assertEqual(events[1].timestamp, 3.7)
+        self.assertIsNone(events[0].similarity)
+        self.assertLess(events[1].similarity, 0.95)
+        self.assertEqual(events[1].frame.shape, (120, 160, 3))
+        self.assertFalse(os.path.exists(output_dir))
+
+        # 提前停止时释放视频对象
+        changes = processor.iter_changes(3.0, "image")
+        self.assertEqual(next(changes).frame_index, 0)
+        changes.close()
+        self.assertIsNone(processor.refiner)
+
+    def test_text_events_skip_disk_cache(self):
+        """测试文字检测时不使用OCR磁盘缓存，临时目录中不产生文件"""
+        temp_dir = os.path.join(self.temp_dir, 'temp')
+        with mock.patch.object(config.PathConfig, 'TEMP_DIR', temp_dir):
+            processor = AdvancedVideoProcessor(self.video_path, os.path.join(self.temp_dir, 'events'))
+            processor.ocr_engine = FakeEngine()
+            events = list(processor.iter_changes(1.0, "text"))
+        self.assertEqual([event.text for event in events], ["dark", "bright"])
+        self.assertFalse(os.path.exists(temp_dir))
+        # 迭代结束后恢复缓存设置
+        self.assertIsNotNone(processor.ocr_cache)
+
+    def test_extract_after_iteration(self):
+        """测试迭代结束后在同一对象上提取截图，第一张截图不被跳过"""
+        processor = AdvancedVideoProcessor(self.video_path, os.path.join(self.temp_dir, 'events'),
+                                           writer_threads=0)
+        list(processor.iter_changes(1.0, "image"))
+        self.assertIsNone(processor.previous_frame)
+        screenshots = processor.extract_frames_with_custom_thresholds(1.0, "image")
+        self.assertEqual(len(screenshots), 2)
+        self.assertEqual(processor.screenshot_times, [0.0, 4.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
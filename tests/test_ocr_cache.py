@@ -0,0 +1,102 @@
+"""OCR结果缓存测试文件"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# 将项目根目录添加到Python路径中
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import cv2
+import numpy as np
+
+from ocr_cache import OCRCache
+from video_processor import VideoProcessor
+
+
+class CountingEngine:
+    """记录调用次数的OCR引擎"""
+    name = "counting"
+
+    def __init__(self):
+        self.calls = 0
+
+    def image_to_string(self, image):
+        self.calls += 1
+        return f"text {np.asarray(image).mean():.0f}"
+
+
+class TestOCRCache(unittest.TestCase):
+    """OCR结果缓存测试类"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.temp_dir, 'ocr_cache.sqlite3')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_get_put(self):
+        """测试按图像内容、后端和语言区分缓存"""
+        image = np.zeros((20, 30, 3), dtype=np.uint8)
+        cache = OCRCache(self.cache_path, backend="pytesseract", lang="eng")
+        key = cache.key(image)
+        self.assertIsNone(cache.get(key))
+        cache.put(key, "你好")
+        cache.close()
+
+        cache = OCRCache(self.cache_path, backend="pytesseract", lang="eng")
+        self.assertEqual(cache.get(cache.key(image.copy())), "你好")
+        self.assertNotEqual(cache.key(image[:, :15]), key)
+        self.assertNotEqual(OCRCache(self.cache_path, backend="pytesseract", lang="chi_sim").key(image), key)
+        self.assertEqual(cache.stats(), {'ocr_cache_hits': 1, 'ocr_cache_misses': 0})
+        cache.close()
+
+    def test_auto_backend(self):
+        """测试auto后端的命名空间由实际创建的引擎决定，确定之前不能计算键"""
+        image = np.zeros((20, 30, 3), dtype=np.uint8)
+        cache = OCRCache(self.cache_path)
+        with self.assertRaises(RuntimeError):
+            cache.key(image)
+        cache.set_backend("pytesseract")
+        self.assertEqual(cache.key(image), OCRCache(self.cache_path, backend="pytesseract").key(image))
+        self.assertNotEqual(cache.key(image), OCRCache(self.cache_path, backend="tesserocr").key(image))
+
+    def test_lru_eviction(self):
+        """测试超过大小上限时淘汰最久未使用的记录"""
+        cache = OCRCache(self.cache_path, backend="pytesseract", max_mb=2000 / (1024 * 1024))
+        keys = [cache.key(np.full((4, 4), i, dtype=np.uint8)) for i in range(40)]
+        cache.put(keys[0], "x" * 100)
+        for key in keys[1:]:
+            # 第一条记录一直被使用，不会被淘汰
+            cache.get(keys[0])
+            cache.put(key, "x" * 100)
+        self.assertIsNotNone(cache.get(keys[0]))
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertLessEqual(cache._total_size(), 2000)
+        cache.close()
+
+    def test_rerun_uses_cache(self):
+        """测试重复处理同一视频时不再调用OCR引擎"""
+        video_path = os.path.join(self.temp_dir, 'test.mp4')
+        writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*'mp4v'), 10, (160, 120))
+        for i in range(50):
+            writer.write(np.full((120, 160, 3), 40 * (i // 10), dtype=np.uint8))
+        writer.release()
+
+        calls = []
+        for _ in range(2):
+            processor = VideoProcessor(video_path, os.path.join(self.temp_dir, 'out'), writer_threads=0,
+                                       ocr_gate_threshold=0, checkpoint_interval=0)
+            processor.ocr_cache.path = self.cache_path
+            processor.ocr_engine = CountingEngine()
+            screenshots = processor.process_video(1.0)
+            calls.append(processor.ocr_engine.calls)
+            self.assertIn(b"|counting|", processor.ocr_cache.namespace)
+        self.assertEqual(calls, [5, 0])
+        self.assertEqual(len(screenshots), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+"""OCR引擎测试文件"""
+import unittest
+import sys
+import os
+
+# 将项目根目录添加到Python路径中
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ocr_engine import create_ocr_engine, text_from_tsv, OCREngine, PytesseractEngine
+
+
+class TestOCREngine(unittest.TestCase):
+    """OCR引擎测试类"""
+
+    def test_pytesseract_backend(self):
+        """测试显式选择pytesseract后端"""
+        engine = create_ocr_engine("pytesseract", "eng")
+        self.assertIsInstance(engine, PytesseractEngine)
+        self.assertEqual(engine.lang, "eng")
+
+    def test_backend_must_implement_recognition(self):
+        """测试没有实现 image_to_string() 的后端无法实例化"""
+        class IncompleteEngine(OCREngine):
+            name = "incomplete"
+
+        with self.assertRaises(TypeError):
+            IncompleteEngine()
+
+    def test_auto_fallback(self):
+        """测试tesserocr不可用时自动回退到pytesseract"""
+        try:
+            import tesserocr  # noqa: F401
+            self.skipTest("已安装tesserocr")
+        except ImportError:
+            pass
+        self.assertIsInstance(create_ocr_engine("auto"), PytesseractEngine)
+        with self.assertRaises(ImportError):
+            create_ocr_engine("tesserocr")
+
+    def test_confidence_filter(self):
+        """测试丢弃置信度低的单词，按行重组文字"""
+        header = "level\tpage_num\tblock_num\tpar_num\tline_num\tword_num\tleft\ttop\twidth\theight\tconf\ttext"
+        rows = [
+            "1\t1\t0\t0\t0\t0\t0\t0\t640\t480\t-1\t",
+            "5\t1\t1\t1\t1\t1\t10\t10\t50\t20\t96.5\tHello",
+            "5\t1\t1\t1\t1\t2\t70\t10\t8\t20\t31\t~",
+            "5\t1\t1\t1\t1\t3\t90\t10\t50\t20\t91\tworld",
+            "5\t1\t1\t1\t2\t1\t10\t40\t60\t20\t88\t第二行",
+        ]
+        tsv = "\n".join([header] + rows)
+        self.assertEqual(text_from_tsv(tsv, 60), "Hello world\n第二行")
+        self.assertEqual(text_from_tsv(tsv, 95), "Hello")
+        self.assertEqual(create_ocr_engine("pytesseract", min_confidence=60).min_confidence, 60)
+
+    def test_invalid_backend(self):
+        """测试不支持的后端"""
+        with self.assertRaises(ValueError):
+            create_ocr_engine("unknown")
+
+
+if __name__ == '__main__':
+    unittest.main()
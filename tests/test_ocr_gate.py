@@ -0,0 +1,52 @@
+"""OCR闸门测试文件"""
+import unittest
+import sys
+import os
+
+# 将项目根目录添加到Python路径中
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import cv2
+import numpy as np
+
+from ocr_gate import OCRGate
+from ocr_pool import iter_frame_texts
+
+
+def make_slide(text):
+    frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+    cv2.putText(frame, text, (50, 200), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+    return frame
+
+
+class TestOCRGate(unittest.TestCase):
+    """OCR闸门测试类"""
+
+    def test_skip_identical_frames(self):
+        """测试相同画面跳过OCR，文字变化时重新OCR"""
+        gate = OCRGate(threshold=8)
+        slide = make_slide("Slide 1")
+        noisy = np.clip(slide.astype(np.int16) + 2, 0, 255).astype(np.uint8)
+        self.assertTrue(gate.needs_ocr(slide))
+        self.assertFalse(gate.needs_ocr(slide.copy()))
+        self.assertFalse(gate.needs_ocr(noisy))
+        self.assertTrue(gate.needs_ocr(make_slide("Slide 2")))
+        self.assertEqual(gate.stats(), {'ocr_calls': 2, 'ocr_skipped': 2})
+
+    def test_reuse_cached_text(self):
+        """测试跳过OCR的帧复用上一次的文字"""
+        frames = [(i, make_slide(f"Slide {i // 3}")) for i in range(6)]
+        calls = []
+
+        def extract(image):
+            calls.append(1)
+            return f"text {len(calls)}"
+
+        gate = OCRGate()
+        texts = [text for _, _, text in iter_frame_texts(frames, lambda f: f, extract, gate=gate)]
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(texts, ["text 1"] * 3 + ["text 2"] * 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
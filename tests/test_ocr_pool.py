@@ -0,0 +1,65 @@
+"""OCR工作池测试文件"""
+import unittest
+import sys
+import os
+import subprocess
+import tempfile
+
+# 将项目根目录添加到Python路径中
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_DIR)
+
+import numpy as np
+
+from ocr_cache import OCRCache
+from ocr_engine import create_ocr_engine
+from ocr_pool import iter_frame_texts
+
+
+def _frames(count):
+    for i in range(count):
+        yield i * 10, np.full((8, 8, 3), i, dtype=np.uint8)
+
+
+class TestOCRPool(unittest.TestCase):
+    """OCR工作池测试类"""
+
+    def test_sync_order(self):
+        """测试同步识别按帧顺序产出"""
+        results = list(iter_frame_texts(_frames(5), lambda f: f, lambda img: str(img[0, 0, 0])))
+        self.assertEqual([index for index, _, _ in results], [0, 10, 20, 30, 40])
+        self.assertEqual([text for _, _, text in results], ['0', '1', '2', '3', '4'])
+
+    def test_pool_order(self):
+        """测试多进程识别结果按帧顺序返回"""
+        results = list(iter_frame_texts(_frames(6), lambda f: f, None, workers=2, queue_depth=3))
+        self.assertEqual([index for index, _, _ in results], [0, 10, 20, 30, 40, 50])
+        for i, (_, frame, text) in enumerate(results):
+            self.assertEqual(frame[0, 0, 0], i)
+            self.assertIsInstance(text, str)
+
+    def test_pool_cache_backend(self):
+        """测试缓存按工作进程实际创建的引擎区分后端"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = OCRCache(os.path.join(temp_dir, 'ocr_cache.sqlite3'))
+            list(iter_frame_texts(_frames(2), lambda f: f, None, workers=1, cache=cache))
+            cache.close()
+        self.assertIn(f"|{create_ocr_engine().name}|".encode('utf-8'), cache.namespace)
+
+    def test_tesserocr_backend(self):
+        """测试使用tesserocr后端的工作池不导入pytesseract，并把语言传给工作进程"""
+        code = (
+            "import sys\n"
+            "from ocr_pool import OCRWorkerPool\n"
+            "pool = OCRWorkerPool(1, backend='tesserocr', lang='eng')\n"
+            "print(pool.lang, 'pytesseract' in sys.modules)\n"
+            "pool.close()"
+        )
+        result = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_DIR,
+                                capture_output=True, text=True, timeout=60)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.split(), ['eng', 'False'])
+
+
+if __name__ == '__main__':
+    unittest.main()
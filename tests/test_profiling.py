@@ -0,0 +1,109 @@
+"""分阶段计时测试文件"""
+import unittest
+import sys
+import os
+import csv
+import json
+import shutil
+import tempfile
+import unicodedata
+
+# 将项目根目录添加到Python路径中
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from profiling import MemoryMonitor, StageProfiler, current_rss, resolve_trace_path
+
+
+class TestStageProfiler(unittest.TestCase):
+    """分阶段计时测试类"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_summary(self):
+        """测试按阶段汇总次数和耗时"""
+        profiler = StageProfiler()
+        for _ in range(3):
+            with profiler.stage('ocr'):
+                pass
+        frames = list(profiler.iterate('decode', [(0, None), (1, None)]))
+        profiler.wrap('hash', len)([1, 2])
+        profiler.count('screenshots', 2)
+
+        summary = profiler.summary()
+        self.assertEqual(len(frames), 2)
+        self.assertEqual(summary['ocr']['count'], 3)
+        # 最后一次取帧（迭代结束）也计入解码时间
+        self.assertEqual(summary['decode']['count'], 3)
+        self.assertEqual(summary['hash']['count'], 1)
+        self.assertEqual(summary['ssim']['count'], 0)
+        self.assertIn('screenshots=2', profiler.format_report(1.0))
+
+    def test_report_alignment(self):
+        """测试报告表头和各行的列对齐（按终端显示宽度计算）"""
+        profiler = StageProfiler()
+        for stage in ('decode', 'ocr'):
+            with profiler.stage(stage):
+                pass
+        table = profiler.format_report(1.0).splitlines()[:3]
+
+        def display_width(text):
+            return sum(2 if unicodedata.east_asian_width(char) in ('W', 'F') else 1 for char in text)
+
+        self.assertEqual(len({display_width(line) for line in table}), 1)
+
+    def test_disabled(self):
+        """测试未启用时不记录"""
+        profiler = StageProfiler(enabled=False)
+        with profiler.stage('ocr'):
+            pass
+        profiler.count('screenshots')
+        self.assertIs(profiler.wrap('hash', len), len)
+        self.assertEqual(profiler.events, [])
+        self.assertEqual(dict(profiler.counters), {})
+
+    def test_write_trace(self):
+        """测试写出JSON和CSV计时记录"""
+        profiler = StageProfiler()
+        with profiler.stage('encode'):
+            pass
+        json_path = os.path.join(self.temp_dir, 'trace.json')
+        csv_path = os.path.join(self.temp_dir, 'sub', 'trace.csv')
+        profiler.write_trace(json_path)
+        profiler.write_trace(csv_path)
+
+        with open(json_path, encoding='utf-8') as f:
+            trace = json.load(f)
+        self.assertEqual(trace['summary']['encode']['count'], 1)
+        self.assertEqual(trace['events'][0]['stage'], 'encode')
+        with open(csv_path, encoding='utf-8') as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0], ['stage', 'start', 'duration'])
+        self.assertEqual(rows[1][0], 'encode')
+
+    def test_resolve_trace_path(self):
+        """测试目录时按视频名生成文件名"""
+        self.assertIsNone(resolve_trace_path(None, 'video'))
+        self.assertEqual(resolve_trace_path(self.temp_dir, 'video'),
+                         os.path.join(self.temp_dir, 'video_profile.json'))
+        self.assertEqual(resolve_trace_path('out.csv', 'video'), 'out.csv')
+
+
+    def test_memory_monitor(self):
+        """测试记录处理期间的峰值常驻内存"""
+        if current_rss() <= 0:
+            self.skipTest("无法获取进程内存信息")
+        with MemoryMonitor(interval=0.01) as monitor:
+            block = np.ones(64 * 1024 * 1024, dtype=np.uint8)
+            monitor.sample()
+            del block
+        self.assertGreaterEqual(monitor.peak_mb - monitor.baseline_mb, 60)
+
+
+if __name__ == '__main__':
+    unittest.main()
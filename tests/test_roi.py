@@ -0,0 +1,80 @@
+"""识别区域测试文件"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# 将项目根目录添加到Python路径中
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import cv2
+import numpy as np
+
+from roi import RegionSelector, parse_roi, parse_rois, resolve_roi
+from advanced_video_processor import AdvancedVideoProcessor
+
+
+class TestROI(unittest.TestCase):
+    """识别区域测试类"""
+
+    def test_parse(self):
+        """测试解析比例和像素区域"""
+        self.assertEqual(parse_roi("0, 0.8, 1, 0.2"), (0.0, 0.8, 1.0, 0.2))
+        self.assertEqual(len(parse_rois("0,0,1,0.5; 10,20,100,50")), 2)
+        self.assertEqual(parse_rois(""), [])
+        with self.assertRaises(ValueError):
+            parse_roi("1,2,3")
+        with self.assertRaises(ValueError):
+            parse_roi("0,0,0,10")
+
+    def test_resolve(self):
+        """测试比例区域换算为像素并裁剪到画面内"""
+        self.assertEqual(resolve_roi((0, 0.8, 1, 0.2), 1920, 1080), (0, 864, 1920, 216))
+        self.assertEqual(resolve_roi((100, 50, 5000, 200), 640, 360), (100, 50, 540, 200))
+
+    def test_composite(self):
+        """测试多个区域纵向拼接"""
+        frame = np.zeros((100, 200, 3), dtype=np.uint8)
+        selector = RegionSelector(["0,0,200,10", "0,50,100,20"])
+        self.assertEqual(selector.apply(frame).shape, (10 + 20 + 8, 200, 3))
+        self.assertIs(RegionSelector().apply(frame), frame)
+
+    def test_proportional(self):
+        """测试像素区域换算为比例后在缩小的帧上截取同一块画面"""
+        selector = RegionSelector(["0,60,200,20"]).proportional(200, 100)
+        self.assertEqual(selector.rois, [(0.0, 0.6, 1.0, 0.2)])
+        self.assertEqual(selector.rects(100, 50), [(0, 30, 100, 10)])
+
+    def test_ignore_changes_outside_roi(self):
+        """测试区域外的动画不会触发截图"""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            video_path = os.path.join(temp_dir, "test.mp4")
+            writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*'mp4v'), 10, (320, 240))
+            for i in range(50):
+                frame = np.zeros((240, 320, 3), dtype=np.uint8)
+                # 右上角每秒变化的动画
+                cv2.circle(frame, (280, 40), 10 + (i // 10) * 5, (255, 255, 255), -1)
+                cv2.putText(frame, "Subtitle", (20, 220), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+                writer.write(frame)
+            writer.release()
+
+            full = AdvancedVideoProcessor(video_path, os.path.join(temp_dir, "full"), writer_threads=0)
+            band = AdvancedVideoProcessor(video_path, os.path.join(temp_dir, "band"), writer_threads=0,
+                                          roi=["0,0.75,1,0.25"])
+            self.assertGreater(len(full.extract_frames_with_custom_thresholds(1.0, "image", 0.99)), 1)
+            self.assertEqual(len(band.extract_frames_with_custom_thresholds(1.0, "image", 0.99)), 1)
+
+            # 分析流: 在缩小的灰度帧上检测，保存的截图仍是原始分辨率的彩色帧
+            stream = AdvancedVideoProcessor(video_path, os.path.join(temp_dir, "stream"), writer_threads=0,
+                                            roi=["0,180,320,60"], analysis_width=160, analysis_stream=True)
+            screenshots = stream.extract_frames_with_custom_thresholds(1.0, "image", 0.99)
+            self.assertEqual(len(screenshots), 1)
+            self.assertEqual(cv2.imread(screenshots[0]).shape, (240, 320, 3))
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
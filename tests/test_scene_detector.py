@@ -0,0 +1,56 @@
+"""场景变化预筛测试文件"""
+import unittest
+import sys
+import os
+
+# 将项目根目录添加到Python路径中
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import cv2
+import numpy as np
+
+from scene_detector import SceneDetector
+
+
+def make_frame(text: str, seed: int = 0) -> np.ndarray:
+    """生成带字幕和轻微噪声的帧"""
+    rng = np.random.default_rng(seed)
+    frame = np.full((360, 640, 3), 200, dtype=np.uint8)
+    cv2.putText(frame, text, (60, 320), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (20, 20, 20), 2)
+    noise = rng.integers(-4, 5, size=frame.shape)
+    return np.clip(frame.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+class TestSceneDetector(unittest.TestCase):
+    """场景变化预筛测试类"""
+
+    def test_subtitle_change_is_candidate(self):
+        """测试噪声不触发、字幕变化触发候选点"""
+        detector = SceneDetector()
+        self.assertTrue(detector.is_candidate(make_frame("first subtitle line", 0)))
+        self.assertFalse(detector.is_candidate(make_frame("first subtitle line", 1)))
+        self.assertTrue(detector.is_candidate(make_frame("another sentence here", 2)))
+
+    def test_filter_keeps_settle_frames(self):
+        """测试只保留候选点及其后settle_frames帧"""
+        texts = ["aaa aaa aaa"] * 5 + ["bbb bbb bbb"] * 5
+        frames = [(i * 10, make_frame(text, i)) for i, text in enumerate(texts)]
+        detector = SceneDetector(settle_frames=1)
+        kept = [index for index, _ in detector.filter(frames)]
+        self.assertEqual(kept, [0, 10, 50, 60])
+        self.assertEqual(detector.stats(), {'scene_candidates': 2, 'scene_analyzed': 4, 'scene_skipped': 6})
+
+    def test_hist_detects_cut(self):
+        """测试直方图方法检测画面整体切换"""
+        detector = SceneDetector(method="hist")
+        detector.is_candidate(np.full((90, 160, 3), (200, 50, 50), dtype=np.uint8))
+        self.assertTrue(detector.is_candidate(np.full((90, 160, 3), (50, 50, 200), dtype=np.uint8)))
+
+    def test_invalid_method(self):
+        """测试不支持的方法"""
+        with self.assertRaises(ValueError):
+            SceneDetector(method="edges")
+
+
+if __name__ == '__main__':
+    unittest.main()
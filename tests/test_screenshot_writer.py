@@ -0,0 +1,66 @@
+"""截图写入器测试文件"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# 将项目根目录添加到Python路径中
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from PIL import Image
+
+from screenshot_writer import ImageEncoder, ScreenshotWriter, write_image
+
+
+class TestScreenshotWriter(unittest.TestCase):
+    """截图写入器测试类"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.output_dir = os.path.join(self.temp_dir, "中文目录_截图")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_background_write(self):
+        """测试后台写入中文路径并在关闭时全部落盘"""
+        paths = [os.path.join(self.output_dir, f"截图_{i:03d}.png") for i in range(10)]
+        with ScreenshotWriter(self.output_dir, threads=2, queue_size=2) as writer:
+            for i, path in enumerate(paths):
+                writer.submit(np.full((32, 48, 3), (i, 0, 0), dtype=np.uint8), path)
+        for i, path in enumerate(paths):
+            self.assertTrue(os.path.exists(path))
+            # BGR写入后应为RGB中的蓝色通道
+            self.assertEqual(np.asarray(Image.open(path))[0, 0, 2], i)
+
+    def test_errors_reported(self):
+        """测试写入失败时汇报错误"""
+        writer = ScreenshotWriter(self.output_dir, threads=1)
+        writer.submit(np.zeros((8, 8, 3), dtype=np.uint8), os.path.join(self.output_dir, "missing", "a.png"))
+        errors = writer.close()
+        self.assertEqual(len(errors), 1)
+
+    def test_output_formats(self):
+        """测试JPEG/WebP编码并写入中文路径"""
+        os.makedirs(self.output_dir)
+        frame = np.full((32, 48, 3), 128, dtype=np.uint8)
+        for encoder in (ImageEncoder("jpg", 80), ImageEncoder("webp", 50), ImageEncoder("webp", webp_lossless=True),
+                        ImageEncoder("png", png_compression=9)):
+            path = os.path.join(self.output_dir, f"截图{encoder.extension}")
+            write_image(frame, path, encoder)
+            with Image.open(path) as image:
+                self.assertEqual(image.size, (48, 32))
+        self.assertEqual(ImageEncoder("jpeg").extension, ".jpg")
+
+    def test_invalid_encoder(self):
+        """测试无效的编码参数"""
+        with self.assertRaises(ValueError):
+            ImageEncoder("bmp")
+        with self.assertRaises(ValueError):
+            ImageEncoder("jpg", quality=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
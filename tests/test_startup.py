@@ -0,0 +1,109 @@
+"""启动开销测试文件"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import subprocess
+
+# 将项目根目录添加到Python路径中
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_DIR)
+
+# 只应在实际处理视频时才导入的依赖
+HEAVY_MODULES = ['cv2', 'numpy', 'PIL', 'skimage', 'scipy', 'imagehash', 'pytesseract', 'tesserocr', 'av']
+
+# 只在选择了对应功能时才导入的依赖和模块
+OPTIONAL_MODULES = ['PIL', 'skimage', 'scipy', 'imagehash', 'pytesseract', 'tesserocr', 'av',
+                    'ocr_engine', 'ocr_pool', 'analysis_index', 'video_segments', 'scene_detector']
+
+# 导入命令行入口的时间上限（秒），远高于只导入标准库的耗时，
+# 但误在模块顶层导入cv2、numpy等依赖时会超出
+IMPORT_TIME_BUDGET = 0.15
+
+
+def loaded_modules(code: str, modules: list, env: dict = None) -> list:
+    """在新的解释器中运行代码（模块导入状态不受测试进程影响），返回其中已导入的模块"""
+    code += f"\nimport sys; print(','.join(m for m in {modules!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_DIR, env=env,
+                            capture_output=True, text=True, timeout=120)
+    if result.returncode != 0:
+        raise AssertionError(result.stderr)
+    output = result.stdout.strip().splitlines()
+    return output[-1].split(',') if output and output[-1] else []
+
+
+def import_time(module: str, runs: int = 3) -> float:
+    """用 -X importtime 在新的解释器中测量导入模块的累计耗时（秒），取多次运行的最小值以减少波动"""
+    times = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"], cwd=PROJECT_DIR,
+                                capture_output=True, text=True, timeout=120)
+        if result.returncode != 0:
+            raise AssertionError(result.stderr)
+        # 每行格式为 "import time: 自身耗时 | 累计耗时 | 模块名"，单位为微秒
+        for line in result.stderr.splitlines():
+            fields = line.split('|')
+            if len(fields) == 3 and fields[2].strip() == module:
+                times.append(int(fields[1]) / 1e6)
+    if not times:
+        raise AssertionError(f"没有找到 {module} 的导入耗时")
+    return min(times)
+
+
+class TestStartup(unittest.TestCase):
+    """启动开销测试类"""
+
+    def test_main_import(self):
+        """测试导入命令行入口不加载重量级依赖"""
+        self.assertEqual(loaded_modules("import main", HEAVY_MODULES), [])
+
+    def test_main_import_time(self):
+        """测试导入命令行入口的耗时在预算之内"""
+        self.assertLess(import_time('main'), IMPORT_TIME_BUDGET)
+
+    def test_gui_import(self):
+        """测试导入图形界面不加载重量级依赖"""
+        try:
+            import tkinter  # noqa: F401
+        except ImportError:
+            self.skipTest("tkinter不可用")
+        self.assertEqual(loaded_modules("import gui", HEAVY_MODULES), [])
+
+    def test_processor_import(self):
+        """测试导入处理器不加载只有部分检测方法和功能才用到的模块"""
+        self.assertEqual(loaded_modules("import video_processor, advanced_video_processor", OPTIONAL_MODULES), [])
+
+    def test_text_method(self):
+        """测试只做文字检测时不加载SSIM和哈希的依赖"""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            code = (
+                "import logging, os, cv2, numpy as np\n"
+                "logging.disable(logging.CRITICAL)\n"
+                "from advanced_video_processor import AdvancedVideoProcessor\n"
+                f"path = os.path.join({temp_dir!r}, 'clip.mp4')\n"
+                "writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), 10, (64, 48))\n"
+                "for i in range(20): writer.write(np.full((48, 64, 3), i * 10, dtype=np.uint8))\n"
+                "writer.release()\n"
+                f"AdvancedVideoProcessor(path, os.path.join({temp_dir!r}, 'out'), writer_threads=0, "
+                "checkpoint_interval=0, ocr_cache=False).extract_frames_with_custom_thresholds(0.5, 'text')"
+            )
+            self.assertEqual(loaded_modules(code, ['skimage', 'scipy', 'imagehash', 'analysis_index',
+                                                   'video_segments', 'scene_detector']), [])
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def test_config_has_no_side_effects(self):
+        """测试导入配置不创建目录"""
+        home = tempfile.mkdtemp()
+        try:
+            env = dict(os.environ, HOME=home, USERPROFILE=home)
+            loaded_modules("import config", [], env)
+            self.assertEqual(os.listdir(home), [])
+        finally:
+            shutil.rmtree(home, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
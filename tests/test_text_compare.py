@@ -0,0 +1,54 @@
+"""文字比较测试文件"""
+import unittest
+import sys
+import os
+import random
+
+# 将项目根目录添加到Python路径中
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from text_compare import _bit_parallel_distance, edit_distance, normalize_text, text_changed, text_similarity
+
+
+def reference_distance(a: str, b: str) -> int:
+    """动态规划计算的编辑距离"""
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+class TestTextCompare(unittest.TestCase):
+    """文字比较测试类"""
+
+    def test_normalize(self):
+        """测试全角转半角、忽略大小写、空白和标点"""
+        self.assertEqual(normalize_text("ＨＥＬＬＯ，  Ｗｏｒｌｄ！\n第１页"), "helloworld第1页")
+        self.assertEqual(normalize_text("  。，…  "), "")
+        self.assertFalse(text_changed("第1页：概述", "第１页  概述。"))
+
+    def test_edit_distance(self):
+        """测试位并行编辑距离与动态规划结果一致"""
+        rng = random.Random(0)
+        for _ in range(500):
+            a = ''.join(rng.choice('ab文字') for _ in range(rng.randint(0, 24)))
+            b = ''.join(rng.choice('ab文字') for _ in range(rng.randint(0, 24)))
+            self.assertEqual(_bit_parallel_distance(a, b), reference_distance(a, b))
+            self.assertEqual(edit_distance(a, b), reference_distance(a, b))
+
+    def test_threshold(self):
+        """测试长文本中个别字符的抖动不算变化，短文本的变化仍能检测到"""
+        text = "视频变化截图工具会在文字或画面变化时保存截图" * 20
+        jitter = text[:100] + "x" + text[101:]
+        self.assertGreater(text_similarity(text, jitter), 0.99)
+        self.assertFalse(text_changed(text, jitter, 0.9))
+        self.assertTrue(text_changed(text, jitter, 1.0))
+        self.assertTrue(text_changed("第1页", "第2页", 0.9))
+        self.assertTrue(text_changed(text, text[:200], 0.9))
+
+
+if __name__ == '__main__':
+    unittest.main()
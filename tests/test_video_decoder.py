@@ -0,0 +1,139 @@
+"""解码后端测试文件"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# 将项目根目录添加到Python路径中
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import cv2
+import numpy as np
+
+from frame_sampler import FrameSampler
+from video_decoder import FFmpegPipeDecoder, FrameFetcher, VideoDecoder, find_ffmpeg, open_video, probe_gop_size
+
+
+class TestVideoDecoder(unittest.TestCase):
+    """解码后端测试类"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.video_path = os.path.join(self.temp_dir, 'test.mp4')
+        # 每帧亮度不同，根据像素值即可确认帧编号
+        writer = cv2.VideoWriter(self.video_path, cv2.VideoWriter_fourcc(*'mp4v'), 10, (160, 120))
+        for i in range(60):
+            writer.write(np.full((120, 160, 3), i * 4, dtype=np.uint8))
+        writer.release()
+        # 编码有损，以cv2.VideoCapture逐帧解码的结果为准
+        cap = cv2.VideoCapture(self.video_path)
+        self.expected = []
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            self.expected.append(int(frame[0, 0, 0]))
+        cap.release()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _check_backend(self, backend: str):
+        cap = open_video(self.video_path, backend)
+        self.assertTrue(cap.isOpened())
+        self.assertEqual(cap.get(cv2.CAP_PROP_FPS), 10)
+        samples = [(index, int(frame[0, 0, 0])) for index, frame in FrameSampler(cap, 7, "grab")]
+        self.assertEqual([index for index, _ in samples], list(range(0, 60, 7)))
+        for index, value in samples:
+            self.assertLessEqual(abs(value - self.expected[index]), 1)
+
+        # 跳转后读取目标帧
+        cap.set(cv2.CAP_PROP_POS_MSEC, 4500)
+        ret, frame = cap.read()
+        cap.release()
+        self.assertTrue(ret)
+        self.assertLessEqual(abs(int(frame[0, 0, 0]) - self.expected[45]), 1)
+
+    def test_backend_must_implement_interface(self):
+        """测试没有实现解码接口的后端无法实例化"""
+        class IncompleteDecoder(VideoDecoder):
+            name = "incomplete"
+
+            def grab(self):
+                return False
+
+        with self.assertRaises(TypeError):
+            IncompleteDecoder()
+
+    def test_opencv(self):
+        """测试OpenCV后端"""
+        self._check_backend("opencv")
+
+    def test_pyav(self):
+        """测试PyAV后端"""
+        try:
+            import av  # noqa: F401
+        except ImportError:
+            self.skipTest("未安装PyAV")
+        self._check_backend("pyav")
+
+    def test_ffmpeg(self):
+        """测试ffmpeg管道后端，包括输出缩小的灰度帧"""
+        if not find_ffmpeg():
+            self.skipTest("未找到ffmpeg程序")
+        self._check_backend("ffmpeg")
+
+        cap = FFmpegPipeDecoder(self.video_path, pix_fmt="gray", width=80, frame_step=10)
+        self.assertEqual(cap.get(cv2.CAP_PROP_FRAME_WIDTH), 80)
+        frames = [frame for _, frame in FrameSampler(cap, 10, "grab")]
+        cap.release()
+        self.assertEqual(len(frames), 6)
+        self.assertEqual(frames[0].shape, (60, 80))
+
+    def test_analysis_output(self):
+        """测试各后端输出缩小的灰度帧，FrameFetcher读取原始彩色帧"""
+        backends = ["opencv"]
+        try:
+            import av  # noqa: F401
+            backends.append("pyav")
+        except ImportError:
+            pass
+        # 以cv2解码后转换的灰度值为准
+        reference = cv2.VideoCapture(self.video_path)
+        reference.set(cv2.CAP_PROP_POS_FRAMES, 20)
+        expected_gray = int(cv2.cvtColor(reference.read()[1], cv2.COLOR_BGR2GRAY)[0, 0])
+        reference.release()
+        for backend in backends:
+            cap = open_video(self.video_path, backend, pix_fmt="gray", width=80)
+            self.assertEqual(cap.get(cv2.CAP_PROP_FRAME_WIDTH), 80)
+            self.assertEqual((cap.source_width, cap.source_height), (160, 120))
+            cap.set(cv2.CAP_PROP_POS_MSEC, 2000)
+            ret, frame = cap.read()
+            cap.release()
+            self.assertTrue(ret)
+            self.assertEqual(frame.shape, (60, 80))
+            self.assertLessEqual(abs(int(frame[0, 0]) - expected_gray), 2)
+
+        fetcher = FrameFetcher(self.video_path, 10)
+        frame = fetcher.read(33)
+        fetcher.close()
+        self.assertEqual(frame.shape, (120, 160, 3))
+        self.assertLessEqual(abs(int(frame[0, 0, 0]) - self.expected[33]), 1)
+
+    def test_probe_gop_size(self):
+        """测试探测关键帧间隔"""
+        gop_size = probe_gop_size(self.video_path)
+        if gop_size is None:
+            self.skipTest("PyAV和ffprobe均不可用")
+        self.assertGreater(gop_size, 0)
+        self.assertIsNone(probe_gop_size(os.path.join(self.temp_dir, 'missing.mp4')))
+
+    def test_unknown_backend(self):
+        """测试不支持的后端"""
+        with self.assertRaises(ValueError):
+            open_video(self.video_path, "gstreamer")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,11 +2,13 @@
 import unittest
 import sys
 import os
+import shutil
+import tempfile
 
 # 将项目根目录添加到Python路径中
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
- try:
+try:
     from video_processor import VideoProcessor
     from advanced_video_processor import AdvancedVideoProcessor
 except ImportError:
@@ -28,6 +30,19 @@ class TestVideoProcessor(unittest.TestCase):
         if AdvancedVideoProcessor is None:
             self.skipTest("AdvancedVideoProcessor未实现或无法导入")
         self.assertIsNotNone(AdvancedVideoProcessor)
+    
+    def test_no_output_dir_on_init(self):
+        """测试两种处理器在创建时都不创建输出目录"""
+        if VideoProcessor is None or AdvancedVideoProcessor is None:
+            self.skipTest("处理器无法导入")
+        temp_dir = tempfile.mkdtemp()
+        try:
+            for processor_class in (VideoProcessor, AdvancedVideoProcessor):
+                output_dir = os.path.join(temp_dir, processor_class.__name__)
+                processor_class(os.path.join(temp_dir, 'video.mp4'), output_dir, ocr_cache=False)
+                self.assertFalse(os.path.exists(output_dir))
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,89 @@
+"""分段并行处理测试文件"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# 将项目根目录添加到Python路径中
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import cv2
+import numpy as np
+
+from video_segments import boundary_changed, plan_segments, renumber_screenshots, stitch_segments
+from advanced_video_processor import AdvancedVideoProcessor
+
+
+class TestVideoSegments(unittest.TestCase):
+    """分段并行处理测试类"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_plan(self):
+        """测试段边界对齐到取样间隔，每段提前预热"""
+        plan = plan_segments(1000, 10, 4, overlap_frames=25)
+        self.assertEqual(plan, [(0, 0, 250), (220, 250, 500), (470, 500, 750), (720, 750, None)])
+        # 段数不超过取样帧数
+        self.assertEqual(plan_segments(25, 10, 8), [(0, 0, 10), (0, 10, 20), (10, 20, None)])
+
+    def test_stitch(self):
+        """测试删除段边界的重复截图并按时间重新编号"""
+        dark = np.zeros((32, 32), dtype=np.uint8)
+        bright = np.full((32, 32), 255, dtype=np.uint8)
+        self.assertFalse(boundary_changed((dark, "a"), (dark.copy(), "a"), "combined"))
+        self.assertTrue(boundary_changed((dark, "a"), (bright, "a"), "image"))
+        self.assertTrue(boundary_changed((dark, "a"), (dark, "b"), "text"))
+
+        paths = []
+        for name in ("s0_1", "s0_2", "s1_1", "s1_2"):
+            path = os.path.join(self.temp_dir, name + ".png")
+            open(path, 'wb').close()
+            paths.append(path)
+        results = [
+            {'screenshots': paths[:2], 'timestamps': [0.0, 4.0],
+             'first_state': (dark, ""), 'final_state': (bright, "")},
+            # 第二段开头的画面与第一段最后一张截图相同
+            {'screenshots': paths[2:], 'timestamps': [10.0, 12.0],
+             'first_state': (bright, ""), 'final_state': (dark, "")},
+        ]
+        screenshots, timestamps, state = stitch_segments(results, "image")
+        self.assertEqual(timestamps, [0.0, 4.0, 12.0])
+        self.assertFalse(os.path.exists(paths[2]))
+        self.assertIs(state[0], dark)
+
+        output_dir = os.path.join(self.temp_dir, "out")
+        os.makedirs(output_dir)
+        renamed, _ = renumber_screenshots(screenshots, timestamps, output_dir, "video", ".png")
+        self.assertEqual(sorted(os.listdir(output_dir)), ["video_截图_001.png", "video_截图_002.png",
+                                                          "video_截图_003.png"])
+        self.assertEqual(os.path.basename(renamed[-1]), "video_截图_003.png")
+
+    def test_processor_matches_sequential(self):
+        """测试分段处理与不分段处理的截图时间相同"""
+        video_path = os.path.join(self.temp_dir, 'slides.mp4')
+        # 12秒，画面在第2.5秒、第6秒和第9秒切换，第6秒正好在段边界上
+        writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*'mp4v'), 10, (160, 120))
+        for i in range(120):
+            level = 40 if i < 25 else 120 if i < 60 else 200 if i < 90 else 80
+            writer.write(np.full((120, 160, 3), level, dtype=np.uint8))
+        writer.release()
+
+        sequential = AdvancedVideoProcessor(video_path, os.path.join(self.temp_dir, 'sequential'),
+                                            writer_threads=0, checkpoint_interval=0)
+        sequential.extract_frames_with_custom_thresholds(0.5, "image")
+        segmented = AdvancedVideoProcessor(video_path, os.path.join(self.temp_dir, 'segmented'),
+                                           writer_threads=0, checkpoint_interval=0, segments=2,
+                                           segment_overlap=1.0)
+        screenshots = segmented.extract_frames_with_custom_thresholds(0.5, "image")
+        self.assertEqual(segmented.screenshot_times, sequential.screenshot_times)
+        self.assertEqual(sorted(os.listdir(segmented.output_dir)),
+                         [os.path.basename(path) for path in screenshots])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import re
+import unicodedata
+
+# 默认文字相似度阈值：规范化后的文字相似度低于该值时认为文字发生变化，
+# 长文本中个别字符的OCR抖动不会再触发截图
+DEFAULT_TEXT_SIMILARITY = 0.9
+
+# 比较时忽略的字符：空白、标点、符号（\w之外的字符）和下划线
+_IGNORED = re.compile(r'[\W_]+')
+
+# rapidfuzz（可选依赖）的编辑距离，首次使用时确定是否可用
+_rapidfuzz_distance = None
+
+
+def normalize_text(text: str) -> str:
+    """
+    规范化OCR文字：NFKC（全角字母数字和标点转为半角、兼容字符统一）、忽略大小写，
+    删除空白和标点符号，OCR在这些字符上的抖动不影响比较
+    :param text: OCR文字
+    :return: 规范化后的文字
+    """
+    if not text:
+        return ""
+    return _IGNORED.sub('', unicodedata.normalize('NFKC', text).casefold())
+
+
+def _bit_parallel_distance(a: str, b: str) -> int:
+    """
+    位并行（Myers/Hyyrö）编辑距离：较短的字符串的每个字符占一位，
+    每处理较长字符串的一个字符只需几次整数位运算，几千字的文字也只需数毫秒
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    m = len(b)
+    if m == 0:
+        return len(a)
+    peq = {}
+    for i, ch in enumerate(b):
+        peq[ch] = peq.get(ch, 0) | (1 << i)
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+    pv, mv, score = mask, 0, m
+    for ch in a:
+        eq = peq.get(ch, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | ~(xh | pv)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = (ph << 1) | 1
+        mh <<= 1
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv & mask
+    return score
+
+
+def edit_distance(a: str, b: str) -> int:
+    """
+    编辑距离（Levenshtein），安装了rapidfuzz时使用其C++实现
+    :param a: 字符串
+    :param b: 字符串
+    :return: 编辑距离
+    """
+    global _rapidfuzz_distance
+    if _rapidfuzz_distance is None:
+        try:
+            from rapidfuzz.distance import Levenshtein
+            _rapidfuzz_distance = Levenshtein.distance
+        except ImportError:
+            _rapidfuzz_distance = _bit_parallel_distance
+    # 去掉相同的前缀和后缀，只比较中间不同的部分
+    start = 0
+    limit = min(len(a), len(b))
+    while start < limit and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < limit - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+    return _rapidfuzz_distance(a[start:len(a) - end], b[start:len(b) - end])
+
+
+def text_similarity(a: str, b: str) -> float:
+    """
+    规范化后的文字相似度：1 - 编辑距离 / 较长文字的长度
+    :param a: 文字
+    :param b: 文字
+    :return: 0-1之间的相似度，两段文字规范化后都为空时为1
+    """
+    a, b = normalize_text(a), normalize_text(b)
+    if a == b:
+        return 1.0
+    return 1.0 - edit_distance(a, b) / max(len(a), len(b))
+
+
+def text_changed(previous: str, current: str, threshold: float = DEFAULT_TEXT_SIMILARITY) -> bool:
+    """
+    判断文字是否发生变化
+    :param previous: 上一次变化时的文字
+    :param current: 当前帧的文字
+    :param threshold: 相似度阈值，1表示规范化后完全相同才认为没有变化
+    :return: 规范化后的相似度低于阈值时返回True
+    """
+    a, b = normalize_text(previous), normalize_text(current)
+    if a == b:
+        return False
+    longest = max(len(a), len(b))
+    # 编辑距离不小于长度差，长度差已超出允许的距离时不必计算
+    if threshold >= 1.0 or abs(len(a) - len(b)) > (1.0 - threshold) * longest:
+        return True
+    return 1.0 - edit_distance(a, b) / longest < threshold
@@ -0,0 +1,578 @@
+import os
+import shutil
+import logging
+import subprocess
+from abc import ABC, abstractmethod
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+from choices import DECODER_BACKENDS
+
+logger = logging.getLogger(__name__)
+
+# 解码器输出的像素格式及通道数: bgr24(与cv2.VideoCapture相同), gray(分析流使用的灰度帧)
+PIXEL_FORMATS = {'bgr24': 3, 'gray': 1}
+
+
+def output_size(source_width: int, source_height: int, width: int = 0) -> Tuple[int, int]:
+    """
+    输出尺寸：width小于原始宽度时按比例缩小
+    :param source_width: 原始宽度
+    :param source_height: 原始高度
+    :param width: 输出宽度，0表示不缩放
+    :return: (宽, 高)
+    """
+    if 0 < width < source_width:
+        return width, max(1, round(source_height * width / source_width))
+    return source_width, source_height
+
+
+def video_size(path: str) -> Tuple[int, int]:
+    """
+    读取视频的原始尺寸
+    :param path: 视频文件路径
+    :return: (宽, 高)，无法打开时为 (0, 0)
+    """
+    probe = cv2.VideoCapture(path)
+    try:
+        return int(probe.get(cv2.CAP_PROP_FRAME_WIDTH)), int(probe.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    finally:
+        probe.release()
+
+
+# 探测关键帧间隔时最多读取的数据包数和关键帧间隔数
+GOP_PROBE_PACKETS = 2000
+GOP_PROBE_INTERVALS = 3
+
+
+def probe_gop_size(path: str) -> Optional[int]:
+    """
+    探测视频的关键帧间隔（GOP大小）：只解复用视频流开头的数据包，不解码，
+    取相邻关键帧之间帧数的中位数；优先使用PyAV，不可用时使用ffprobe
+    :param path: 视频文件路径
+    :return: 关键帧间隔（帧），无法探测（工具不可用或开头的数据包中关键帧不足两个）时返回None
+    """
+    flags = _keyframe_flags_pyav(path)
+    if flags is None:
+        flags = _keyframe_flags_ffprobe(path)
+    positions = [i for i, keyframe in enumerate(flags or []) if keyframe]
+    intervals = sorted(b - a for a, b in zip(positions, positions[1:]))
+    if not intervals:
+        return None
+    return intervals[len(intervals) // 2]
+
+
+def _keyframe_flags_pyav(path: str) -> Optional[list]:
+    """用PyAV读取视频流开头各数据包是否为关键帧，PyAV不可用或无法打开时返回None"""
+    try:
+        import av
+    except ImportError:
+        return None
+    try:
+        with av.open(path) as container:
+            flags = []
+            for packet in container.demux(container.streams.video[0]):
+                if packet.size == 0:
+                    # 解复用结束时的空数据包
+                    continue
+                flags.append(packet.is_keyframe)
+                if len(flags) >= GOP_PROBE_PACKETS or sum(flags) > GOP_PROBE_INTERVALS:
+                    break
+            return flags
+    except (av.FFmpegError, IndexError) as e:
+        logger.debug(f"PyAV无法读取关键帧信息 {path}: {e}")
+        return None
+
+
+def _keyframe_flags_ffprobe(path: str) -> Optional[list]:
+    """用ffprobe读取视频流开头各数据包是否为关键帧，ffprobe不可用或失败时返回None"""
+    ffmpeg = find_ffmpeg()
+    ffprobe = None
+    if ffmpeg:
+        candidate = os.path.join(os.path.dirname(ffmpeg), 'ffprobe' + os.path.splitext(ffmpeg)[1])
+        ffprobe = candidate if os.path.exists(candidate) else None
+    ffprobe = ffprobe or shutil.which('ffprobe')
+    if not ffprobe:
+        return None
+    command = [ffprobe, '-v', 'error', '-select_streams', 'v:0', '-show_entries', 'packet=flags',
+               '-of', 'csv=p=0', '-read_intervals', f'%+#{GOP_PROBE_PACKETS}', path]
+    try:
+        output = subprocess.run(command, capture_output=True, text=True, timeout=60, check=True).stdout
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.debug(f"ffprobe无法读取关键帧信息 {path}: {e}")
+        return None
+    return [line.startswith('K') for line in output.split()]
+
+
+class VideoDecoder(ABC):
+    """
+    解码器基类，接口与cv2.VideoCapture相同（isOpened/get/set/grab/retrieve/read/release），
+    取样器和处理器不需要区分后端；子类实现 isOpened/get/set/grab/retrieve，read由grab和retrieve组成
+    可以直接输出缩小的灰度帧（分析流），此时帧宽高属性返回输出尺寸，原始尺寸见 source_width/source_height
+    """
+    name = "base"
+    pix_fmt = "bgr24"
+    source_width = source_height = width = height = 0
+
+    def _set_output(self, source_width: int, source_height: int, pix_fmt: str, width: int):
+        """设置输出像素格式和尺寸"""
+        if pix_fmt not in PIXEL_FORMATS:
+            raise ValueError(f"不支持的像素格式: {pix_fmt}")
+        self.pix_fmt = pix_fmt
+        self.source_width, self.source_height = source_width, source_height
+        self.width, self.height = output_size(source_width, source_height, width)
+
+    @property
+    def converting(self) -> bool:
+        """输出是否需要缩放或转换格式"""
+        return self.pix_fmt != "bgr24" or (self.width, self.height) != (self.source_width, self.source_height)
+
+    @abstractmethod
+    def isOpened(self) -> bool:
+        pass
+
+    @abstractmethod
+    def get(self, prop: int) -> float:
+        pass
+
+    @abstractmethod
+    def set(self, prop: int, value: float) -> bool:
+        pass
+
+    @abstractmethod
+    def grab(self) -> bool:
+        pass
+
+    @abstractmethod
+    def retrieve(self) -> Tuple[bool, Optional[np.ndarray]]:
+        pass
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+
+    def set_frame_step(self, frame_step: int):
+        """
+        取样帧间隔提示：只有开始位置（或跳转目标）之后每隔frame_step的帧会被retrieve，后端可以据此提前丢弃其余帧
+        :param frame_step: 取样帧间隔
+        """
+        pass
+
+    def release(self):
+        pass
+
+
+class OpenCVDecoder(VideoDecoder):
+    """
+    cv2.VideoCapture，优先使用FFmpeg后端并传入解码线程数
+    """
+    name = "opencv"
+
+    def __init__(self, path: str, threads: int = 0, pix_fmt: str = "bgr24", width: int = 0):
+        """
+        :param path: 视频文件路径
+        :param threads: 解码线程数，0表示由OpenCV决定
+        :param pix_fmt: 输出像素格式 ("bgr24", "gray")，OpenCV解码后再转换
+        :param width: 输出宽度，0或不小于原始宽度时不缩放
+        """
+        params = []
+        if threads > 0 and hasattr(cv2, 'CAP_PROP_N_THREADS'):
+            params = [cv2.CAP_PROP_N_THREADS, threads]
+        self.cap = cv2.VideoCapture(path, cv2.CAP_FFMPEG, params)
+        if not self.cap.isOpened():
+            # FFmpeg后端不可用时回退到默认后端
+            self.cap = cv2.VideoCapture(path)
+        self._set_output(int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                         pix_fmt, width)
+
+    def _convert(self, ret: bool, frame: Optional[np.ndarray]) -> Tuple[bool, Optional[np.ndarray]]:
+        if not ret or not self.converting:
+            return ret, frame
+        if self.pix_fmt == "gray":
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if (self.width, self.height) != (self.source_width, self.source_height):
+            frame = cv2.resize(frame, (self.width, self.height), interpolation=cv2.INTER_AREA)
+        return ret, frame
+
+    def isOpened(self) -> bool:
+        return self.cap.isOpened()
+
+    def get(self, prop: int) -> float:
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.width)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.height)
+        return self.cap.get(prop)
+
+    def set(self, prop: int, value: float) -> bool:
+        return self.cap.set(prop, value)
+
+    def grab(self) -> bool:
+        return self.cap.grab()
+
+    def retrieve(self) -> Tuple[bool, Optional[np.ndarray]]:
+        return self._convert(*self.cap.retrieve())
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        return self._convert(*self.cap.read())
+
+    def release(self):
+        self.cap.release()
+
+
+class PyAVDecoder(VideoDecoder):
+    """
+    基于PyAV的解码器：帧级和片级多线程解码，只解复用视频流，
+    grab()只解码不转换像素格式，跳转时从关键帧开始解码到目标帧；
+    输出灰度或缩小的帧时，缩放和格式转换由libswscale一次完成
+    """
+    name = "pyav"
+
+    def __init__(self, path: str, threads: int = 0, pix_fmt: str = "bgr24", width: int = 0):
+        """
+        :param path: 视频文件路径
+        :param threads: 解码线程数，0表示由FFmpeg决定
+        :param pix_fmt: 输出像素格式 ("bgr24", "gray")
+        :param width: 输出宽度，0或不小于原始宽度时不缩放
+        """
+        import av
+
+        self._opened = False
+        try:
+            self.container = av.open(path)
+        except av.FFmpegError as e:
+            logger.error(f"PyAV无法打开视频 {path}: {e}")
+            return
+        self._opened = True
+        self.stream = self.container.streams.video[0]
+        self.stream.thread_type = "AUTO"
+        if threads > 0:
+            self.stream.codec_context.thread_count = threads
+        self.fps = float(self.stream.average_rate or self.stream.guessed_rate or 0)
+        self.frame_count = self.stream.frames
+        if not self.frame_count and self.stream.duration and self.fps:
+            self.frame_count = int(self.stream.duration * self.stream.time_base * self.fps)
+        self.start_pts = self.stream.start_time or 0
+        self._set_output(self.stream.codec_context.width, self.stream.codec_context.height, pix_fmt, width)
+        self.position = 0
+        self._frames = self._decode()
+        self._pending = None
+        self._lookahead = None
+
+    def _decode(self, skip_before_pts: Optional[int] = None):
+        """
+        按显示顺序产出解码后的帧
+        :param skip_before_pts: 显示时间早于该值的非参考帧不解码（跳转时使用）
+        """
+        codec = self.stream.codec_context
+        for packet in self.container.demux(self.stream):
+            if skip_before_pts is not None:
+                skipping = packet.pts is not None and packet.pts < skip_before_pts
+                codec.skip_frame = "NONREF" if skipping else "DEFAULT"
+            for frame in packet.decode():
+                yield frame
+        codec.skip_frame = "DEFAULT"
+
+    def _frame_index(self, frame) -> int:
+        """根据显示时间戳计算帧编号"""
+        if frame.pts is None or not self.fps:
+            return self.position
+        return int(round((frame.pts - self.start_pts) * self.stream.time_base * self.fps))
+
+    def isOpened(self) -> bool:
+        return self._opened
+
+    def get(self, prop: int) -> float:
+        if not self._opened:
+            return 0.0
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return float(self.frame_count or 0)
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.width)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.height)
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return float(self.position)
+        if prop == cv2.CAP_PROP_POS_MSEC:
+            return self.position * 1000.0 / self.fps if self.fps else 0.0
+        return 0.0
+
+    def set(self, prop: int, value: float) -> bool:
+        if prop == cv2.CAP_PROP_POS_MSEC:
+            target = int(round(value * self.fps / 1000.0))
+        elif prop == cv2.CAP_PROP_POS_FRAMES:
+            target = int(value)
+        else:
+            return False
+        self._seek(max(0, target))
+        return True
+
+    def _seek(self, target: int):
+        """跳转到目标帧之前的关键帧，向前解码到目标帧，之前的帧不转换"""
+        target_pts = self.start_pts
+        if self.fps:
+            target_pts += int(round(target / self.fps / self.stream.time_base))
+        self.container.seek(target_pts, stream=self.stream, backward=True, any_frame=False)
+        self._frames = self._decode(skip_before_pts=target_pts)
+        self._pending = None
+        self._lookahead = None
+        for frame in self._frames:
+            if self._frame_index(frame) >= target:
+                self._lookahead = frame
+                break
+        self.position = target
+
+    def grab(self) -> bool:
+        if self._lookahead is not None:
+            self._pending, self._lookahead = self._lookahead, None
+        else:
+            self._pending = next(self._frames, None)
+        if self._pending is None:
+            return False
+        self.position += 1
+        return True
+
+    def retrieve(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if self._pending is None:
+            return False, None
+        if self.converting:
+            frame = self._pending.reformat(width=self.width, height=self.height, format=self.pix_fmt,
+                                           interpolation='AREA')
+            return True, frame.to_ndarray()
+        return True, self._pending.to_ndarray(format='bgr24')
+
+    def release(self):
+        if self._opened:
+            self.container.close()
+            self._opened = False
+
+
+def find_ffmpeg() -> Optional[str]:
+    """
+    查找ffmpeg程序：优先使用 VideoConfig.FFMPEG_PATH，否则在PATH中查找
+    :return: ffmpeg程序路径，未找到时返回None
+    """
+    try:
+        from config import VideoConfig
+        if VideoConfig.FFMPEG_PATH and os.path.exists(VideoConfig.FFMPEG_PATH):
+            return VideoConfig.FFMPEG_PATH
+    except ImportError:
+        pass
+    return shutil.which('ffmpeg')
+
+
+class FFmpegPipeDecoder(VideoDecoder):
+    """
+    ffmpeg子进程管道解码器：ffmpeg用select滤镜只输出取样帧，可同时缩放并转换为灰度，
+    Python端只读取需要的帧；跳转时以 -ss 重新启动ffmpeg
+    视频属性（帧率、帧数、尺寸）通过OpenCV读取
+    """
+    name = "ffmpeg"
+
+    def __init__(self, path: str, threads: int = 0, pix_fmt: str = "bgr24", width: int = 0,
+                 frame_step: int = 1, ffmpeg_path: Optional[str] = None):
+        """
+        :param path: 视频文件路径
+        :param threads: ffmpeg解码线程数，0表示由ffmpeg决定
+        :param pix_fmt: 输出像素格式 ("bgr24", "gray")
+        :param width: 输出宽度，0或不小于原始宽度时不缩放
+        :param frame_step: 从开始位置（或跳转目标）起每隔frame_step帧输出一帧
+        :param ffmpeg_path: ffmpeg程序路径，默认为 find_ffmpeg()
+        """
+        self.ffmpeg_path = ffmpeg_path or find_ffmpeg()
+        if not self.ffmpeg_path:
+            raise RuntimeError("未找到ffmpeg程序，请安装ffmpeg或配置 VideoConfig.FFMPEG_PATH")
+        self.path = path
+        self.threads = threads
+        self.frame_step = max(1, int(frame_step))
+
+        probe = cv2.VideoCapture(path)
+        self._opened = probe.isOpened()
+        self.fps = probe.get(cv2.CAP_PROP_FPS) or 0.0
+        self.frame_count = int(probe.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        self._set_output(int(probe.get(cv2.CAP_PROP_FRAME_WIDTH)), int(probe.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                         pix_fmt, width)
+        probe.release()
+        self.channels = PIXEL_FORMATS[pix_fmt]
+        self.frame_size = self.width * self.height * self.channels
+
+        self.process = None
+        self.start_frame = 0
+        self.position = 0
+        self._pending = None
+
+    def _command(self, start_frame: int) -> list:
+        command = [self.ffmpeg_path, '-v', 'error', '-nostdin']
+        if self.threads > 0:
+            command += ['-threads', str(self.threads)]
+        if start_frame > 0 and self.fps:
+            command += ['-ss', f"{start_frame / self.fps:.6f}"]
+        command += ['-i', self.path]
+        filters = []
+        if self.frame_step > 1:
+            # n从跳转位置开始计数，输出跳转目标帧及其后每隔frame_step的帧
+            filters.append(f"select='not(mod(n\\,{self.frame_step}))'")
+        if (self.width, self.height) != (self.source_width, self.source_height):
+            filters.append(f"scale={self.width}:{self.height}:flags=area")
+        if filters:
+            command += ['-vf', ','.join(filters)]
+        command += ['-vsync', '0', '-an', '-sn', '-f', 'rawvideo', '-pix_fmt', self.pix_fmt, '-']
+        return command
+
+    def _start(self, start_frame: int):
+        """从指定帧启动ffmpeg"""
+        self._stop()
+        self.process = subprocess.Popen(self._command(start_frame), stdout=subprocess.PIPE,
+                                        stderr=subprocess.DEVNULL, bufsize=self.frame_size)
+        self.start_frame = start_frame
+        self.position = start_frame
+
+    def _stop(self):
+        if self.process is not None:
+            self.process.stdout.close()
+            self.process.kill()
+            self.process.wait()
+            self.process = None
+
+    def _read_frame(self) -> Optional[bytearray]:
+        """从管道读取一帧的原始数据，结束时返回None"""
+        buffer = bytearray(self.frame_size)
+        view = memoryview(buffer)
+        received = 0
+        while received < self.frame_size:
+            count = self.process.stdout.readinto(view[received:])
+            if not count:
+                return None
+            received += count
+        return buffer
+
+    def isOpened(self) -> bool:
+        return self._opened
+
+    def get(self, prop: int) -> float:
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return float(self.frame_count)
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.width)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.height)
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return float(self.position)
+        if prop == cv2.CAP_PROP_POS_MSEC:
+            return self.position * 1000.0 / self.fps if self.fps else 0.0
+        return 0.0
+
+    def set(self, prop: int, value: float) -> bool:
+        if prop == cv2.CAP_PROP_POS_MSEC:
+            target = int(round(value * self.fps / 1000.0))
+        elif prop == cv2.CAP_PROP_POS_FRAMES:
+            target = int(value)
+        else:
+            return False
+        self._start(max(0, target))
+        return True
+
+    def set_frame_step(self, frame_step: int):
+        frame_step = max(1, int(frame_step))
+        if frame_step != self.frame_step:
+            self.frame_step = frame_step
+            if self.process is not None:
+                self._start(self.position)
+
+    def grab(self) -> bool:
+        if self.process is None:
+            self._start(self.position)
+        self._pending = None
+        if (self.position - self.start_frame) % self.frame_step:
+            # ffmpeg已经丢弃了该帧
+            if self.frame_count and self.position >= self.frame_count:
+                return False
+            self.position += 1
+            return True
+        self._pending = self._read_frame()
+        if self._pending is None:
+            return False
+        self.position += 1
+        return True
+
+    def retrieve(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if self._pending is None:
+            return False, None
+        shape = (self.height, self.width) if self.channels == 1 else (self.height, self.width, self.channels)
+        return True, np.frombuffer(self._pending, dtype=np.uint8).reshape(shape)
+
+    def release(self):
+        self._stop()
+        self._opened = False
+
+
+def open_video(path: str, backend: str = "opencv", threads: int = 0, pix_fmt: str = "bgr24",
+               width: int = 0) -> VideoDecoder:
+    """
+    打开视频
+    :param path: 视频文件路径
+    :param backend: 解码后端 ("opencv", "pyav", "ffmpeg")
+    :param threads: 解码线程数，0表示由后端决定
+    :param pix_fmt: 输出像素格式 ("bgr24", "gray")
+    :param width: 输出宽度，0或不小于原始宽度时不缩放
+    :return: 解码器，接口与cv2.VideoCapture相同
+    """
+    if backend not in DECODER_BACKENDS:
+        raise ValueError(f"不支持的解码后端: {backend}")
+    if backend == "pyav":
+        return PyAVDecoder(path, threads, pix_fmt, width)
+    if backend == "ffmpeg":
+        return FFmpegPipeDecoder(path, threads, pix_fmt, width)
+    return OpenCVDecoder(path, threads, pix_fmt, width)
+
+
+class FrameFetcher:
+    """
+    按帧编号读取原始分辨率的彩色帧：分析流只有缩小的灰度帧，保存截图时用它读取原始画面
+    首次使用时打开视频，每次按时间戳跳转
+    """
+
+    def __init__(self, path: str, fps: float, backend: str = "opencv", threads: int = 0):
+        """
+        :param path: 视频文件路径
+        :param fps: 视频帧率
+        :param backend: 解码后端
+        :param threads: 解码线程数
+        """
+        self.path = path
+        self.fps = fps
+        self.backend = backend
+        self.threads = threads
+        self.cap = None
+        self.fetched = 0
+
+    def read(self, frame_index: int) -> Optional[np.ndarray]:
+        """
+        读取指定帧
+        :param frame_index: 帧编号
+        :return: BGR帧，读取失败时返回None
+        """
+        if self.cap is None:
+            self.cap = open_video(self.path, self.backend, self.threads)
+        if self.fps > 0:
+            self.cap.set(cv2.CAP_PROP_POS_MSEC, frame_index * 1000.0 / self.fps)
+        else:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+        ret, frame = self.cap.read()
+        if not ret:
+            return None
+        self.fetched += 1
+        return frame
+
+    def close(self):
+        """释放视频对象"""
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
@@ -1,37 +1,22 @@
 import cv2
-import pytesseract
 import numpy as np
-from PIL import Image
 import os
-import hashlib
 import time
 import logging
-from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import List
 
-# 设置OCR路径
-try:
-    from config import OCRConfig
-    if OCRConfig.TESSERACT_CMD and os.path.exists(OCRConfig.TESSERACT_CMD):
-        pytesseract.pytesseract.tesseract_cmd = OCRConfig.TESSERACT_CMD
-except ImportError:
-    pass  # 如果config模块不可用，则跳过
+# OCR引擎、OCR流水线和解码后端在用到它们的代码路径中导入
+from frame_sampler import create_sampler
+from screenshot_writer import ScreenshotWriter
+from processor_base import BaseVideoProcessor
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-class VideoProcessor:
-    def __init__(self, video_path: str, output_dir: Optional[str] = None):
-        self.video_path = video_path
-        self.video_name = Path(video_path).stem
-        self.output_dir = output_dir or os.path.join(os.path.dirname(video_path), f"{self.video_name}_截图")
-        self.previous_text = ""
-        self.screenshot_count = 0
-        
-        # 创建输出目录
-        os.makedirs(self.output_dir, exist_ok=True)
-        
+class VideoProcessor(BaseVideoProcessor):
+    """只检测文字变化的视频处理器，参数见 BaseVideoProcessor"""
+
     def extract_frames_with_text_changes(self, interval: float = 1.0) -> List[str]:
         """
         提取视频中文字有变化的帧并保存截图
@@ -40,8 +25,12 @@ class VideoProcessor:
         """
         logger.info(f"开始处理视频: {self.video_path}")
         
+        from video_decoder import open_video
+        from ocr_gate import OCRGate
+        from ocr_pool import iter_frame_texts
+
         # 打开视频文件
-        cap = cv2.VideoCapture(self.video_path)
+        cap = open_video(self.video_path, self.decoder, self.decoder_threads)
         if not cap.isOpened():
             logger.error(f"无法打开视频文件: {self.video_path}")
             return []
@@ -49,94 +38,70 @@ class VideoProcessor:
         fps = cap.get(cv2.CAP_PROP_FPS)
         # 确保frame_interval至少为1，避免除零错误
         frame_interval = max(1, int(fps * interval))  # 帧间隔
-        frame_count = 0
         saved_screenshots = []
+        previous_sample = None
+        self._create_refiner(fps)
+        
+        # 定期保存检查点，中断后可以从检查点继续
+        checkpoint = self._open_checkpoint()
+        start_frame = self._resume_from_checkpoint(checkpoint, "text", frame_interval, saved_screenshots)
+        last_frame = None
+        completed = False
         
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-                
-            # 按指定间隔处理帧
-            if frame_count % frame_interval == 0:
-                # 将BGR转换为RGB
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                pil_image = Image.fromarray(rgb_frame)
-                
-                # 提取文字
-                current_text = self.extract_text_from_image(pil_image)
-                
+        # 跳过的帧只grab不解码转换，间隔较大时直接跳转；自适应取样时画面不变则逐步加大间隔
+        max_frame_interval = int(fps * self.max_interval) if self.max_interval else None
+        sampler = create_sampler(cap, frame_interval, self.sampling_strategy, max_frame_interval, self.regions,
+                                 start_frame, gop_size=self._gop_size())
+        start_time = time.perf_counter()
+        # 画面与上一次OCR的帧几乎相同时跳过OCR，复用上次的文字
+        gate = OCRGate(self.ocr_gate_threshold, regions=self.regions) if self.ocr_gate_threshold > 0 else None
+        # 配置了OCR工作进程时，解码与识别并行，结果按帧顺序返回
+        frames = self.profiler.iterate('decode', sampler)
+        samples = iter_frame_texts(frames, self._to_ocr_image, self._extract_text_from_array,
+                                   self.ocr_workers, self.ocr_queue_depth, self.ocr_backend,
+                                   gate, self.ocr_cache, self.ocr_min_confidence, self.ocr_lang)
+        # 截图在后台线程中编码写盘，队列满时阻塞解码循环
+        self.writer = ScreenshotWriter(self.output_dir, self.writer_threads, self.writer_queue_size,
+                                       self.encoder, self.profiler)
+        try:
+            for frame_count, frame, current_text in samples:
+                self._report_progress(frame_count, sampler.total_frames)
                 # 检查文字是否发生变化
                 if self.has_text_changed(current_text):
-                    # 保存截图
-                    screenshot_path = self.save_screenshot(frame, frame_count)
+                    # 保存截图，开启定位时保存两次取样之间的确切切换帧
+                    change_index, change_frame = self._locate_change(previous_sample, frame_count, frame)
+                    screenshot_path = self.save_screenshot(change_frame, change_index)
                     saved_screenshots.append(screenshot_path)
+                    self.screenshot_times.append(change_index / fps if fps else 0.0)
                     self.previous_text = current_text
-                    logger.info(f"检测到文字变化，已保存截图: {screenshot_path}")
-                    
-            frame_count += 1
-            
-        cap.release()
+                    logger.info(f"检测到文字变化，已保存截图: {screenshot_path} ({self.screenshot_times[-1]:.2f}秒)")
+                if self.refiner is not None:
+                    # 只有定位切换帧时才需要保留上一个取样帧
+                    previous_sample = (frame_count, frame)
+                last_frame = frame_count
+                if checkpoint is not None and checkpoint.due():
+                    self._save_checkpoint(checkpoint, "text", frame_interval, frame_count + frame_interval,
+                                          saved_screenshots)
+            completed = True
+        finally:
+            self._release_resources(cap)
+            if not completed:
+                self._save_interrupt_checkpoint(checkpoint, "text", frame_interval, last_frame, saved_screenshots)
+        if checkpoint is not None:
+            checkpoint.remove()
+        self._report_progress(sampler.total_frames, sampler.total_frames)
+        sampler.log_stats()
+        self.sampling_stats = sampler.stats()
+        self._log_ocr_stats(gate)
+        self._finish_profile(time.perf_counter() - start_time, len(saved_screenshots))
         logger.info(f"处理完成，共保存 {len(saved_screenshots)} 张截图")
         return saved_screenshots
         
-    def extract_text_from_image(self, image: Image.Image) -> str:
-        """
-        从图像中提取文字
-        :param image: PIL图像对象
-        :return: 提取的文字
-        """
-        try:
-            # 使用pytesseract进行OCR识别
-            text = pytesseract.image_to_string(image, lang='chi_sim+eng')
-            return text.strip()
-        except Exception as e:
-            logger.error(f"OCR识别失败: {e}")
-            return ""
-            
-    def has_text_changed(self, current_text: str) -> bool:
-        """
-        检查文字是否发生变化
-        :param current_text: 当前帧提取的文字
-        :return: 是否发生变化
-        """
-        # 如果是第一帧，认为有变化
-        if not self.previous_text:
-            return True
-            
-        # 比较文字内容（去除空白字符后）
-        return current_text.strip() != self.previous_text.strip()
-        
-    def save_screenshot(self, frame: np.ndarray, frame_number: int) -> str:
-        """
-        保存截图
-        :param frame: 视频帧
-        :param frame_number: 帧编号
-        :return: 截图文件路径
-        """
-        self.screenshot_count += 1
-        filename = f"{self.video_name}_截图_{self.screenshot_count:03d}.png"
-        screenshot_path = os.path.join(self.output_dir, filename)
-        
-        # 确保输出目录存在
-        os.makedirs(self.output_dir, exist_ok=True)
+    def _to_ocr_image(self, frame: np.ndarray) -> np.ndarray:
+        """截取识别区域并将BGR转换为OCR使用的RGB图像"""
+        with self.profiler.stage('convert'):
+            return cv2.cvtColor(self.regions.apply(frame), cv2.COLOR_BGR2RGB)
         
-        # 保存图像并检查是否成功
-        # 使用PIL保存图像，因为它能正确处理中文路径
-        try:
-            # 将BGR转换为RGB
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            pil_image = Image.fromarray(rgb_frame)
-            pil_image.save(screenshot_path, 'PNG')
-            success = True
-        except Exception as e:
-            success = False
-            logger.error(f"保存截图失败: {screenshot_path}, 错误: {e}")
-        
-        if not success:
-            logger.error(f"保存截图失败: {screenshot_path}")
-        return screenshot_path
-
     def process_video(self, interval: float = 1.0) -> List[str]:
         """
         处理视频并提取文字变化的截图
@@ -0,0 +1,176 @@
+import os
+import math
+import shutil
+import logging
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from frame_hash import average_hash_batch, hamming_distance
+from text_compare import DEFAULT_TEXT_SIMILARITY, text_changed
+
+logger = logging.getLogger(__name__)
+
+# 时间段: (预热开始帧, 开始帧, 结束帧)，结束帧为None表示到视频末尾
+Segment = Tuple[int, int, Optional[int]]
+
+# 段边界的检测状态: (上一张截图的分析灰度图, 上一次变化时的文字)
+BoundaryState = Tuple[Optional[np.ndarray], str]
+
+
+def plan_segments(total_frames: int, frame_interval: int, segments: int,
+                  overlap_frames: int = 0) -> List[Segment]:
+    """
+    将视频按取样帧数平均分为若干时间段，段边界对齐到取样间隔，
+    取样帧与不分段处理时相同
+    :param total_frames: 视频总帧数
+    :param frame_interval: 取样帧间隔
+    :param segments: 段数
+    :param overlap_frames: 段间重叠帧数，至少为一个取样间隔
+    :return: 时间段列表
+    """
+    frame_interval = max(1, int(frame_interval))
+    samples = math.ceil(total_frames / frame_interval) if total_frames > 0 else 0
+    segments = max(1, min(int(segments), samples))
+    warmup = max(1, math.ceil(overlap_frames / frame_interval)) * frame_interval
+    starts = [round(samples * i / segments) * frame_interval for i in range(segments)]
+    plan = []
+    for i, start in enumerate(starts):
+        end = starts[i + 1] if i + 1 < segments else None
+        plan.append((max(0, start - warmup) if start > 0 else 0, start, end))
+    return plan
+
+
+def boundary_changed(previous: BoundaryState, current: BoundaryState, method: str,
+                     similarity_threshold: float = 0.95, hash_threshold: int = 10,
+                     text_similarity: float = DEFAULT_TEXT_SIMILARITY) -> bool:
+    """
+    用前一段结束时的检测状态重新判断一段中的第一张截图，规则与逐帧处理时相同
+    :param previous: 前一段结束时的状态
+    :param current: 本段第一张截图时的状态
+    :param method: 检测方法 ("text", "image", "combined")
+    :param similarity_threshold: 图像相似度阈值
+    :param hash_threshold: 哈希差异阈值
+    :param text_similarity: 文字相似度阈值
+    :return: 是否确实发生了变化
+    """
+    previous_frame, previous_text = previous
+    current_frame, current_text = current
+    text_change = image_change = False
+    if method in ("text", "combined"):
+        text_change = not previous_text or text_changed(previous_text, current_text, text_similarity)
+    if method in ("image", "combined"):
+        if previous_frame is None or current_frame is None:
+            image_change = True
+        else:
+            from skimage.metrics import structural_similarity as ssim
+
+            try:
+                image_change = ssim(previous_frame, current_frame) < similarity_threshold
+            except Exception:
+                # 尺寸不一致等无法计算SSIM时使用平均哈希
+                hashes = average_hash_batch([previous_frame, current_frame])
+                image_change = int(hamming_distance(hashes[0], hashes[1])) > hash_threshold
+    return text_change or image_change
+
+
+def stitch_segments(results: List[dict], method: str, similarity_threshold: float = 0.95,
+                    hash_threshold: int = 10, text_similarity: float = DEFAULT_TEXT_SIMILARITY
+                    ) -> Tuple[List[str], List[float], Optional[BoundaryState]]:
+    """
+    拼接各段的结果：按段顺序传递检测状态，删除段开头与前一段重复的截图
+    :param results: 各段结果（按时间顺序），包含 screenshots, timestamps, first_state, final_state
+    :param method: 检测方法
+    :param similarity_threshold: 图像相似度阈值
+    :param hash_threshold: 哈希差异阈值
+    :param text_similarity: 文字相似度阈值
+    :return: (保留的截图路径, 时间戳, 最终检测状态)
+    """
+    screenshots, timestamps = [], []
+    carried = None
+    for result in results:
+        events = list(zip(result['screenshots'], result['timestamps']))
+        if events and carried is not None and not boundary_changed(
+                carried, result['first_state'], method, similarity_threshold, hash_threshold, text_similarity):
+            # 段开头的截图只是因为该段没有之前的状态，与前一段的最后一张截图相同
+            duplicate_path, duplicate_time = events.pop(0)
+            logger.info(f"删除段边界的重复截图 ({duplicate_time:.2f}秒)")
+            try:
+                os.remove(duplicate_path)
+            except OSError:
+                pass
+        if events:
+            carried = result['final_state']
+        for path, timestamp in events:
+            screenshots.append(path)
+            timestamps.append(timestamp)
+    return screenshots, timestamps, carried
+
+
+def renumber_screenshots(screenshots: List[str], timestamps: List[float], output_dir: str,
+                         video_name: str, extension: str) -> Tuple[List[str], List[float]]:
+    """
+    按时间顺序重新编号，移动到输出目录
+    :param screenshots: 截图路径
+    :param timestamps: 截图时间戳（秒）
+    :param output_dir: 输出目录
+    :param video_name: 视频名，截图文件名为 "<视频名>_截图_<序号><扩展名>"
+    :param extension: 文件扩展名
+    :return: (新的截图路径, 时间戳)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    order = sorted(range(len(screenshots)), key=lambda i: timestamps[i])
+    paths = []
+    for number, i in enumerate(order, 1):
+        path = os.path.join(output_dir, f"{video_name}_截图_{number:03d}{extension}")
+        if os.path.exists(screenshots[i]):
+            os.replace(screenshots[i], path)
+        paths.append(path)
+    return paths, [timestamps[i] for i in order]
+
+
+def segment_dir(output_dir: str, index: int) -> str:
+    """
+    每段截图的临时目录，拼接后删除
+    :param output_dir: 输出目录
+    :param index: 段序号
+    :return: 临时目录
+    """
+    return os.path.join(output_dir, f".segment_{index:02d}")
+
+
+def remove_segment_dirs(output_dir: str, count: int):
+    """删除各段的临时目录"""
+    for index in range(count):
+        shutil.rmtree(segment_dir(output_dir, index), ignore_errors=True)
+
+
+def run_segment(video_path: str, options: dict, segment: Segment, output_dir: str, interval: float,
+                method: str, similarity_threshold: float, hash_threshold: int) -> dict:
+    """
+    工作进程入口：用独立的处理器（和独立的视频对象）处理一个时间段
+    :param video_path: 视频文件路径
+    :param options: 处理器构造函数的选项
+    :param segment: 时间段
+    :param output_dir: 该段截图的临时目录
+    :param interval: 处理帧的时间间隔（秒）
+    :param method: 检测方法
+    :param similarity_threshold: 图像相似度阈值
+    :param hash_threshold: 哈希差异阈值
+    :return: 结果字典 (screenshots, timestamps, first_state, final_state, save_errors)
+    """
+    from advanced_video_processor import AdvancedVideoProcessor
+    # 分段处理不使用检查点和分析索引，段内不再分段
+    options = {**options, 'output_dir': output_dir, 'segments': 1, 'resume': False,
+               'checkpoint_interval': 0, 'analysis_index': False, 'profile': False, 'profile_trace': None}
+    processor = AdvancedVideoProcessor(video_path, **options)
+    processor.segment = segment
+    screenshots = processor.extract_frames_with_custom_thresholds(interval, method, similarity_threshold,
+                                                                  hash_threshold)
+    return {
+        'screenshots': screenshots,
+        'timestamps': processor.screenshot_times,
+        'first_state': processor.segment_first_state,
+        'final_state': (processor.previous_frame, processor.previous_text),
+        'save_errors': processor.save_errors,
+    }